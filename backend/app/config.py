@@ -7,11 +7,228 @@ class Settings:
     openai_model: str
     firebase_bucket: str | None
     max_text_length: int = 200_000
+    doc_workers: int
+    doc_queue_size: int
+    doc_retry_after: int
+    office_binary: str
+    office_pool_size: int
+    office_max_conversions: int
+    office_convert_timeout: float
+    office_startup_timeout: float
+    hwp_native: bool
+    hwp_max_unpacked_bytes: int
+    extraction_cache_size: int
+    extraction_cache_dir: str | None
+    extraction_cache_max_bytes: int
+    extraction_cache_ttl: int
+    ai_cache_backend: str
+    ai_cache_size: int
+    ai_cache_ttl: int
+    ai_cache_dir: str
+    ai_cache_max_bytes: int
+    ai_cache_redis_url: str
+    http2: bool
+    http_max_connections: int
+    http_max_keepalive: int
+    http_keepalive_expiry: float
+    http_host_limits: str
+    openai_max_connections: int
+    download_max_bytes: int
+    download_connect_timeout: float
+    download_read_timeout: float
+    download_retries: int
+    download_backoff: float
+    upload_spool_bytes: int
+    upload_store_originals: bool
+    firebase_storage_emulator_host: str
+    pdf_max_pages: int
+    pdf_parallel_threshold: int
+    pdf_pages_per_task: int
+    ocr_enabled: bool
+    ocr_lang: str
+    ocr_dpi: int
+    ocr_min_chars: int
+    ocr_max_pages: int
+    ocr_workers: int
+    job_backend: str
+    job_db_path: str
+    job_concurrency: int
+    job_queue_size: int
+    job_ttl: int
+    job_lease: float
+    job_callback_secret: str
+    job_callback_allowed_hosts: str
+    rate_limit_backend: str
+    rate_limit_redis_url: str
+    rate_limit_idle_ttl: float
+    rate_limit_max_keys: int
+    rate_limit_document_rate: float
+    rate_limit_document_burst: int
+    rate_limit_ai_rate: float
+    rate_limit_ai_burst: int
+    rate_limit_trusted_proxies: str
+    ai_single_pass_tokens: int
+    ai_chunk_tokens: int
+    ai_chunk_concurrency: int
+    ai_section_tokens: int
+    ai_section_min_tokens: int
+    jobs_data_paths: str
+    jobs_reload_interval: float
+    jobs_max_query_terms: int
+    jobs_query_chars: int
+    admin_token: str
+    llm_max_concurrency: int
+    llm_model_concurrency: int
+    llm_tokens_per_minute: int
+    llm_output_tokens: int
+    llm_max_retries: int
+    llm_backoff_base: float
+    llm_backoff_max: float
+    llm_deadline: float
+    llm_breaker_threshold: int
+    llm_breaker_reset: float
+    openai_fallback_model: str
+    openai_fallback_base_url: str
+    openai_fallback_api_key: str
+    batch_max_items: int
+    batch_concurrency: int
+    batch_poll_interval: float
+    batch_lease: float
+    log_format: str
+    log_level: str
+    otel_enabled: bool
+    service_role: str
+    web_workers: int
 
     def __init__(self) -> None:
         self.openai_api_key = os.getenv("OPENAI_API_KEY", "")
         self.openai_model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
         self.firebase_bucket = os.getenv("FIREBASE_BUCKET")
+        # 0 이면 CPU 코어 수만큼 워커를 띄운다.
+        self.doc_workers = int(os.getenv("DOC_WORKERS", "0"))
+        self.doc_queue_size = int(os.getenv("DOC_QUEUE_SIZE", "16"))
+        self.doc_retry_after = int(os.getenv("DOC_RETRY_AFTER", "5"))
+        # 0 이면 상주 LibreOffice 풀을 끄고 변환마다 libreoffice 를 새로 띄운다.
+        self.office_binary = os.getenv("OFFICE_BINARY", "soffice")
+        self.office_pool_size = int(os.getenv("OFFICE_POOL_SIZE", "2"))
+        self.office_max_conversions = int(os.getenv("OFFICE_MAX_CONVERSIONS", "200"))
+        self.office_convert_timeout = float(os.getenv("OFFICE_CONVERT_TIMEOUT", "60"))
+        self.office_startup_timeout = float(os.getenv("OFFICE_STARTUP_TIMEOUT", "30"))
+        # 상주 인스턴스를 기다리는 요청은 DOC_QUEUE_SIZE 개까지 받고, OFFICE_STARTUP_TIMEOUT 안에 차례가 오지 않으면 503 을 돌려준다.
+        # HWP/HWPX 본문을 직접 읽는다. 읽지 못한 파일(암호, 배포용 문서, 손상)만 LibreOffice 로 변환한다.
+        # HWP_MAX_UNPACKED_BYTES 는 압축을 푼 본문 크기 상한으로, 압축 폭탄을 막는다.
+        self.hwp_native = os.getenv("HWP_NATIVE", "1") == "1"
+        self.hwp_max_unpacked_bytes = int(os.getenv("HWP_MAX_UNPACKED_BYTES", str(64 * 1024 * 1024)))
+        # 디렉터리를 지정하면 메모리 LRU 뒤에 디스크 캐시를 둔다.
+        self.extraction_cache_size = int(os.getenv("EXTRACTION_CACHE_SIZE", "256"))
+        self.extraction_cache_dir = os.getenv("EXTRACTION_CACHE_DIR") or None
+        self.extraction_cache_max_bytes = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+        self.extraction_cache_ttl = int(os.getenv("EXTRACTION_CACHE_TTL", str(7 * 24 * 3600)))
+        # memory | disk | redis | none
+        self.ai_cache_backend = os.getenv("AI_CACHE_BACKEND", "memory")
+        self.ai_cache_size = int(os.getenv("AI_CACHE_SIZE", "1024"))
+        self.ai_cache_ttl = int(os.getenv("AI_CACHE_TTL", str(24 * 3600)))
+        self.ai_cache_dir = os.getenv("AI_CACHE_DIR", "/tmp/ai-response-cache")
+        # disk 백엔드의 용량 상한. 넘으면 만료된 항목, 그다음 먼저 만료될 항목부터 지운다.
+        self.ai_cache_max_bytes = int(os.getenv("AI_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+        self.ai_cache_redis_url = os.getenv("AI_CACHE_REDIS_URL", "redis://localhost:6379/0")
+        # 앱 수명 동안 공유하는 HTTP 커넥션 풀 설정. HTTP_HOST_LIMITS 는 "host=크기,..." 형식이다.
+        self.http2 = os.getenv("HTTP2", "1") == "1"
+        self.http_max_connections = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+        self.http_max_keepalive = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+        self.http_keepalive_expiry = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+        self.http_host_limits = os.getenv("HTTP_HOST_LIMITS", "")
+        self.openai_max_connections = int(os.getenv("OPENAI_MAX_CONNECTIONS", "50"))
+        self.download_max_bytes = int(os.getenv("DOWNLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+        self.download_connect_timeout = float(os.getenv("DOWNLOAD_CONNECT_TIMEOUT", "5"))
+        self.download_read_timeout = float(os.getenv("DOWNLOAD_READ_TIMEOUT", "30"))
+        self.download_retries = int(os.getenv("DOWNLOAD_RETRIES", "2"))
+        self.download_backoff = float(os.getenv("DOWNLOAD_BACKOFF", "0.5"))
+        # 직접 업로드(/api/document/process/upload)도 DOWNLOAD_MAX_BYTES 를 상한으로 쓴다. UPLOAD_SPOOL_BYTES 까지는 메모리에 둔다.
+        # UPLOAD_STORE_ORIGINALS=1 이면 응답 전에 원본을 FIREBASE_BUCKET 의 uploads/<sha256> 로 보관하고 storagePath 로 알려 준다.
+        # FIREBASE_STORAGE_EMULATOR_HOST(예: localhost:9199)가 있으면 Storage 에뮬레이터로 보낸다.
+        self.upload_spool_bytes = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+        self.upload_store_originals = os.getenv("UPLOAD_STORE_ORIGINALS", "0") == "1"
+        self.firebase_storage_emulator_host = os.getenv("FIREBASE_STORAGE_EMULATOR_HOST", "")
+        # 이 쪽수를 넘는 PDF 는 페이지 구간으로 나눠 여러 워커에서 병렬 추출한다.
+        self.pdf_max_pages = int(os.getenv("PDF_MAX_PAGES", "100"))
+        self.pdf_parallel_threshold = int(os.getenv("PDF_PARALLEL_THRESHOLD", "32"))
+        self.pdf_pages_per_task = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+        # 텍스트 레이어가 OCR_MIN_CHARS 자 미만인 페이지만 OCR 한다. OCR_WORKERS 가 0 이면 CPU 코어 수.
+        self.ocr_enabled = os.getenv("OCR_ENABLED", "1") == "1"
+        self.ocr_lang = os.getenv("OCR_LANG", "kor+eng")
+        self.ocr_dpi = int(os.getenv("OCR_DPI", "200"))
+        self.ocr_min_chars = int(os.getenv("OCR_MIN_CHARS", "30"))
+        self.ocr_max_pages = int(os.getenv("OCR_MAX_PAGES", "30"))
+        self.ocr_workers = int(os.getenv("OCR_WORKERS", "0"))
+        # memory | sqlite. sqlite 는 여러 워커가 작업 상태와 idempotency 키를 공유하고 재시작 후 이어서 처리한다.
+        self.job_backend = os.getenv("JOB_BACKEND", "memory")
+        self.job_db_path = os.getenv("JOB_DB_PATH", "/tmp/resume-jobs.sqlite3")
+        self.job_concurrency = int(os.getenv("JOB_CONCURRENCY", "4"))
+        self.job_queue_size = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+        self.job_ttl = int(os.getenv("JOB_TTL", str(24 * 3600)))
+        # 이보다 오래 running 에 머문 작업은 재시작 때 실패로 바꾼다. 가장 긴 작업보다 넉넉해야 한다.
+        self.job_lease = float(os.getenv("JOB_LEASE", "900"))
+        # callbackUrl 본문은 JOB_CALLBACK_SECRET 으로 HMAC 서명한다. 비어 있으면 callbackUrl 을 받지 않는다.
+        # JOB_CALLBACK_ALLOWED_HOSTS(쉼표 구분)가 있으면 그 호스트로만 보내고, 없으면 공인 주소만 허용한다.
+        self.job_callback_secret = os.getenv("JOB_CALLBACK_SECRET", "")
+        self.job_callback_allowed_hosts = os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "")
+        # 클라이언트별 토큰 버킷. redis 백엔드를 쓰면 여러 워커가 같은 한도를 공유한다.
+        # RATE_LIMIT_TRUSTED_PROXIES 에 든 주소(CIDR, 쉼표 구분, "*" 는 전부)에서 온 요청만 X-Forwarded-For 를 믿는다.
+        self.rate_limit_backend = os.getenv("RATE_LIMIT_BACKEND", "memory")
+        self.rate_limit_redis_url = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+        self.rate_limit_idle_ttl = float(os.getenv("RATE_LIMIT_IDLE_TTL", "600"))
+        self.rate_limit_max_keys = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+        self.rate_limit_document_rate = float(os.getenv("RATE_LIMIT_DOCUMENT_RATE", "1"))
+        self.rate_limit_document_burst = int(os.getenv("RATE_LIMIT_DOCUMENT_BURST", "5"))
+        self.rate_limit_ai_rate = float(os.getenv("RATE_LIMIT_AI_RATE", "1"))
+        self.rate_limit_ai_burst = int(os.getenv("RATE_LIMIT_AI_BURST", "3"))
+        self.rate_limit_trusted_proxies = os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "")
+        # 추정 토큰 수가 AI_SINGLE_PASS_TOKENS 를 넘는 문서는 AI_CHUNK_TOKENS 단위로 나눠 map-reduce 한다.
+        self.ai_single_pass_tokens = int(os.getenv("AI_SINGLE_PASS_TOKENS", "12000"))
+        self.ai_chunk_tokens = int(os.getenv("AI_CHUNK_TOKENS", "4000"))
+        self.ai_chunk_concurrency = int(os.getenv("AI_CHUNK_CONCURRENCY", "4"))
+        # 섹션 단위 재평가(/api/ai/evaluate/sections). 섹션 결과는 응답 캐시(AI_CACHE_BACKEND)에 저장돼 재사용된다.
+        self.ai_section_tokens = int(os.getenv("AI_SECTION_TOKENS", "1500"))
+        self.ai_section_min_tokens = int(os.getenv("AI_SECTION_MIN_TOKENS", "60"))
+        # 채용공고 매칭 인덱스(/api/jobs/match). 경로는 쉼표로 구분하고, 없는 파일은 건너뛴다.
+        # JOBS_RELOAD_INTERVAL 초마다 파일 변경을 확인해 다시 적재한다. 0 이면 시작할 때 한 번만 읽는다.
+        self.jobs_data_paths = os.getenv("JOBS_DATA_PATHS", "../scripts/results.json,../jobs.json")
+        self.jobs_reload_interval = float(os.getenv("JOBS_RELOAD_INTERVAL", "30"))
+        self.jobs_max_query_terms = int(os.getenv("JOBS_MAX_QUERY_TERMS", "256"))
+        self.jobs_query_chars = int(os.getenv("JOBS_QUERY_CHARS", "20000"))
+        # 운영용 엔드포인트(/api/jobs/index/reload)는 Authorization: Bearer <ADMIN_TOKEN> 이 있어야 한다. 비어 있으면 닫는다.
+        self.admin_token = os.getenv("ADMIN_TOKEN", "")
+        # OpenAI 호출 거버너. LLM_TOKENS_PER_MINUTE 가 0 이면 토큰 예산을 두지 않는다.
+        # LLM_DEADLINE 은 대기, 재시도를 포함한 호출 하나의 전체 시간 한도(초)다.
+        self.llm_max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+        self.llm_model_concurrency = int(os.getenv("LLM_MODEL_CONCURRENCY", "16"))
+        self.llm_tokens_per_minute = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+        self.llm_output_tokens = int(os.getenv("LLM_OUTPUT_TOKENS", "2000"))
+        self.llm_max_retries = int(os.getenv("LLM_MAX_RETRIES", "3"))
+        self.llm_backoff_base = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+        self.llm_backoff_max = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+        self.llm_deadline = float(os.getenv("LLM_DEADLINE", "90"))
+        self.llm_breaker_threshold = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+        self.llm_breaker_reset = float(os.getenv("LLM_BREAKER_RESET", "30"))
+        # 둘 중 하나라도 지정하면 주 공급자가 실패하거나 차단됐을 때 이 모델/엔드포인트로 넘어간다.
+        self.openai_fallback_model = os.getenv("OPENAI_FALLBACK_MODEL", "")
+        self.openai_fallback_base_url = os.getenv("OPENAI_FALLBACK_BASE_URL", "")
+        self.openai_fallback_api_key = os.getenv("OPENAI_FALLBACK_API_KEY", "") or self.openai_api_key
+        # 일괄 평가는 작업 저장소(JOB_BACKEND, JOB_DB_PATH)를 같이 쓴다. BATCH_LEASE 초 동안 갱신이 없는
+        # 실행 중 배치는 다른 워커가 이어받고, offline 배치는 BATCH_POLL_INTERVAL 초마다 공급자 상태를 확인한다.
+        self.batch_max_items = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+        self.batch_concurrency = int(os.getenv("BATCH_CONCURRENCY", "4"))
+        self.batch_poll_interval = float(os.getenv("BATCH_POLL_INTERVAL", "60"))
+        self.batch_lease = float(os.getenv("BATCH_LEASE", "300"))
+        # json | text. OTEL_ENABLED=1 이면 opentelemetry 가 설치되어 있을 때 단계별 스팬을 만든다.
+        self.log_format = os.getenv("LOG_FORMAT", "json")
+        self.log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+        self.otel_enabled = os.getenv("OTEL_ENABLED", "0") == "1"
+        # all | document | ai. 문서 추출과 AI 라우트를 따로 배포해 각자 필요한 스택만 읽고 따로 늘린다(app.roles).
+        self.service_role = os.getenv("SERVICE_ROLE", "all").lower()
+        # python -m app.serve 가 띄울 gunicorn 워커 수. 0 이면 역할과 CPU 코어 수로 정한다.
+        self.web_workers = int(os.getenv("WEB_CONCURRENCY", "0"))
 
     @property
     def api_base_url(self) -> str:
@@ -1,15 +1,44 @@
+import asyncio
+import hmac
 import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import Annotated
 
-from fastapi import Body, Depends, FastAPI, HTTPException, Request, status
+from fastapi import APIRouter, Body, Depends, FastAPI, Header, HTTPException, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 from app.config import get_settings
+from app.observability import (
+    HTTP_IN_FLIGHT,
+    HTTP_REQUEST_SECONDS,
+    build_registry,
+    configure_logging,
+    render_metrics,
+    request_id_var,
+    span,
+)
 from app.rate_limit import RateLimiter, get_rate_limiter
+from app.roles import ROLES, import_stack, serves
 from app.schemas import (
+    AnalyzeRequest,
+    AnalyzeResponse,
+    BatchItem,
+    BatchRequest,
+    BatchStatus,
     ErrorResponse,
     EvaluateRequest,
     EvaluateResponse,
+    IncrementalEvaluateRequest,
+    IncrementalEvaluateResponse,
+    JobMatchRequest,
+    JobMatchResponse,
+    JobRequest,
+    JobResult,
+    JobStatus,
     ProcessRequest,
     ProcessedDocument,
     ProofreadRequest,
@@ -17,105 +46,522 @@ from app.schemas import (
     SummarizeRequest,
     SummarizeResponse,
 )
-from app.services.ai_client import AiClient
-from app.services.document_processor import DocumentProcessor
+from app.services.ai_client import AiClient, parse_stats, section_stats
+from app.services.analysis import analyze, analyze_stream
+from app.services.batches import BatchRunner, get_batch_runner
+from app.services.document_processor import DocumentProcessor, detect_file_type
+from app.services.extraction_cache import get_extraction_cache
+from app.services.http_clients import get_http_clients
+from app.services.job_index import JobIndex, get_job_index
+from app.services.llm_governor import get_llm_governor
+from app.services.jobs import JobQueue, get_job_queue
+from app.services.office_pool import get_office_pool
+from app.services.response_cache import get_response_cache
+from app.services.storage import get_object_storage
+from app.services.uploads import receive_upload
+from app.services.worker_pool import get_worker_pool
+from app.utils.ndjson import ndjson_response
+from app.utils.sse import sse_response
 
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
-app = FastAPI(title="Resume AI Service")
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+configure_logging()
+
+role = settings.service_role
+if role not in ROLES:
+    raise RuntimeError(f"SERVICE_ROLE must be one of {', '.join(ROLES)}, got {role!r}")
+
+
+_preloaded = asyncio.Event()
+
+
+async def preload() -> None:
+    # 요청을 받기 시작한 뒤 뒤에서 무거운 모듈과 문서 워커를 준비한다. 준비가 끝나기 전에 온 요청은
+    # 그 자리에서 임포트하므로 조금 느릴 뿐 실패하지 않는다. 끝나면 /health 의 preloaded 가 true 가 된다.
+    elapsed = await asyncio.to_thread(import_stack, role)
+    if serves(role, "document"):
+        started = time.perf_counter()
+        await get_worker_pool().warm()
+        elapsed += time.perf_counter() - started
+    logger.info("preloaded %s stack in %.1f ms", role, elapsed * 1000)
+    _preloaded.set()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    if serves(role, "document"):
+        get_office_pool().start()
+    if serves(role, "ai"):
+        await get_job_index().start()
+    if role == "all":
+        await get_job_queue().start(run_job_pipeline)
+        await get_batch_runner().start(extract_batch_item, get_ai_client)
+    warmup = asyncio.create_task(preload())
+    yield
+    warmup.cancel()
+    if role == "all":
+        await get_batch_runner().stop()
+        await get_job_queue().stop()
+    if serves(role, "ai"):
+        await get_job_index().stop()
+    if serves(role, "document"):
+        get_office_pool().shutdown()
+    get_worker_pool().shutdown()
+    await get_http_clients().aclose()
+    get_ai_client.cache_clear()
+
+
+app = FastAPI(title="Resume AI Service", lifespan=lifespan)
+
+# 라우트는 역할별 라우터에 모아 두고 맨 아래에서 SERVICE_ROLE 에 맞는 것만 붙인다.
+document_routes = APIRouter()
+ai_routes = APIRouter()
+# 문서 추출과 AI 를 한 프로세스에서 이어 부르는 라우트. role=all 에서만 연다.
+pipeline_routes = APIRouter()
+
 
+_UPLOAD_PATH = "/api/document/process/upload"
+# multipart 경계와 폼 필드 몫.
+_UPLOAD_OVERHEAD = 64 * 1024
 
+
+# 미들웨어는 나중에 등록한 것이 바깥을 감싼다. request_context 를 마지막에 두어 413 같은 다른 미들웨어의 응답도
+# 요청 ID, 접근 로그, HTTP 지표에 잡히게 하고, CORS 는 본문 크기 제한 응답에도 헤더를 붙이도록 그 바깥에 둔다.
 @app.middleware("http")
 async def limit_body_size(request: Request, call_next):
     max_size = settings.max_text_length * 10
+    if request.url.path == _UPLOAD_PATH:
+        max_size = settings.download_max_bytes + _UPLOAD_OVERHEAD
     if request.headers.get("content-length"):
         if int(request.headers["content-length"]) > max_size:
-            raise HTTPException(
+            # 미들웨어에서 던진 HTTPException 은 예외 처리기를 거치지 않고 500 이 되므로 응답을 직접 만든다.
+            return JSONResponse(
                 status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail="Payload too large",
+                content={"detail": "Payload too large"},
             )
     return await call_next(request)
 
 
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    # 클라이언트나 프록시가 보낸 X-Request-ID 를 이어 쓰고, 없으면 새로 만들어 로그와 응답 헤더에 싣는다.
+    request_id = request.headers.get("x-request-id", "")[:128] or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    HTTP_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        with span("http.request", method=request.method, path=request.url.path):
+            response = await call_next(request)
+        status_code = response.status_code
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        elapsed = time.perf_counter() - started
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_REQUEST_SECONDS.labels(method=request.method, route=route, status=str(status_code)).observe(elapsed)
+        logger.info(
+            "%s %s %s",
+            request.method,
+            route,
+            status_code,
+            extra={
+                "method": request.method,
+                "route": route,
+                "status": status_code,
+                "durationMs": round(elapsed * 1000, 1),
+            },
+        )
+        request_id_var.reset(token)
+
+
 def get_processor() -> DocumentProcessor:
     return DocumentProcessor(firebase_bucket=settings.firebase_bucket)
 
 
+@lru_cache()
 def get_ai_client() -> AiClient:
+    # OpenAI 클라이언트와 커넥션 풀을 요청마다 새로 만들지 않고 공유한다.
     return AiClient()
 
 
-@app.post("/api/document/process", response_model=ProcessedDocument, responses={400: {"model": ErrorResponse}})
+def ensure_text_size(text: str) -> None:
+    if len(text) > settings.max_text_length:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="문서가 너무 큽니다.",
+        )
+
+
+@document_routes.post("/api/document/process", response_model=ProcessedDocument, responses={400: {"model": ErrorResponse}})
 async def process_document(
     payload: Annotated[ProcessRequest, Body(...)],
     request: Request,
     processor: DocumentProcessor = Depends(get_processor),
     limiter: RateLimiter = Depends(get_rate_limiter),
 ):
-    limiter.check(request)
+    await limiter.check(request, "document")
     return await processor.process(payload.fileUrl, payload.fileType)
 
 
-@app.post("/api/ai/evaluate", response_model=EvaluateResponse, responses={502: {"model": ErrorResponse}})
+_CONTENT_TYPES = {"pdf": "application/pdf", "hwp": "application/x-hwp"}
+
+
+@document_routes.post(
+    _UPLOAD_PATH,
+    response_model=ProcessedDocument,
+    responses={400: {"model": ErrorResponse}, 413: {"model": ErrorResponse}, 415: {"model": ErrorResponse}},
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {
+                            "file": {"type": "string", "format": "binary"},
+                            "fileType": {"type": "string", "enum": ["pdf", "hwp"]},
+                        },
+                    }
+                }
+            },
+        }
+    },
+)
+async def process_upload(
+    request: Request,
+    processor: DocumentProcessor = Depends(get_processor),
+    limiter: RateLimiter = Depends(get_rate_limiter),
+):
+    # 앱이 Storage 에 올린 뒤 fileUrl 로 다시 내려받는 왕복 없이 본문을 바로 받아 같은 파이프라인에 넣는다.
+    await limiter.check(request, "document")
+    upload, fields = await receive_upload(request, settings.upload_spool_bytes, settings.download_max_bytes)
+    try:
+        file_type = detect_file_type(upload.head, fields.get("fileType"))
+        document = await processor.process_upload(upload, file_type)
+        storage = get_object_storage()
+        if storage is None:
+            return document
+        # 앱이 storagePath 를 이력서 기록에 저장하므로 원본을 보관한 뒤에 응답한다. 보관에 실패하면 경로를 넣지 않는다.
+        name = f"uploads/{upload.digest}.{file_type}"
+        if not await storage.store_once(name, upload.data(), _CONTENT_TYPES[file_type]):
+            return document
+        return document.model_copy(update={"storagePath": name})
+    finally:
+        upload.close()
+
+
+@ai_routes.post("/api/ai/evaluate", response_model=EvaluateResponse, responses={502: {"model": ErrorResponse}})
 async def evaluate(
     payload: Annotated[EvaluateRequest, Body(...)],
     request: Request,
     ai_client: AiClient = Depends(get_ai_client),
     limiter: RateLimiter = Depends(get_rate_limiter),
 ):
-    limiter.check(request)
-    if len(payload.extractedText) > settings.max_text_length:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail="문서가 너무 큽니다.",
-        )
+    await limiter.check(request, "ai")
+    ensure_text_size(payload.extractedText)
     return await ai_client.evaluate(payload)
 
 
-@app.post("/api/ai/summarize", response_model=SummarizeResponse, responses={502: {"model": ErrorResponse}})
+@ai_routes.post(
+    "/api/ai/evaluate/sections",
+    response_model=IncrementalEvaluateResponse,
+    responses={502: {"model": ErrorResponse}},
+)
+async def evaluate_sections(
+    payload: Annotated[IncrementalEvaluateRequest, Body(...)],
+    request: Request,
+    ai_client: AiClient = Depends(get_ai_client),
+    limiter: RateLimiter = Depends(get_rate_limiter),
+):
+    await limiter.check(request, "ai")
+    ensure_text_size(payload.extractedText)
+    return await ai_client.evaluate_sections(payload)
+
+
+@ai_routes.post("/api/ai/summarize", response_model=SummarizeResponse, responses={502: {"model": ErrorResponse}})
 async def summarize(
     payload: Annotated[SummarizeRequest, Body(...)],
     request: Request,
     ai_client: AiClient = Depends(get_ai_client),
     limiter: RateLimiter = Depends(get_rate_limiter),
 ):
-    limiter.check(request)
-    if len(payload.extractedText) > settings.max_text_length:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail="문서가 너무 큽니다.",
-        )
+    await limiter.check(request, "ai")
+    ensure_text_size(payload.extractedText)
     return await ai_client.summarize(payload)
 
 
-@app.post("/api/ai/proofread", response_model=ProofreadResponse, responses={502: {"model": ErrorResponse}})
+@ai_routes.post("/api/ai/proofread", response_model=ProofreadResponse, responses={502: {"model": ErrorResponse}})
 async def proofread(
     payload: Annotated[ProofreadRequest, Body(...)],
     request: Request,
     ai_client: AiClient = Depends(get_ai_client),
     limiter: RateLimiter = Depends(get_rate_limiter),
 ):
-    limiter.check(request)
-    if len(payload.extractedText) > settings.max_text_length:
+    await limiter.check(request, "ai")
+    ensure_text_size(payload.extractedText)
+    return await ai_client.proofread(payload)
+
+
+@ai_routes.post("/api/ai/evaluate/stream", response_class=StreamingResponse)
+async def evaluate_stream(
+    payload: Annotated[EvaluateRequest, Body(...)],
+    request: Request,
+    ai_client: AiClient = Depends(get_ai_client),
+    limiter: RateLimiter = Depends(get_rate_limiter),
+):
+    await limiter.check(request, "ai")
+    ensure_text_size(payload.extractedText)
+    return sse_response(ai_client.evaluate_stream(payload))
+
+
+@ai_routes.post("/api/ai/summarize/stream", response_class=StreamingResponse)
+async def summarize_stream(
+    payload: Annotated[SummarizeRequest, Body(...)],
+    request: Request,
+    ai_client: AiClient = Depends(get_ai_client),
+    limiter: RateLimiter = Depends(get_rate_limiter),
+):
+    await limiter.check(request, "ai")
+    ensure_text_size(payload.extractedText)
+    return sse_response(ai_client.summarize_stream(payload))
+
+
+@ai_routes.post("/api/ai/proofread/stream", response_class=StreamingResponse)
+async def proofread_stream(
+    payload: Annotated[ProofreadRequest, Body(...)],
+    request: Request,
+    ai_client: AiClient = Depends(get_ai_client),
+    limiter: RateLimiter = Depends(get_rate_limiter),
+):
+    await limiter.check(request, "ai")
+    ensure_text_size(payload.extractedText)
+    return sse_response(ai_client.proofread_stream(payload))
+
+
+@pipeline_routes.post(
+    "/api/analyze",
+    response_model=AnalyzeResponse,
+    responses={400: {"model": ErrorResponse}, 413: {"model": ErrorResponse}},
+)
+async def analyze_document(
+    payload: Annotated[AnalyzeRequest, Body(...)],
+    request: Request,
+    processor: DocumentProcessor = Depends(get_processor),
+    ai_client: AiClient = Depends(get_ai_client),
+    limiter: RateLimiter = Depends(get_rate_limiter),
+):
+    await limiter.check(request, "document")
+    await limiter.check(request, "ai")
+    document = await processor.process(payload.fileUrl, payload.fileType)
+    ensure_text_size(document.extractedText)
+    return await analyze(ai_client, payload, document)
+
+
+@pipeline_routes.post("/api/analyze/stream", response_class=StreamingResponse)
+async def analyze_document_stream(
+    payload: Annotated[AnalyzeRequest, Body(...)],
+    request: Request,
+    processor: DocumentProcessor = Depends(get_processor),
+    ai_client: AiClient = Depends(get_ai_client),
+    limiter: RateLimiter = Depends(get_rate_limiter),
+):
+    await limiter.check(request, "document")
+    await limiter.check(request, "ai")
+    # 추출 실패는 스트림을 열기 전에 일반 HTTP 오류로 돌려준다.
+    document = await processor.process(payload.fileUrl, payload.fileType)
+    ensure_text_size(document.extractedText)
+    return sse_response(analyze_stream(ai_client, payload, document))
+
+
+async def run_job_pipeline(job: JobRequest) -> JobResult:
+    document = await get_processor().process(str(job.fileUrl), job.fileType)
+    ensure_text_size(document.extractedText)
+    evaluation = await get_ai_client().evaluate(
+        EvaluateRequest(
+            extractedText=document.extractedText,
+            docKind=job.docKind,
+            language=job.language,
+            targetRole=job.targetRole,
+        )
+    )
+    return JobResult(document=document, evaluation=evaluation)
+
+
+@pipeline_routes.post(
+    "/api/jobs",
+    response_model=JobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={503: {"model": ErrorResponse}},
+)
+async def submit_job(
+    payload: Annotated[JobRequest, Body(...)],
+    request: Request,
+    idempotency_key: Annotated[str | None, Header(alias="Idempotency-Key", max_length=128)] = None,
+    jobs: JobQueue = Depends(get_job_queue),
+    limiter: RateLimiter = Depends(get_rate_limiter),
+):
+    await limiter.check(request, "ai")
+    return await jobs.submit(payload, idempotency_key, limiter.client_key(request))
+
+
+@ai_routes.post(
+    "/api/jobs/match",
+    response_model=JobMatchResponse,
+    responses={413: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
+)
+async def match_jobs(
+    payload: Annotated[JobMatchRequest, Body(...)],
+    index: JobIndex = Depends(get_job_index),
+):
+    # LLM 을 거치지 않는 인메모리 검색이라 AI 레이트 리밋을 걸지 않는다.
+    ensure_text_size(payload.extractedText)
+    return index.match(payload)
+
+
+def require_admin(authorization: Annotated[str | None, Header()] = None) -> None:
+    # 토큰이 없으면 엔드포인트가 없는 것처럼 404 를 준다.
+    if not settings.admin_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.admin_token.encode()):
         raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail="문서가 너무 큽니다.",
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="관리자 토큰이 필요합니다.",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-    return await ai_client.proofread(payload)
+
+
+@ai_routes.post("/api/jobs/index/reload", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def reload_job_index(index: JobIndex = Depends(get_job_index)) -> dict:
+    # 파일을 바꾸면 JOBS_RELOAD_INTERVAL 안에 알아서 다시 읽는다. 바로 반영해야 할 때만 호출한다.
+    # 요청을 받은 워커의 인덱스만 다시 읽는다. 다른 워커는 각자의 감시 주기에 따라간다.
+    reloaded = await index.reload(force=True)
+    return {"reloaded": reloaded, **index.stats()}
+
+
+@pipeline_routes.get("/api/jobs/{job_id}", response_model=JobStatus, responses={404: {"model": ErrorResponse}})
+async def get_job(job_id: str, jobs: JobQueue = Depends(get_job_queue)):
+    job = await jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="작업을 찾을 수 없습니다.",
+        )
+    return job
+
+
+async def extract_batch_item(item: BatchItem) -> str:
+    if item.extractedText is not None:
+        text = item.extractedText
+    else:
+        text = (await get_processor().process(str(item.fileUrl), item.fileType)).extractedText
+    ensure_text_size(text)
+    return text
+
+
+@pipeline_routes.post(
+    "/api/batches",
+    response_class=StreamingResponse,
+    responses={413: {"model": ErrorResponse}},
+)
+async def submit_batch(
+    payload: Annotated[BatchRequest, Body(...)],
+    request: Request,
+    idempotency_key: Annotated[str | None, Header(alias="Idempotency-Key", max_length=128)] = None,
+    batches: BatchRunner = Depends(get_batch_runner),
+    limiter: RateLimiter = Depends(get_rate_limiter),
+):
+    # 배치 하나가 문서 수와 관계없이 요청 한 번으로 계산된다. 결과는 NDJSON 으로 흘려보내고,
+    # 연결이 끊기면 /api/batches/{batchId}/results?after=<마지막 seq> 로 이어 받는다.
+    await limiter.check(request, "ai")
+    batch = await batches.submit(payload, idempotency_key, limiter.client_key(request))
+
+    async def lines():
+        yield {"type": "batch", **batch.model_dump(mode="json")}
+        async for line in batches.stream(batch.batchId):
+            yield line
+
+    return ndjson_response(lines(), headers={"X-Batch-Id": batch.batchId})
+
+
+@pipeline_routes.get("/api/batches/{batch_id}", response_model=BatchStatus, responses={404: {"model": ErrorResponse}})
+async def get_batch(batch_id: str, batches: BatchRunner = Depends(get_batch_runner)):
+    batch = await batches.get(batch_id)
+    if batch is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="배치를 찾을 수 없습니다.",
+        )
+    return batch
+
+
+@pipeline_routes.get("/api/batches/{batch_id}/results", response_class=StreamingResponse, responses={404: {"model": ErrorResponse}})
+async def get_batch_results(
+    batch_id: str,
+    after: Annotated[int, Query(ge=0)] = 0,
+    follow: bool = True,
+    batches: BatchRunner = Depends(get_batch_runner),
+):
+    if await batches.store.get(batch_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="배치를 찾을 수 없습니다.",
+        )
+    return ndjson_response(batches.stream(batch_id, after, follow), headers={"X-Batch-Id": batch_id})
+
+
+if serves(role, "document"):
+    app.include_router(document_routes)
+if serves(role, "ai"):
+    app.include_router(ai_routes)
+if role == "all":
+    app.include_router(pipeline_routes)
+
+
+def service_stats() -> dict:
+    return {
+        "documentWorkers": get_worker_pool().stats(),
+        "officePool": get_office_pool().stats(),
+        "extractionCache": get_extraction_cache().stats(),
+        "objectStorage": get_object_storage().stats() if get_object_storage() is not None else None,
+        "responseCache": get_response_cache().stats(),
+        "httpPools": get_http_clients().stats(),
+        "jobs": get_job_queue().stats(),
+        "jobIndex": get_job_index().stats(),
+        "batches": get_batch_runner().stats(),
+        "rateLimit": get_rate_limiter().stats(),
+        "aiParsing": parse_stats(),
+        "aiSections": section_stats(),
+        "llm": get_llm_governor().stats(),
+    }
+
+
+_metrics_registry = build_registry(service_stats)
 
 
 @app.get("/health")
 async def health() -> dict:
-    return {"status": "ok"}
+    return {"status": "ok", "role": role, "preloaded": _preloaded.is_set(), **service_stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    body, content_type = render_metrics(_metrics_registry)
+    return Response(content=body, media_type=content_type)
 
 
 __all__ = ["app"]
\ No newline at end of file
@@ -0,0 +1,244 @@
+import json
+import logging
+import os
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+STAGE_SECONDS = Histogram(
+    "resume_document_stage_seconds",
+    "Time spent in each DocumentProcessor stage",
+    ["stage", "outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+PDF_PAGES = Counter(
+    "resume_pdf_pages_total",
+    "PDF pages extracted, by the engine that produced the final text",
+    ["engine"],
+)
+AI_REQUEST_SECONDS = Histogram(
+    "resume_ai_request_seconds",
+    "End-to-end AiClient call time including queueing and retries",
+    ["operation", "outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+LLM_QUEUE_SECONDS = Histogram(
+    "resume_llm_queue_seconds",
+    "Time waiting for LLM concurrency slots and token budget",
+    ["upstream"],
+    buckets=_LATENCY_BUCKETS,
+)
+LLM_ATTEMPT_SECONDS = Histogram(
+    "resume_llm_attempt_seconds",
+    "Provider time per LLM attempt",
+    ["upstream", "outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "resume_llm_tokens_total",
+    "Tokens reported by the provider",
+    ["model", "kind"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "resume_http_request_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "resume_http_requests_in_flight",
+    "HTTP requests currently being handled",
+    multiprocess_mode="livesum",
+)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "requestId": request_id_var.get(),
+        }
+        for key in ("method", "route", "status", "durationMs"):
+            if hasattr(record, key):
+                entry[key] = getattr(record, key)
+        if record.exc_info:
+            entry["exception"] = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging() -> None:
+    handler = logging.StreamHandler()
+    if settings.log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(settings.log_level)
+    # uvicorn 로그도 같은 형식으로 내보낸다. 접근 로그는 요청 id 와 지연 시간을 담은 미들웨어 로그가 대신한다.
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    logging.getLogger("uvicorn.access").disabled = True
+
+
+@lru_cache()
+def _tracer() -> Optional[Any]:
+    # 스팬을 내보내려면 opentelemetry-sdk 와 exporter 를 설정해야 한다(예: opentelemetry-instrument).
+    if not settings.otel_enabled:
+        return None
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        logger.warning("OTEL_ENABLED=1 but opentelemetry-api is not installed; tracing disabled")
+        return None
+    return trace.get_tracer("resume-ai-service")
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    tracer = _tracer()
+    if tracer is None:
+        yield
+        return
+    with tracer.start_as_current_span(name, attributes=attributes):
+        yield
+
+
+@contextmanager
+def _timed(histogram: Histogram, span_name: str, labels: Dict[str, str]) -> Iterator[None]:
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        with span(span_name, **labels):
+            yield
+        outcome = "ok"
+    finally:
+        histogram.labels(outcome=outcome, **labels).observe(time.perf_counter() - started)
+
+
+def stage(name: str):
+    return _timed(STAGE_SECONDS, f"document.{name}", {"stage": name})
+
+
+def ai_request(operation: str):
+    return _timed(AI_REQUEST_SECONDS, f"ai.{operation}", {"operation": operation})
+
+
+def record_usage(model: Optional[str], usage: Any) -> None:
+    if usage is None:
+        return
+    model = model or "unknown"
+    LLM_TOKENS.labels(model=model, kind="prompt").inc(getattr(usage, "input_tokens", 0) or 0)
+    LLM_TOKENS.labels(model=model, kind="completion").inc(getattr(usage, "output_tokens", 0) or 0)
+
+
+class ServiceStatsCollector:
+    # 각 컴포넌트가 이미 /health 용으로 세는 값을 스크레이프 시점에 Prometheus 형식으로 바꾼다.
+    def __init__(self, snapshot: Callable[[], Dict[str, Any]]) -> None:
+        self.snapshot = snapshot
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        stats = self.snapshot()
+
+        cache = CounterMetricFamily(
+            "resume_cache_lookups", "Cache lookups by result", labels=["cache", "result"]
+        )
+        extraction = stats["extractionCache"]
+        cache.add_metric(["extraction", "hit"], extraction["hits"])
+        cache.add_metric(["extraction", "disk_hit"], extraction["diskHits"])
+        cache.add_metric(["extraction", "miss"], extraction["misses"])
+        response = stats["responseCache"]
+        cache.add_metric(["response", "hit"], response["hits"])
+        cache.add_metric(["response", "miss"], response["misses"])
+        cache.add_metric(["response", "coalesced"], response["coalesced"])
+        yield cache
+
+        rejected = CounterMetricFamily(
+            "resume_rate_limit_rejections", "Requests rejected by the rate limiter", labels=["endpoint_class"]
+        )
+        for endpoint_class, count in stats["rateLimit"]["rejected"].items():
+            rejected.add_metric([endpoint_class], count)
+        yield rejected
+
+        workers = stats["documentWorkers"]
+        pool_rejected = CounterMetricFamily(
+            "resume_document_pool_rejections", "Document jobs rejected because the worker queue was full"
+        )
+        pool_rejected.add_metric([], workers["rejected"])
+        yield pool_rejected
+
+        parse_failures = CounterMetricFamily(
+            "resume_ai_parse_failures", "AI responses that failed JSON/schema validation", labels=["operation"]
+        )
+        for operation, count in stats["aiParsing"]["failures"].items():
+            parse_failures.add_metric([operation], count)
+        yield parse_failures
+
+        in_flight = GaugeMetricFamily(
+            "resume_in_flight", "Work currently in progress or queued", labels=["component", "state"]
+        )
+        in_flight.add_metric(["document_workers", "running"], workers["busyWorkers"])
+        in_flight.add_metric(["document_workers", "queued"], workers["queueDepth"])
+        in_flight.add_metric(["llm", "running"], stats["llm"]["inFlight"])
+        in_flight.add_metric(["ai_cache", "computing"], response["inflight"])
+        in_flight.add_metric(["jobs", "running"], stats["jobs"]["running"])
+        in_flight.add_metric(["jobs", "queued"], stats["jobs"]["queued"])
+        in_flight.add_metric(["batches", "running"], stats["batches"]["running"])
+        yield in_flight
+
+        breakers = GaugeMetricFamily(
+            "resume_llm_circuit_open", "1 when the upstream circuit breaker is not closed", labels=["upstream"]
+        )
+        for upstream, breaker in stats["llm"]["breakers"].items():
+            breakers.add_metric([upstream], 0 if breaker["state"] == "closed" else 1)
+        yield breakers
+
+
+def build_registry(snapshot: Callable[[], Dict[str, Any]]) -> CollectorRegistry:
+    # PROMETHEUS_MULTIPROC_DIR 가 있으면 여러 워커 프로세스의 히스토그램을 합친다.
+    # 컴포넌트 통계는 프로세스마다 따로라서 스크레이프를 받은 프로세스의 값만 나온다.
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    registry.register(ServiceStatsCollector(snapshot))
+    return registry
+
+
+def render_metrics(registry: CollectorRegistry) -> Tuple[bytes, str]:
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -1,30 +1,184 @@
+import ipaddress
+import logging
+import math
 import time
-from collections import defaultdict
-from typing import DefaultDict
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Tuple
 
 from fastapi import HTTPException, Request, status
 
-RATE_LIMIT_SECONDS = 1.0
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+class BucketStore(ABC):
+    # 토큰 하나를 꺼내는 데 성공하면 0, 아니면 다음 토큰까지 기다려야 하는 초를 돌려준다.
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        ...
+
+    def size(self) -> int:
+        return 0
+
+
+class MemoryBucketStore(BucketStore):
+    def __init__(self, idle_ttl: float, max_keys: int) -> None:
+        self.idle_ttl = idle_ttl
+        self.max_keys = max_keys
+        # key -> (남은 토큰, 마지막 갱신 시각). 최근에 쓴 키가 뒤로 가므로 앞쪽부터 만료 검사를 한다.
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        self._evict(now)
+        tokens, updated_at = self._buckets.pop(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated_at) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        return wait
+
+    def _evict(self, now: float) -> None:
+        while self._buckets:
+            key, (_, updated_at) = next(iter(self._buckets.items()))
+            if now - updated_at < self.idle_ttl and len(self._buckets) < self.max_keys:
+                break
+            del self._buckets[key]
+
+    def size(self) -> int:
+        return len(self._buckets)
+
+
+_TOKEN_BUCKET_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], ttl)
+return tostring(wait)
+"""
+
+
+class RedisBucketStore(BucketStore):
+    def __init__(self, url: str, idle_ttl: float, prefix: str = "rate:") -> None:
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the redis package") from exc
+        self.prefix = prefix
+        self.idle_ttl = int(math.ceil(idle_ttl))
+        self._redis = redis_asyncio.from_url(url)
+        self._script = self._redis.register_script(_TOKEN_BUCKET_LUA)
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        # 버킷 갱신을 Lua 스크립트 하나로 처리해 여러 워커가 같은 키를 동시에 써도 원자적이다.
+        try:
+            result = await self._script(keys=[self.prefix + key], args=[rate, burst, self.idle_ttl])
+        except Exception as exc:
+            logger.warning("rate limit store unavailable, allowing request: %s", exc)
+            return 0.0
+        return float(result)
+
+
+def _parse_networks(raw: str) -> List[ipaddress.IPv4Network | ipaddress.IPv6Network]:
+    networks = []
+    for item in raw.split(","):
+        item = item.strip()
+        if item:
+            networks.append(ipaddress.ip_network(item, strict=False))
+    return networks
 
 
 class RateLimiter:
-    def __init__(self) -> None:
-        self._last_called: DefaultDict[str, float] = defaultdict(float)
+    def __init__(
+        self,
+        store: BucketStore,
+        budgets: Dict[str, Tuple[float, int]],
+        trusted_proxies: str = "",
+    ) -> None:
+        self.store = store
+        # 엔드포인트 종류 -> (초당 충전 토큰 수, 최대 버스트)
+        self.budgets = budgets
+        self.trust_all_proxies = trusted_proxies.strip() == "*"
+        self.trusted_proxies = [] if self.trust_all_proxies else _parse_networks(trusted_proxies)
+        self.rejected: Dict[str, int] = {name: 0 for name in budgets}
 
-    def check(self, request: Request) -> None:
+    def _is_trusted(self, host: str) -> bool:
+        if self.trust_all_proxies:
+            return True
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted_proxies)
+
+    def client_key(self, request: Request) -> str:
         client_ip = request.client.host if request.client else "anonymous"
-        now = time.time()
-        elapsed = now - self._last_called[client_ip]
-        if elapsed < RATE_LIMIT_SECONDS:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded and self._is_trusted(client_ip):
+            # 오른쪽부터 신뢰하는 프록시를 건너뛰고 처음 만나는 주소가 실제 클라이언트다.
+            for hop in reversed([part.strip() for part in forwarded.split(",") if part.strip()]):
+                client_ip = hop
+                if not self._is_trusted(hop):
+                    break
+        return client_ip
+
+    async def check(self, request: Request, endpoint_class: str = "ai") -> None:
+        rate, burst = self.budgets[endpoint_class]
+        key = f"{endpoint_class}:{self.client_key(request)}"
+        wait = await self.store.take(key, rate, burst)
+        if wait > 0:
+            self.rejected[endpoint_class] += 1
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail="Rate limit exceeded. Please try again shortly.",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
             )
-        self._last_called[client_ip] = now
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.store).__name__,
+            "trackedClients": self.store.size(),
+            "rejected": dict(self.rejected),
+        }
+
+
+def _build_store() -> BucketStore:
+    if settings.rate_limit_backend == "redis":
+        return RedisBucketStore(settings.rate_limit_redis_url, settings.rate_limit_idle_ttl)
+    if settings.rate_limit_backend == "memory":
+        return MemoryBucketStore(settings.rate_limit_idle_ttl, settings.rate_limit_max_keys)
+    raise RuntimeError(f"Unknown RATE_LIMIT_BACKEND: {settings.rate_limit_backend}")
 
 
-_limiter = RateLimiter()
+_limiter = RateLimiter(
+    store=_build_store(),
+    budgets={
+        "document": (settings.rate_limit_document_rate, settings.rate_limit_document_burst),
+        "ai": (settings.rate_limit_ai_rate, settings.rate_limit_ai_burst),
+    },
+    trusted_proxies=settings.rate_limit_trusted_proxies,
+)
 
 
 def get_rate_limiter() -> RateLimiter:
-    return _limiter
\ No newline at end of file
+    return _limiter
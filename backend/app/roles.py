@@ -0,0 +1,37 @@
+import importlib
+import logging
+import time
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# SERVICE_ROLE 로 한 프로세스가 맡을 라우트 묶음을 고른다.
+#   all      모든 라우트(기본값). 작업 큐와 일괄 평가처럼 두 묶음을 같이 쓰는 파이프라인도 여기서만 돈다.
+#   document 문서 추출(/api/document/*). PDF·OCR 스택만 읽는다.
+#   ai       LLM 호출(/api/ai/*)과 공고 매칭(/api/jobs/match). openai 만 읽는다.
+ROLES = ("all", "document", "ai")
+
+# 역할별로 미리 읽어 둘 무거운 모듈. 이 모듈들은 쓰는 함수 안에서 임포트하므로 app.main 을 임포트해도 읽히지 않는다.
+ROLE_MODULES: Dict[str, Tuple[str, ...]] = {
+    "document": ("pypdf", "pdfplumber", "pdf2image", "pytesseract"),
+    "ai": ("openai",),
+}
+
+
+def serves(role: str, group: str) -> bool:
+    return role == "all" or role == group
+
+
+def import_stack(role: str) -> float:
+    # 역할에 필요한 모듈을 읽고 걸린 시간을 돌려준다. gunicorn 이 워커를 fork 하기 전에 부르면
+    # 워커들이 모듈을 copy-on-write 로 나눠 쓰고, 워커 안에서 부르면 첫 요청이 임포트 비용을 내지 않는다.
+    started = time.perf_counter()
+    for group, modules in ROLE_MODULES.items():
+        if not serves(role, group):
+            continue
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except ImportError as exc:
+                logger.warning("failed to preload %s: %r", name, exc)
+    return time.perf_counter() - started
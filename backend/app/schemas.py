@@ -1,7 +1,7 @@
-from datetime import datetime
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Annotated, Dict, List, Optional
 
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, model_validator
 
 
 class ProcessRequest(BaseModel):
@@ -16,6 +16,7 @@ class ProcessedDocument(BaseModel):
     extractedText: str
     pageCount: int
     pdfUrl: Optional[str] = None
+    storagePath: Optional[str] = None
 
 
 class EvaluateRequest(BaseModel):
@@ -54,6 +55,34 @@ class EvaluateResponse(BaseModel):
     improvedVersion: str
 
 
+class SectionEvaluation(BaseModel):
+    overallScore: int
+    rubricScores: RubricScores
+    strengths: List[str]
+    weaknesses: List[str]
+    actionableEdits: List[ActionableEdit]
+    redFlags: List[str]
+    summary: str
+    improved: str
+
+
+class SectionResult(BaseModel):
+    sectionId: str
+    heading: Optional[str] = None
+    changed: bool
+    reanalyzed: bool
+    evaluation: SectionEvaluation
+
+
+class IncrementalEvaluateRequest(EvaluateRequest):
+    previousSectionIds: List[str] = Field(default_factory=list, max_length=1000)
+
+
+class IncrementalEvaluateResponse(EvaluateResponse):
+    sections: List[SectionResult]
+    removedSectionIds: List[str]
+
+
 class SummarizeRequest(BaseModel):
     extractedText: str
     language: str = Field(pattern="^(ko|en)$")
@@ -81,6 +110,131 @@ class ProofreadResponse(BaseModel):
     comments: List[ProofreadComment]
 
 
+class JobRequest(ProcessRequest):
+    callbackUrl: Optional[HttpUrl] = None
+
+
+class JobResult(BaseModel):
+    document: ProcessedDocument
+    evaluation: EvaluateResponse
+
+
+class JobStatus(BaseModel):
+    jobId: str
+    status: str = Field(pattern="^(queued|running|succeeded|failed)$")
+    idempotencyKey: Optional[str] = None
+    createdAt: datetime
+    updatedAt: datetime
+    result: Optional[JobResult] = None
+    error: Optional[str] = None
+
+
+class JobMatchRequest(BaseModel):
+    extractedText: str
+    regions: List[str] = Field(default_factory=list, max_length=20)
+    ncsCategories: List[str] = Field(default_factory=list, max_length=30)
+    deadlineFrom: Optional[date] = None
+    deadlineTo: Optional[date] = None
+    limit: int = Field(default=10, ge=1, le=50)
+
+
+class JobPostingMatch(BaseModel):
+    postingId: str
+    title: str
+    institution: Optional[str] = None
+    regions: List[str]
+    ncsCategories: List[str]
+    hireTypes: List[str]
+    deadline: Optional[date] = None
+    url: Optional[str] = None
+    score: float
+
+
+class JobMatchResponse(BaseModel):
+    matches: List[JobPostingMatch]
+    candidates: int
+    indexVersion: str
+
+
+AnalyzeOperation = Annotated[str, Field(pattern="^(evaluate|summarize|proofread)$")]
+
+
+class AnalyzeRequest(ProcessRequest):
+    operations: List[AnalyzeOperation] = Field(
+        default_factory=lambda: ["evaluate", "summarize", "proofread"],
+        min_length=1,
+    )
+
+
+class OperationError(BaseModel):
+    status: int
+    detail: str
+
+
+class AnalyzeResponse(BaseModel):
+    document: ProcessedDocument
+    evaluation: Optional[EvaluateResponse] = None
+    summary: Optional[SummarizeResponse] = None
+    proofread: Optional[ProofreadResponse] = None
+    errors: Dict[str, OperationError] = Field(default_factory=dict)
+
+
+class BatchItem(BaseModel):
+    itemId: Optional[str] = Field(default=None, max_length=128)
+    fileUrl: Optional[HttpUrl | str] = None
+    fileType: Optional[str] = Field(default=None, pattern="^(pdf|hwp)$")
+    extractedText: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_source(self) -> "BatchItem":
+        if (self.fileUrl is None) == (self.extractedText is None):
+            raise ValueError("fileUrl 과 extractedText 중 하나만 지정해야 합니다.")
+        if self.fileUrl is not None and self.fileType is None:
+            raise ValueError("fileUrl 을 지정하면 fileType 도 필요합니다.")
+        return self
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem] = Field(min_length=1)
+    docKind: str = Field(pattern="^(resume|coverLetter)$")
+    language: str = Field(pattern="^(ko|en)$")
+    targetRole: Optional[str] = None
+    # offline 은 공급자의 Batch API 로 보내 비용을 줄인다. 결과는 최대 24시간 뒤에 나온다.
+    mode: str = Field(default="online", pattern="^(online|offline)$")
+
+
+class BatchItemResult(BaseModel):
+    seq: int = 0
+    index: int
+    itemId: str
+    status: str = Field(pattern="^(succeeded|failed)$")
+    evaluation: Optional[EvaluateResponse] = None
+    error: Optional[OperationError] = None
+
+
+class BatchRankEntry(BaseModel):
+    rank: int
+    itemId: str
+    overallScore: int
+    rubricTotal: int
+    rubricScores: RubricScores
+
+
+class BatchStatus(BaseModel):
+    batchId: str
+    status: str = Field(pattern="^(queued|running|succeeded|failed)$")
+    mode: str
+    idempotencyKey: Optional[str] = None
+    total: int
+    succeeded: int = 0
+    failed: int = 0
+    providerBatchId: Optional[str] = None
+    createdAt: datetime
+    updatedAt: datetime
+    error: Optional[str] = None
+    ranking: List[BatchRankEntry] = Field(default_factory=list)
+
+
 class ErrorResponse(BaseModel):
     detail: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
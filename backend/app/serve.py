@@ -0,0 +1,108 @@
+import argparse
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict
+
+from gunicorn.app.base import BaseApplication
+
+from app.config import get_settings
+from app.roles import import_stack
+
+logger = logging.getLogger(__name__)
+
+# 운영용 실행기. gunicorn 마스터가 app.main 과 역할별 스택을 한 번 읽은 뒤(preload_app) uvicorn 워커를 fork 하므로
+# 워커마다 임포트를 반복하지 않고, 읽기만 하는 모듈 메모리는 copy-on-write 로 나눠 쓴다.
+#   SERVICE_ROLE=document python -m app.serve --port 8000
+# 워커가 둘 이상이면 RATE_LIMIT_BACKEND=redis(RATE_LIMIT_REDIS_URL)로 레이트 리미트를 워커끼리 나눠야 한다.
+# 개발 중에는 지금처럼 uvicorn app.main:app --reload 를 써도 된다.
+
+
+def default_workers(role: str, cpus: int) -> int:
+    # 문서 추출은 DOC_WORKERS 프로세스 풀에서 돌기 때문에 웹 워커는 적어도 된다.
+    # AI 라우트는 대부분 LLM 응답을 기다리지만 JSON 파싱과 청크 병합이 CPU 를 쓰므로 코어마다 하나씩 둔다.
+    if role == "document":
+        return max(1, cpus // 4)
+    return max(1, cpus)
+
+
+def prepare_environment(workers: int) -> None:
+    # app.main 을 임포트하기 전에 불러야 한다. 워커끼리 나눠 가져야 하는 설정의 기본값을 채운다.
+    settings = get_settings()
+    cpus = os.cpu_count() or 1
+    if not settings.doc_workers:
+        # 워커마다 문서 풀을 따로 띄우므로 합쳐서 코어 수를 넘지 않게 나눈다.
+        os.environ["DOC_WORKERS"] = str(max(1, cpus // workers))
+    if workers > 1:
+        # 메모리 작업 큐는 워커마다 따로라 다른 워커로 간 GET /api/jobs/{id} 가 404 가 된다.
+        os.environ.setdefault("JOB_BACKEND", "sqlite")
+        # 히스토그램을 워커끼리 합치려면 prometheus_client 를 임포트하기 전에 정해져 있어야 한다.
+        if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="resume-metrics-")
+        # 레이트 리미트 버킷은 워커끼리 나눌 저장소가 redis 뿐이다. 메모리 버킷이면 실제 한도가 워커 수만큼 커진다.
+        if settings.rate_limit_backend == "memory":
+            logger.warning(
+                "RATE_LIMIT_BACKEND=memory with %s workers: each worker keeps its own buckets, so clients get "
+                "%sx the configured rate limit. Set RATE_LIMIT_BACKEND=redis and RATE_LIMIT_REDIS_URL, "
+                "or WEB_CONCURRENCY=1.",
+                workers,
+                workers,
+            )
+    get_settings.cache_clear()
+
+
+def _child_exit(server: Any, worker: Any) -> None:
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+class ServiceApplication(BaseApplication):
+    def __init__(self, options: Dict[str, Any]) -> None:
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # preload_app 이면 마스터에서 한 번만 불린다.
+        role = get_settings().service_role
+        started = time.perf_counter()
+        from app.main import app
+
+        import_stack(role)
+        logger.info("preloaded app.main and %s stack in %.1f ms", role, (time.perf_counter() - started) * 1000)
+        return app
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run the service under gunicorn with preloaded uvicorn workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=settings.web_workers)
+    parser.add_argument("--timeout", type=int, default=int(os.getenv("WEB_TIMEOUT", "120")))
+    args = parser.parse_args()
+    workers = args.workers or default_workers(settings.service_role, os.cpu_count() or 1)
+    prepare_environment(workers)
+    ServiceApplication(
+        {
+            "bind": f"{args.host}:{args.port}",
+            "workers": workers,
+            "worker_class": "uvicorn.workers.UvicornWorker",
+            "preload_app": True,
+            "timeout": args.timeout,
+            "graceful_timeout": 30,
+            "keepalive": 5,
+            "child_exit": _child_exit,
+            "loglevel": settings.log_level.lower(),
+        }
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,599 @@
+import asyncio
 import json
-from typing import Any, Dict, List
+import logging
+import re
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Type, TypeVar
 
 from fastapi import HTTPException, status
-from openai import AsyncOpenAI
+from pydantic import BaseModel, ValidationError
 
 
 from app.config import get_settings
+from app.observability import ai_request, record_usage
 from app.schemas import (
     ActionableEdit,
     EvaluateRequest,
     EvaluateResponse,
+    EvaluationReport,
+    IncrementalEvaluateRequest,
+    IncrementalEvaluateResponse,
     ProofreadComment,
     ProofreadRequest,
     ProofreadResponse,
     RubricScores,
+    SectionEvaluation,
+    SectionResult,
     SummarizeRequest,
     SummarizeResponse,
 )
+from app.services.http_clients import get_http_clients
+from app.services.llm_governor import Upstream, get_llm_governor
+from app.services.response_cache import ResponseCache, get_response_cache
+from app.utils.chunking import Section, chunk_text, estimate_tokens, split_sections
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+# 프롬프트나 응답 스키마를 바꾸면 올린다. 이전 응답 캐시는 더 이상 맞지 않게 된다.
+PROMPT_VERSION = "3"
+
+M = TypeVar("M", bound=BaseModel)
+
+
+# 엔드포인트별 AI 응답 파싱 실패 / 복구 성공 횟수
+PARSE_FAILURES: Dict[str, int] = defaultdict(int)
+PARSE_REPAIRS: Dict[str, int] = defaultdict(int)
+# 섹션 단위 재평가에서 새로 분석한 섹션 / 저장된 결과를 재사용한 섹션 수
+SECTION_RESULTS: Dict[str, int] = {"analyzed": 0, "reused": 0}
+# 섹션 결과를 합칠 때 목록 필드마다 남기는 최대 개수
+_AGGREGATE_LIMIT = 8
+
+_FENCED_JSON = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+# 스트리밍 요청이 청크로 나뉘어 돌 때 map 단계에서 청크 하나가 끝날 때마다 부른다.
+_chunk_done: ContextVar[Optional[Callable[[], None]]] = ContextVar("chunk_done", default=None)
+
+
+class _ParseError(Exception):
+    pass
+
+
+def extract_json(text: str) -> str:
+    # 코드블록으로 감싸거나 앞뒤에 설명을 붙인 응답에서도 JSON 객체 부분만 꺼낸다.
+    text = text.strip()
+    fenced = _FENCED_JSON.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+    if text.startswith("{"):
+        return text
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        return text[start:end + 1]
+    return text
+
+
+def parse_stats() -> dict:
+    return {"failures": dict(PARSE_FAILURES), "repaired": dict(PARSE_REPAIRS)}
+
+
+def section_stats() -> dict:
+    return dict(SECTION_RESULTS)
+
+
+class _SectionAnalysis(BaseModel):
+    condensed: str
+    improved: str
+
+
+class _ReportEnvelope(BaseModel):
+    report: EvaluationReport
+
 
 class AiClient:
-    def __init__(self) -> None:
-        if not settings.openai_api_key:
-            raise RuntimeError("OPENAI_API_KEY is required")
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key, base_url=settings.api_base_url)
+    def __init__(self, client: Optional["AsyncOpenAI"] = None) -> None:
+        self.client = client or get_http_clients().openai()
+        self.cache: ResponseCache = get_response_cache()
+        self.governor = get_llm_governor()
+        self.upstreams: List[Upstream] = [Upstream("primary", settings.openai_model, self.client)]
+        fallback = get_http_clients().openai_fallback()
+        if fallback is not None:
+            self.upstreams.append(
+                Upstream("fallback", settings.openai_fallback_model or settings.openai_model, fallback)
+            )
+
+    def _cache_key(self, operation: str, payload: Any) -> str:
+        return self.cache.make_key(
+            operation,
+            text=payload.extractedText,
+            language=payload.language,
+            docKind=getattr(payload, "docKind", None),
+            targetRole=getattr(payload, "targetRole", None),
+            model=settings.openai_model,
+            promptVersion=PROMPT_VERSION,
+        )
 
     async def evaluate(self, payload: EvaluateRequest) -> EvaluateResponse:
-        prompt = self._build_eval_prompt(payload)
-        response_text = await self._chat(prompt)
+        with ai_request("evaluate"):
+            return await self.cache.get_or_compute(
+                self._cache_key("evaluate", payload),
+                EvaluateResponse,
+                lambda: self._evaluate(payload),
+            )
+
+    async def summarize(self, payload: SummarizeRequest) -> SummarizeResponse:
+        with ai_request("summarize"):
+            return await self.cache.get_or_compute(
+                self._cache_key("summarize", payload),
+                SummarizeResponse,
+                lambda: self._summarize(payload),
+            )
+
+    async def proofread(self, payload: ProofreadRequest) -> ProofreadResponse:
+        with ai_request("proofread"):
+            return await self.cache.get_or_compute(
+                self._cache_key("proofread", payload),
+                ProofreadResponse,
+                lambda: self._proofread(payload),
+            )
+
+    async def evaluate_sections(self, payload: IncrementalEvaluateRequest) -> IncrementalEvaluateResponse:
+        # 문서를 제목 기준 섹션으로 나눠 섹션마다 따로 평가하고 결과를 응답 캐시에 둔다.
+        # 한 문단만 고쳐 다시 보내면 그 섹션만 모델을 부르고 나머지는 저장된 결과를 합친다.
+        with ai_request("evaluate_sections"):
+            sections = split_sections(
+                payload.extractedText, settings.ai_section_tokens, settings.ai_section_min_tokens
+            )
+            limit = asyncio.Semaphore(settings.ai_chunk_concurrency)
+            previous = set(payload.previousSectionIds)
+
+            async def run(section: Section) -> SectionResult:
+                analyzed = False
+
+                async def compute() -> SectionEvaluation:
+                    nonlocal analyzed
+                    analyzed = True
+                    async with limit:
+                        return await self._chat_json(
+                            "evaluate",
+                            self._build_section_eval_prompt(payload, section.text),
+                            SectionEvaluation,
+                            self._section_evaluation_format(),
+                        )
+
+                key = self._cache_key(
+                    "evaluate_section", payload.model_copy(update={"extractedText": section.text})
+                )
+                evaluation = await self.cache.get_or_compute(key, SectionEvaluation, compute)
+                SECTION_RESULTS["analyzed" if analyzed else "reused"] += 1
+                return SectionResult(
+                    sectionId=section.sectionId,
+                    heading=section.heading,
+                    changed=section.sectionId not in previous,
+                    reanalyzed=analyzed,
+                    evaluation=evaluation,
+                )
+
+            results = await asyncio.gather(*(run(section) for section in sections))
+            current = {section.sectionId for section in sections}
+            return IncrementalEvaluateResponse(
+                report=self._aggregate_sections(sections, results),
+                improvedVersion="\n\n".join(result.evaluation.improved for result in results),
+                sections=results,
+                removedSectionIds=[
+                    section_id
+                    for section_id in dict.fromkeys(payload.previousSectionIds)
+                    if section_id not in current
+                ],
+            )
+
+    def _aggregate_sections(self, sections: List[Section], results: List[SectionResult]) -> EvaluationReport:
+        # 점수는 섹션 길이(토큰 수)로 가중 평균한다. 모델을 다시 부르지 않고 합친다.
+        weights = [max(1, estimate_tokens(section.text)) for section in sections]
+        total = sum(weights) or 1
+        evaluations = [result.evaluation for result in results]
+
+        def weighted(score: Callable[[SectionEvaluation], int]) -> int:
+            return round(sum(score(item) * weight for item, weight in zip(evaluations, weights)) / total)
+
+        def merged(items: Callable[[SectionEvaluation], List[Any]]) -> List[Any]:
+            seen: Dict[str, Any] = {}
+            for evaluation in evaluations:
+                for item in items(evaluation):
+                    seen.setdefault(item if isinstance(item, str) else item.model_dump_json(), item)
+            return list(seen.values())[:_AGGREGATE_LIMIT]
+
+        rubric = {
+            field: weighted(lambda item, field=field: getattr(item.rubricScores, field))
+            for field in RubricScores.model_fields
+        }
+        return EvaluationReport(
+            overallScore=weighted(lambda item: item.overallScore),
+            rubricScores=RubricScores(**rubric),
+            strengths=merged(lambda item: item.strengths),
+            weaknesses=merged(lambda item: item.weaknesses),
+            actionableEdits=merged(lambda item: item.actionableEdits),
+            redFlags=merged(lambda item: item.redFlags),
+            summary=" ".join(list(dict.fromkeys(evaluation.summary for evaluation in evaluations))[:_AGGREGATE_LIMIT]),
+        )
+
+    def batch_request_body(self, payload: EvaluateRequest) -> Optional[Dict[str, Any]]:
+        # Batch API 입력 파일 한 줄에 들어갈 /v1/responses 요청 본문.
+        # map-reduce 가 필요한 긴 문서는 요청 하나로 보낼 수 없으므로 None 을 돌려준다.
+        if len(self._chunks(payload.extractedText)) > 1:
+            return None
+        return {
+            "model": settings.openai_model,
+            "input": self._input(self._build_eval_prompt(payload)),
+            **self._text_format(self._evaluation_format()),
+        }
+
+    async def parse_batch_output(self, response_text: str) -> EvaluateResponse:
+        return await self._parse_or_repair(
+            "evaluate", response_text, EvaluateResponse, self._evaluation_format()
+        )
+
+    def _chunks(self, text: str) -> List[str]:
+        if estimate_tokens(text) <= settings.ai_single_pass_tokens:
+            return [text]
+        return chunk_text(text, settings.ai_chunk_tokens)
 
+    async def _map_chunks(self, chunks: List[str], run: Callable[[int, str], Awaitable[M]]) -> List[M]:
+        # 청크들을 동시에 보내 전체 지연이 가장 느린 청크 하나에 맞춰지도록 한다.
+        limit = asyncio.Semaphore(settings.ai_chunk_concurrency)
+
+        async def bounded(index: int, chunk: str) -> M:
+            async with limit:
+                result = await run(index, chunk)
+            done = _chunk_done.get()
+            if done is not None:
+                done()
+            return result
+
+        return await asyncio.gather(*(bounded(index, chunk) for index, chunk in enumerate(chunks)))
+
+    async def _evaluate(self, payload: EvaluateRequest) -> EvaluateResponse:
+        chunks = self._chunks(payload.extractedText)
+        if len(chunks) == 1:
+            prompt = self._build_eval_prompt(payload)
+            return await self._chat_json("evaluate", prompt, EvaluateResponse, self._evaluation_format())
+
+        # map: 섹션마다 압축본과 개선본을 만든다. reduce: 압축본을 모아 보고서만 평가한다.
+        async def analyze(index: int, chunk: str) -> _SectionAnalysis:
+            prompt = self._build_section_prompt(payload, chunk, index + 1, len(chunks))
+            return await self._chat_json("evaluate", prompt, _SectionAnalysis, self._section_format())
+
+        sections = await self._map_chunks(chunks, analyze)
+        condensed = payload.model_copy(
+            update={"extractedText": "\n\n".join(section.condensed for section in sections)}
+        )
+        prompt = self._build_eval_prompt(condensed, include_improved=False, condensed=True)
+        envelope = await self._chat_json("evaluate", prompt, _ReportEnvelope, self._report_format())
+        return EvaluateResponse(
+            report=envelope.report,
+            improvedVersion="\n\n".join(section.improved for section in sections),
+        )
+
+    async def _summarize(self, payload: SummarizeRequest) -> SummarizeResponse:
+        chunks = self._chunks(payload.extractedText)
+        if len(chunks) == 1:
+            return await self._summarize_once(payload)
+
+        partials = await self._map_chunks(
+            chunks,
+            lambda _, chunk: self._summarize_once(payload.model_copy(update={"extractedText": chunk})),
+        )
+        # reduce: 부분 요약의 불릿과 키워드만 모아 한 번 더 요약한다.
+        merged = "\n".join(
+            [f"- {bullet}" for partial in partials for bullet in partial.bulletSummary]
+            + ["키워드: " + ", ".join(keyword for partial in partials for keyword in partial.keywords)]
+        )
+        return await self._summarize_once(payload.model_copy(update={"extractedText": merged}))
+
+    async def _summarize_once(self, payload: SummarizeRequest) -> SummarizeResponse:
+        prompt = self._build_summary_prompt(payload)
+        return await self._chat_json("summarize", prompt, SummarizeResponse, self._summary_format())
+
+    async def _proofread(self, payload: ProofreadRequest) -> ProofreadResponse:
+        chunks = self._chunks(payload.extractedText)
+        if len(chunks) == 1:
+            return await self._proofread_once(payload)
+
+        partials = await self._map_chunks(
+            chunks,
+            lambda _, chunk: self._proofread_once(payload.model_copy(update={"extractedText": chunk})),
+        )
+        return ProofreadResponse(
+            correctedText="\n\n".join(partial.correctedText for partial in partials),
+            comments=[comment for partial in partials for comment in partial.comments],
+        )
+
+    async def _proofread_once(self, payload: ProofreadRequest) -> ProofreadResponse:
+        prompt = self._build_proofread_prompt(payload)
+        return await self._chat_json("proofread", prompt, ProofreadResponse, self._proofread_format())
+
+    def evaluate_stream(self, payload: EvaluateRequest) -> AsyncIterator[Tuple[str, Any]]:
+        chunks = len(self._chunks(payload.extractedText))
+        if chunks > 1:
+            return self._stream_chunked(
+                "evaluate", self._cache_key("evaluate", payload), EvaluateResponse, lambda: self._evaluate(payload), chunks
+            )
+        return self._stream(
+            "evaluate",
+            self._cache_key("evaluate", payload),
+            self._build_eval_prompt(payload),
+            self._evaluation_format(),
+            EvaluateResponse,
+        )
+
+    def summarize_stream(self, payload: SummarizeRequest) -> AsyncIterator[Tuple[str, Any]]:
+        chunks = len(self._chunks(payload.extractedText))
+        if chunks > 1:
+            return self._stream_chunked(
+                "summarize", self._cache_key("summarize", payload), SummarizeResponse, lambda: self._summarize(payload), chunks
+            )
+        return self._stream(
+            "summarize",
+            self._cache_key("summarize", payload),
+            self._build_summary_prompt(payload),
+            self._summary_format(),
+            SummarizeResponse,
+        )
+
+    def proofread_stream(self, payload: ProofreadRequest) -> AsyncIterator[Tuple[str, Any]]:
+        chunks = len(self._chunks(payload.extractedText))
+        if chunks > 1:
+            return self._stream_chunked(
+                "proofread", self._cache_key("proofread", payload), ProofreadResponse, lambda: self._proofread(payload), chunks
+            )
+        return self._stream(
+            "proofread",
+            self._cache_key("proofread", payload),
+            self._build_proofread_prompt(payload),
+            self._proofread_format(),
+            ProofreadResponse,
+        )
+
+    async def _stream(
+        self,
+        operation: str,
+        key: str,
+        prompt: str,
+        response_format: Optional[Dict[str, Any]],
+        model_cls: Type[M],
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        # ("delta", 텍스트 조각) 을 순서대로 내보내고 마지막에 ("result", 검증된 응답) 을 낸다.
+        with ai_request(f"{operation}_stream"):
+            cached = await self.cache.lookup(key, model_cls)
+            if cached is not None:
+                yield "result", cached.model_dump()
+                return
+
+            chunks: List[str] = []
+            async for delta in self._chat_stream(prompt, response_format):
+                chunks.append(delta)
+                yield "delta", delta
+
+            result = await self._parse_or_repair(operation, "".join(chunks), model_cls, response_format)
+            await self.cache.store(key, result)
+        yield "result", result.model_dump()
+
+    async def _stream_chunked(
+        self,
+        operation: str,
+        key: str,
+        model_cls: Type[M],
+        compute: Callable[[], Awaitable[M]],
+        total: int,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        # 한 번에 보내기엔 긴 문서는 일반 호출과 같은 map-reduce 로 만들고, 델타 대신
+        # ("progress", {"completed", "total"}) 로 끝난 청크 수를 알린 뒤 ("result", 응답) 을 낸다.
+        with ai_request(f"{operation}_stream"):
+            cached = await self.cache.lookup(key, model_cls)
+            if cached is not None:
+                yield "result", cached.model_dump()
+                return
+
+            events: "asyncio.Queue[bool]" = asyncio.Queue()
+            token = _chunk_done.set(lambda: events.put_nowait(True))
+            try:
+                task = asyncio.ensure_future(self.cache.get_or_compute(key, model_cls, compute))
+            finally:
+                _chunk_done.reset(token)
+            task.add_done_callback(lambda _: events.put_nowait(False))
+
+            completed = 0
+            yield "progress", {"completed": completed, "total": total}
+            try:
+                while await events.get():
+                    completed += 1
+                    yield "progress", {"completed": completed, "total": total}
+                result = task.result()
+            finally:
+                task.cancel()
+        yield "result", result.model_dump()
+
+    def _parse_json(self, response_text: str, model_cls: Type[M]) -> M:
         try:
-            json_data = json.loads(response_text)
-        except Exception as exc:
-            print("AI RAW RESPONSE ↓↓↓")
-            print(response_text)
+            json_data = json.loads(extract_json(response_text))
+        except ValueError as exc:
+            raise _ParseError(f"invalid JSON: {exc}") from exc
+        try:
+            return model_cls(**json_data)
+        except (TypeError, ValidationError) as exc:
+            raise _ParseError(f"schema mismatch: {exc}") from exc
+
+    async def _chat_json(
+        self,
+        operation: str,
+        prompt: str,
+        model_cls: Type[M],
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> M:
+        response_text = await self._chat(prompt, response_format)
+        return await self._parse_or_repair(operation, response_text, model_cls, response_format)
+
+    async def _parse_or_repair(
+        self,
+        operation: str,
+        response_text: str,
+        model_cls: Type[M],
+        response_format: Optional[Dict[str, Any]],
+    ) -> M:
+        try:
+            return self._parse_json(response_text, model_cls)
+        except _ParseError as exc:
+            PARSE_FAILURES[operation] += 1
+            logger.warning("AI %s response failed to parse (%s), retrying repair once", operation, exc)
+            error = str(exc)
+
+        # 원문을 다시 보내지 않고 잘못된 응답과 오류만 보내 한 번만 고치게 한다.
+        repaired_text = await self._chat(
+            self._build_repair_prompt(response_text, error), response_format
+        )
+        try:
+            result = self._parse_json(repaired_text, model_cls)
+        except _ParseError as exc:
+            PARSE_FAILURES[operation] += 1
+            logger.warning("AI %s repair failed: %s", operation, exc)
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY,
                 detail="AI 응답을 JSON으로 파싱하지 못했습니다.",
             ) from exc
+        PARSE_REPAIRS[operation] += 1
+        return result
+
+    def _text_format(self, response_format: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # Responses API 의 structured outputs 형식으로 바꾼다. 스키마를 지키는 출력만 생성된다.
+        if response_format is None:
+            return {}
+        schema = response_format["json_schema"]
+        return {
+            "text": {
+                "format": {
+                    "type": "json_schema",
+                    "name": schema["name"],
+                    "schema": schema["schema"],
+                    "strict": True,
+                }
+            }
+        }
+
+    def _request(
+        self, prompt: str, response_format: Optional[Dict[str, Any]], **kwargs: Any
+    ) -> Callable[["AsyncOpenAI", str], Awaitable[Any]]:
+        def request(client: "AsyncOpenAI", model: str) -> Awaitable[Any]:
+            return client.responses.create(
+                model=model,
+                input=self._input(prompt),
+                **self._text_format(response_format),
+                **kwargs,
+            )
 
-        return EvaluateResponse(**json_data)
+        return request
 
-    async def summarize(self, payload: SummarizeRequest) -> SummarizeResponse:
-        prompt = (
+    def _input(self, prompt: str) -> str:
+        return (
+            prompt
+            + "\n\n반드시 JSON 형식으로만 응답하세요. "
+              "설명 문장이나 마크다운 없이 JSON만 출력하세요."
+        )
+
+    def _estimated_tokens(self, prompt: str) -> int:
+        return estimate_tokens(prompt) + settings.llm_output_tokens
+
+    async def _chat(self, prompt: str, response_format: Optional[Dict[str, Any]] = None) -> str:
+        try:
+            completion = await self.governor.call(
+                self.upstreams,
+                self._request(prompt, response_format),
+                self._estimated_tokens(prompt),
+            )
+            record_usage(getattr(completion, "model", None), getattr(completion, "usage", None))
+
+            # SDK 버전에 따라 둘 중 하나가 맞음
+            if hasattr(completion, "output_text") and completion.output_text:
+                return completion.output_text
+
+            return completion.output[0].content[0].text
+
+        except HTTPException:
+            raise
+        except Exception as exc:
+            logger.exception("OpenAI request failed")
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=str(exc),
+            ) from exc
+
+    async def _chat_stream(
+        self, prompt: str, response_format: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        try:
+            events = self.governor.stream(
+                self.upstreams,
+                self._request(prompt, response_format, stream=True),
+                self._estimated_tokens(prompt),
+            )
+            async for event in events:
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+                elif event.type == "response.completed":
+                    record_usage(event.response.model, event.response.usage)
+                elif event.type in ("response.failed", "error"):
+                    raise RuntimeError(getattr(event, "message", None) or event.type)
+        except HTTPException:
+            raise
+        except Exception as exc:
+            logger.exception("OpenAI request failed")
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=str(exc),
+            ) from exc
+
+    def _build_section_prompt(
+        self, payload: EvaluateRequest, chunk: str, index: int, total: int
+    ) -> str:
+        return (
+            f"다음은 {payload.docKind} 문서를 {total}개로 나눈 것 중 {index}번째 부분입니다. "
+            "사실을 추가하지 말고 아래 두 필드를 가진 JSON 객체로 응답하세요.\n"
+            '- "condensed": 평가에 필요한 핵심 내용(경력, 성과, 수치, 기술, 문장 품질의 특징)을 원문 언어로 압축한 글\n'
+            '- "improved": 이 부분을 더 읽기 쉽고 구체적으로 다듬은 개선본\n'
+            f"목표 직무: {payload.targetRole or '미지정'}\n언어: {payload.language}\n본문:\n{chunk}"
+        )
+
+    def _build_section_eval_prompt(self, payload: EvaluateRequest, section: str) -> str:
+        # 섹션 순서나 개수는 넣지 않는다. 같은 섹션이면 위치가 바뀌어도 같은 캐시 결과를 쓰게 하기 위해서다.
+        return (
+            f"다음은 {payload.docKind} 문서의 한 섹션입니다. 이 섹션만 평가하고 사실을 추가하지 마세요.\n"
+            "- overallScore, rubricScores(readability, impact, structure, specificity, roleFit): 0-100 정수\n"
+            "- strengths, weaknesses, redFlags: 이 섹션에 해당하는 것만\n"
+            "- actionableEdits: section 필드에는 섹션 제목을 쓸 것\n"
+            "- summary: 이 섹션에 대한 평가 한 문장\n"
+            "- improved: 이 섹션을 더 읽기 쉽고 구체적으로 다듬은 개선본\n"
+            "평가 설명은 한국어로 작성합니다.\n"
+            f"목표 직무: {payload.targetRole or '미지정'}\n언어: {payload.language}\n섹션:\n{section}"
+        )
+
+    def _build_summary_prompt(self, payload: SummarizeRequest) -> str:
+        return (
             "다음 이력서 내용을 간결하게 요약해 주세요. 불릿 5개 이내, 한줄 요약, 핵심 키워드 8개 이내로 반환합니다."
             f"\n언어: {payload.language}\n본문:\n{payload.extractedText}"
         )
-        result = await self._chat(prompt, response_format={
+
+    def _build_proofread_prompt(self, payload: ProofreadRequest) -> str:
+        return (
+            "주어진 자기소개서 내용을 사실을 추가하지 않고 문법적으로 교정하고, 개선 의견을 제공합니다."
+            "각 개선 의견은 줄 또는 섹션 기준으로 작성해 주세요."
+            f"\n목표 직무: {payload.targetRole or '미지정'}\n언어: {payload.language}\n본문:\n{payload.extractedText}"
+        )
+
+    def _summary_format(self) -> Dict[str, Any]:
+        return {
             "type": "json_schema",
             "json_schema": {
                 "name": "resume_summary",
@@ -63,17 +608,10 @@ class AiClient:
                     "additionalProperties": False,
                 },
             },
-        })
-        payload = result if isinstance(result, dict) else result.model_dump()
-        return SummarizeResponse(**payload)
+        }
 
-    async def proofread(self, payload: ProofreadRequest) -> ProofreadResponse:
-        prompt = (
-            "주어진 자기소개서 내용을 사실을 추가하지 않고 문법적으로 교정하고, 개선 의견을 제공합니다."
-            "각 개선 의견은 줄 또는 섹션 기준으로 작성해 주세요."
-            f"\n목표 직무: {payload.targetRole or '미지정'}\n언어: {payload.language}\n본문:\n{payload.extractedText}"
-        )
-        result = await self._chat(prompt, response_format={
+    def _proofread_format(self) -> Dict[str, Any]:
+        return {
             "type": "json_schema",
             "json_schema": {
                 "name": "proofread_response",
@@ -98,35 +636,17 @@ class AiClient:
                     "additionalProperties": False,
                 },
             },
-        })
-        payload = result if isinstance(result, dict) else result.model_dump()
-        return ProofreadResponse(**payload)
-
-    async def _chat(self, prompt: str):
-        try:
-            completion = await self.client.responses.create(
-                model=settings.openai_model,
-                input=(
-                    prompt
-                    + "\n\n반드시 JSON 형식으로만 응답하세요. "
-                      "설명 문장이나 마크다운 없이 JSON만 출력하세요."
-                ),
-            )
-
-            # SDK 버전에 따라 둘 중 하나가 맞음
-            if hasattr(completion, "output_text") and completion.output_text:
-                return completion.output_text
-
-            return completion.output[0].content[0].text
-
-        except Exception as exc:
-            print("OPENAI ERROR:", exc)
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=str(exc),
-            ) from exc
+        }
 
-    def _build_eval_prompt(self, payload: EvaluateRequest) -> str:
+    def _build_eval_prompt(
+        self, payload: EvaluateRequest, include_improved: bool = True, condensed: bool = False
+    ) -> str:
+        improved_field = ',\n            "improvedVersion": "개선된 전체 문서"' if include_improved else ""
+        source_note = (
+            "(긴 원문을 섹션별로 압축한 내용이다. 원문 전체를 평가하듯 점수를 매길 것)\n            "
+            if condensed
+            else ""
+        )
         return f"""
             너는 이력서 평가 AI다.
             아래 문서를 분석해서 반드시 **지정된 JSON 스키마 그대로**만 응답해야 한다.
@@ -160,8 +680,7 @@ class AiClient:
                 ],
                 "redFlags": [문자열 배열],
                 "summary": "요약"
-            }},
-            "improvedVersion": "개선된 전체 문서"
+            }}{improved_field}
             }}
 
             문서 유형: {payload.docKind}
@@ -169,9 +688,68 @@ class AiClient:
             목표 직무: {payload.targetRole or "미지정"}
 
             문서 내용:
-            {payload.extractedText}
+            {source_note}{payload.extractedText}
         """
 
+    def _build_repair_prompt(self, response_text: str, error: str) -> str:
+        return (
+            "아래 JSON 응답이 요구된 스키마와 맞지 않습니다. 내용은 바꾸지 말고 형식만 고쳐 "
+            "스키마에 맞는 JSON 하나만 다시 출력하세요."
+            f"\n오류: {error[:500]}\n응답:\n{response_text}"
+        )
+
+    def _evaluation_format(self) -> Dict[str, Any]:
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": "resume_evaluation", "schema": self._evaluation_schema()},
+        }
+
+    def _report_format(self) -> Dict[str, Any]:
+        report_schema = self._evaluation_schema()["properties"]["report"]
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "resume_evaluation_report",
+                "schema": {
+                    "type": "object",
+                    "properties": {"report": report_schema},
+                    "required": ["report"],
+                    "additionalProperties": False,
+                },
+            },
+        }
+
+    def _section_format(self) -> Dict[str, Any]:
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "resume_section_analysis",
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "condensed": {"type": "string"},
+                        "improved": {"type": "string"},
+                    },
+                    "required": ["condensed", "improved"],
+                    "additionalProperties": False,
+                },
+            },
+        }
+
+    def _section_evaluation_format(self) -> Dict[str, Any]:
+        report_schema = self._evaluation_schema()["properties"]["report"]
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "resume_section_evaluation",
+                "schema": {
+                    **report_schema,
+                    "properties": {**report_schema["properties"], "improved": {"type": "string"}},
+                    "required": [*report_schema["required"], "improved"],
+                },
+            },
+        }
+
     def _evaluation_schema(self) -> Dict[str, Any]:
         return {
             "type": "object",
@@ -196,6 +774,7 @@ class AiClient:
                                 "specificity",
                                 "roleFit",
                             ],
+                            "additionalProperties": False,
                         },
                         "strengths": {"type": "array", "items": {"type": "string"}},
                         "weaknesses": {"type": "array", "items": {"type": "string"}},
@@ -224,6 +803,7 @@ class AiClient:
                         "redFlags",
                         "summary",
                     ],
+                    "additionalProperties": False,
                 },
                 "improvedVersion": {"type": "string"},
             },
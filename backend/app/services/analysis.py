@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+from app.schemas import (
+    AnalyzeRequest,
+    AnalyzeResponse,
+    EvaluateRequest,
+    OperationError,
+    ProcessedDocument,
+    ProofreadRequest,
+    SummarizeRequest,
+)
+from app.services.ai_client import AiClient
+
+logger = logging.getLogger(__name__)
+
+# 요청의 operations 값 -> AnalyzeResponse 필드 이름
+_RESULT_FIELDS = {
+    "evaluate": "evaluation",
+    "summarize": "summary",
+    "proofread": "proofread",
+}
+
+# (전체 응답을 받는 호출, 스트림을 여는 호출)
+_Operation = Tuple[Callable[[], Awaitable[BaseModel]], Callable[[], AsyncIterator[Tuple[str, Any]]]]
+
+
+def _operations(
+    ai_client: AiClient, payload: AnalyzeRequest, document: ProcessedDocument
+) -> Dict[str, _Operation]:
+    text = document.extractedText
+    evaluate = EvaluateRequest(
+        extractedText=text,
+        docKind=payload.docKind,
+        language=payload.language,
+        targetRole=payload.targetRole,
+    )
+    summarize = SummarizeRequest(extractedText=text, language=payload.language)
+    proofread = ProofreadRequest(extractedText=text, language=payload.language, targetRole=payload.targetRole)
+    operations = {
+        "evaluate": (lambda: ai_client.evaluate(evaluate), lambda: ai_client.evaluate_stream(evaluate)),
+        "summarize": (lambda: ai_client.summarize(summarize), lambda: ai_client.summarize_stream(summarize)),
+        "proofread": (lambda: ai_client.proofread(proofread), lambda: ai_client.proofread_stream(proofread)),
+    }
+    # 같은 작업을 여러 번 요청해도 한 번만 실행한다.
+    return {name: operations[name] for name in dict.fromkeys(payload.operations)}
+
+
+def _error(operation: str, exc: Exception) -> OperationError:
+    if isinstance(exc, HTTPException):
+        return OperationError(status=exc.status_code, detail=str(exc.detail))
+    logger.exception("analyze operation %s failed", operation, exc_info=exc)
+    return OperationError(status=status.HTTP_502_BAD_GATEWAY, detail=str(exc))
+
+
+async def analyze(ai_client: AiClient, payload: AnalyzeRequest, document: ProcessedDocument) -> AnalyzeResponse:
+    operations = _operations(ai_client, payload, document)
+    # 작업끼리 기다리지 않도록 동시에 돌리고, 실패한 작업은 errors 에 담아 나머지 결과는 그대로 돌려준다.
+    results = await asyncio.gather(
+        *(run() for run, _ in operations.values()),
+        return_exceptions=True,
+    )
+    response = AnalyzeResponse(document=document)
+    for name, result in zip(operations, results):
+        if isinstance(result, asyncio.CancelledError):
+            raise result
+        if isinstance(result, Exception):
+            response.errors[name] = _error(name, result)
+        else:
+            setattr(response, _RESULT_FIELDS[name], result)
+    return response
+
+
+async def analyze_stream(
+    ai_client: AiClient, payload: AnalyzeRequest, document: ProcessedDocument
+) -> AsyncIterator[Tuple[str, Any]]:
+    # 여러 작업의 스트림을 도착 순서대로 합쳐 보낸다. 이벤트마다 operation 으로 어느 작업인지 표시한다.
+    operations = _operations(ai_client, payload, document)
+    yield "document", document.model_dump()
+
+    queue: "asyncio.Queue[Tuple[str, Optional[str], Any]]" = asyncio.Queue()
+
+    async def pump(name: str, open_stream: Callable[[], AsyncIterator[Tuple[str, Any]]]) -> None:
+        try:
+            async for event, data in open_stream():
+                await queue.put((name, event, data))
+        except Exception as exc:
+            await queue.put((name, "error", _error(name, exc).model_dump()))
+        finally:
+            await queue.put((name, None, None))
+
+    tasks = [asyncio.create_task(pump(name, stream)) for name, (_, stream) in operations.items()]
+    completed, failed = [], []
+    try:
+        remaining = len(tasks)
+        while remaining:
+            name, event, data = await queue.get()
+            if event is None:
+                remaining -= 1
+            elif event == "delta":
+                yield "delta", {"operation": name, "text": data}
+            elif event == "progress":
+                yield "progress", {"operation": name, **data}
+            elif event == "result":
+                completed.append(name)
+                yield "result", {"operation": name, "data": data}
+            else:
+                failed.append(name)
+                yield "error", {"operation": name, **data}
+        yield "done", {"completed": completed, "failed": failed}
+    finally:
+        # 클라이언트가 연결을 끊으면 남은 작업의 upstream 호출도 함께 취소한다.
+        for task in tasks:
+            task.cancel()
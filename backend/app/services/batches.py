@@ -0,0 +1,763 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.config import get_settings
+from app.schemas import (
+    BatchItem,
+    BatchItemResult,
+    BatchRankEntry,
+    BatchRequest,
+    BatchStatus,
+    EvaluateRequest,
+    OperationError,
+)
+from app.services.ai_client import AiClient
+from app.services.http_clients import get_http_clients
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+Extractor = Callable[[BatchItem], Awaitable[str]]
+
+_FINISHED = ("succeeded", "failed")
+# Batch API 에서 아직 결과가 나오지 않은 상태
+_PROVIDER_PENDING = ("validating", "in_progress", "finalizing", "cancelling")
+# 다른 워커가 처리 중인 배치의 결과를 기다릴 때 저장소를 다시 읽는 간격(초)
+_STREAM_POLL = 2.0
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def rank_results(results: List[BatchItemResult]) -> List[BatchRankEntry]:
+    # overallScore 가 같으면 루브릭 합계, 그다음 루브릭 항목 순서(가독성, 임팩트, ...)로 가른다.
+    scored = []
+    for result in results:
+        if result.evaluation is None:
+            continue
+        report = result.evaluation.report
+        rubric = list(report.rubricScores.model_dump().values())
+        key = (-report.overallScore, -sum(rubric), *(-score for score in rubric), result.index)
+        scored.append((key, result))
+    scored.sort(key=lambda entry: entry[0])
+    return [
+        BatchRankEntry(
+            rank=position,
+            itemId=result.itemId,
+            overallScore=result.evaluation.report.overallScore,
+            rubricTotal=-key[1],
+            rubricScores=result.evaluation.report.rubricScores,
+        )
+        for position, (key, result) in enumerate(scored, start=1)
+    ]
+
+
+def _output_text(body: Dict[str, Any]) -> str:
+    # Batch API 결과 파일에는 SDK 의 output_text 편의 속성이 없으므로 message 항목에서 직접 모은다.
+    parts = []
+    for output in body.get("output", []):
+        if output.get("type") != "message":
+            continue
+        for content in output.get("content", []):
+            if content.get("type") == "output_text":
+                parts.append(content.get("text", ""))
+    return "".join(parts)
+
+
+class BatchStore(ABC):
+    # key 는 클라이언트 범위를 붙인 idempotency 키다. create 는 같은 키의 배치가 이미 있으면
+    # 새로 만들지 않고 기존 배치를 돌려준다.
+    @abstractmethod
+    async def create(self, batch: BatchStatus, request: BatchRequest, key: Optional[str]) -> BatchStatus:
+        ...
+
+    @abstractmethod
+    async def get(self, batch_id: str) -> Optional[BatchStatus]:
+        ...
+
+    @abstractmethod
+    async def get_by_key(self, key: str) -> Optional[BatchStatus]:
+        ...
+
+    @abstractmethod
+    async def get_request(self, batch_id: str) -> Optional[BatchRequest]:
+        ...
+
+    @abstractmethod
+    async def update(self, batch: BatchStatus) -> None:
+        ...
+
+    # queued 이거나, running 인데 stale_before 이후로 갱신이 없는 배치를 가져오는 데 성공한 쪽만 실행한다.
+    @abstractmethod
+    async def claim(self, batch: BatchStatus, stale_before: float) -> bool:
+        ...
+
+    # 항목 결과에 배치 안에서 단조 증가하는 seq 를 붙여 저장한다. 이미 저장된 항목이면 None.
+    @abstractmethod
+    async def add_result(self, batch_id: str, result: BatchItemResult) -> Optional[BatchItemResult]:
+        ...
+
+    @abstractmethod
+    async def results(self, batch_id: str, after: int = 0) -> List[BatchItemResult]:
+        ...
+
+    # (배치, 마지막 갱신 시각) 목록
+    @abstractmethod
+    async def unfinished(self) -> List[Tuple[BatchStatus, float]]:
+        ...
+
+    @abstractmethod
+    async def prune(self, ttl_seconds: int) -> None:
+        ...
+
+
+class MemoryBatchStore(BatchStore):
+    def __init__(self) -> None:
+        self._batches: Dict[str, Tuple[BatchStatus, BatchRequest]] = {}
+        self._keys: Dict[str, str] = {}
+        self._key_of: Dict[str, str] = {}
+        self._results: Dict[str, Dict[int, BatchItemResult]] = {}
+        self._heartbeats: Dict[str, float] = {}
+
+    async def create(self, batch: BatchStatus, request: BatchRequest, key: Optional[str]) -> BatchStatus:
+        if key:
+            existing = await self.get_by_key(key)
+            if existing is not None:
+                return existing
+            self._keys[key] = batch.batchId
+            self._key_of[batch.batchId] = key
+        self._batches[batch.batchId] = (batch.model_copy(), request)
+        self._results[batch.batchId] = {}
+        self._heartbeats[batch.batchId] = time.time()
+        return batch
+
+    async def get(self, batch_id: str) -> Optional[BatchStatus]:
+        entry = self._batches.get(batch_id)
+        return entry[0].model_copy() if entry else None
+
+    async def get_by_key(self, key: str) -> Optional[BatchStatus]:
+        batch_id = self._keys.get(key)
+        return await self.get(batch_id) if batch_id else None
+
+    async def get_request(self, batch_id: str) -> Optional[BatchRequest]:
+        entry = self._batches.get(batch_id)
+        return entry[1] if entry else None
+
+    async def update(self, batch: BatchStatus) -> None:
+        entry = self._batches.get(batch.batchId)
+        if entry is not None:
+            self._batches[batch.batchId] = (batch.model_copy(), entry[1])
+            self._heartbeats[batch.batchId] = time.time()
+
+    async def claim(self, batch: BatchStatus, stale_before: float) -> bool:
+        entry = self._batches.get(batch.batchId)
+        if entry is None:
+            return False
+        current = entry[0].status
+        if current != "queued" and not (current == "running" and self._heartbeats[batch.batchId] < stale_before):
+            return False
+        await self.update(batch)
+        return True
+
+    async def add_result(self, batch_id: str, result: BatchItemResult) -> Optional[BatchItemResult]:
+        results = self._results.get(batch_id)
+        if results is None or result.index in results:
+            return None
+        stored = result.model_copy(update={"seq": len(results) + 1})
+        results[result.index] = stored
+        self._heartbeats[batch_id] = time.time()
+        return stored
+
+    async def results(self, batch_id: str, after: int = 0) -> List[BatchItemResult]:
+        results = self._results.get(batch_id, {})
+        return sorted((result for result in results.values() if result.seq > after), key=lambda r: r.seq)
+
+    async def unfinished(self) -> List[Tuple[BatchStatus, float]]:
+        return [
+            (batch.model_copy(), self._heartbeats[batch_id])
+            for batch_id, (batch, _) in self._batches.items()
+            if batch.status not in _FINISHED
+        ]
+
+    async def prune(self, ttl_seconds: int) -> None:
+        cutoff = time.time() - ttl_seconds
+        expired = [
+            batch_id
+            for batch_id, (batch, _) in self._batches.items()
+            if batch.status in _FINISHED and self._heartbeats[batch_id] < cutoff
+        ]
+        for batch_id in expired:
+            self._batches.pop(batch_id)
+            self._results.pop(batch_id, None)
+            self._heartbeats.pop(batch_id, None)
+            key = self._key_of.pop(batch_id, None)
+            if key is not None:
+                self._keys.pop(key, None)
+
+
+class SqliteBatchStore(BatchStore):
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS batches (
+                    batch_id TEXT PRIMARY KEY,
+                    idempotency_key TEXT UNIQUE,
+                    state TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS batch_results (
+                    batch_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    item_index INTEGER NOT NULL,
+                    result TEXT NOT NULL,
+                    PRIMARY KEY (batch_id, item_index)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS batches_state_updated ON batches (state, updated_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS batch_results_seq ON batch_results (batch_id, seq)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _create(self, batch: BatchStatus, request: BatchRequest, key: Optional[str]) -> BatchStatus:
+        with closing(self._connect()) as conn, conn:
+            try:
+                conn.execute(
+                    "INSERT INTO batches VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        batch.batchId,
+                        key,
+                        batch.status,
+                        request.model_dump_json(),
+                        batch.model_dump_json(),
+                        time.time(),
+                    ),
+                )
+                return batch
+            except sqlite3.IntegrityError:
+                row = conn.execute("SELECT status FROM batches WHERE idempotency_key = ?", (key,)).fetchone()
+                if row is None:
+                    raise
+                return BatchStatus.model_validate_json(row[0])
+
+    def _get(self, column: str, value: str) -> Optional[BatchStatus]:
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(f"SELECT status FROM batches WHERE {column} = ?", (value,)).fetchone()
+        return BatchStatus.model_validate_json(row[0]) if row else None
+
+    def _get_request(self, batch_id: str) -> Optional[BatchRequest]:
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT request FROM batches WHERE batch_id = ?", (batch_id,)).fetchone()
+        return BatchRequest.model_validate_json(row[0]) if row else None
+
+    def _update(self, batch: BatchStatus) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE batches SET state = ?, status = ?, updated_at = ? WHERE batch_id = ?",
+                (batch.status, batch.model_dump_json(), time.time(), batch.batchId),
+            )
+
+    def _claim(self, batch: BatchStatus, stale_before: float) -> bool:
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE batches SET state = ?, status = ?, updated_at = ? WHERE batch_id = ? "
+                "AND (state = 'queued' OR (state = 'running' AND updated_at < ?))",
+                (batch.status, batch.model_dump_json(), time.time(), batch.batchId, stale_before),
+            )
+            return cursor.rowcount == 1
+
+    def _add_result(self, batch_id: str, result: BatchItemResult) -> Optional[BatchItemResult]:
+        with closing(self._connect()) as conn, conn:
+            # seq 계산과 삽입을 한 문장으로 해서 여러 워커가 동시에 써도 번호가 겹치지 않게 한다.
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO batch_results "
+                "SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ? FROM batch_results WHERE batch_id = ?",
+                (batch_id, result.index, result.model_dump_json(exclude={"seq"}), batch_id),
+            )
+            if cursor.rowcount != 1:
+                return None
+            conn.execute("UPDATE batches SET updated_at = ? WHERE batch_id = ?", (time.time(), batch_id))
+            row = conn.execute(
+                "SELECT seq FROM batch_results WHERE batch_id = ? AND item_index = ?",
+                (batch_id, result.index),
+            ).fetchone()
+        return result.model_copy(update={"seq": row[0]})
+
+    def _results(self, batch_id: str, after: int) -> List[BatchItemResult]:
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute(
+                "SELECT seq, result FROM batch_results WHERE batch_id = ? AND seq > ? ORDER BY seq",
+                (batch_id, after),
+            ).fetchall()
+        return [
+            BatchItemResult.model_validate_json(result_json).model_copy(update={"seq": seq})
+            for seq, result_json in rows
+        ]
+
+    def _unfinished(self) -> List[Tuple[BatchStatus, float]]:
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute(
+                "SELECT status, updated_at FROM batches WHERE state IN ('queued', 'running') ORDER BY updated_at"
+            ).fetchall()
+        return [(BatchStatus.model_validate_json(status_json), updated_at) for status_json, updated_at in rows]
+
+    def _prune(self, ttl_seconds: int) -> None:
+        with closing(self._connect()) as conn, conn:
+            cutoff = time.time() - ttl_seconds
+            conn.execute(
+                "DELETE FROM batch_results WHERE batch_id IN ("
+                "SELECT batch_id FROM batches WHERE state IN ('succeeded', 'failed') AND updated_at < ?)",
+                (cutoff,),
+            )
+            conn.execute(
+                "DELETE FROM batches WHERE state IN ('succeeded', 'failed') AND updated_at < ?",
+                (cutoff,),
+            )
+
+    async def create(self, batch: BatchStatus, request: BatchRequest, key: Optional[str]) -> BatchStatus:
+        return await asyncio.to_thread(self._create, batch, request, key)
+
+    async def get(self, batch_id: str) -> Optional[BatchStatus]:
+        return await asyncio.to_thread(self._get, "batch_id", batch_id)
+
+    async def get_by_key(self, key: str) -> Optional[BatchStatus]:
+        return await asyncio.to_thread(self._get, "idempotency_key", key)
+
+    async def get_request(self, batch_id: str) -> Optional[BatchRequest]:
+        return await asyncio.to_thread(self._get_request, batch_id)
+
+    async def update(self, batch: BatchStatus) -> None:
+        await asyncio.to_thread(self._update, batch)
+
+    async def claim(self, batch: BatchStatus, stale_before: float) -> bool:
+        return await asyncio.to_thread(self._claim, batch, stale_before)
+
+    async def add_result(self, batch_id: str, result: BatchItemResult) -> Optional[BatchItemResult]:
+        return await asyncio.to_thread(self._add_result, batch_id, result)
+
+    async def results(self, batch_id: str, after: int = 0) -> List[BatchItemResult]:
+        return await asyncio.to_thread(self._results, batch_id, after)
+
+    async def unfinished(self) -> List[Tuple[BatchStatus, float]]:
+        return await asyncio.to_thread(self._unfinished)
+
+    async def prune(self, ttl_seconds: int) -> None:
+        await asyncio.to_thread(self._prune, ttl_seconds)
+
+
+class BatchRunner:
+    def __init__(
+        self,
+        store: BatchStore,
+        concurrency: int,
+        max_items: int,
+        poll_interval: float,
+        lease: float,
+        ttl_seconds: int,
+    ) -> None:
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self.max_items = max_items
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.ttl_seconds = ttl_seconds
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._extract: Optional[Extractor] = None
+        self._ai_client: Optional[Callable[[], AiClient]] = None
+        self._sweeper: Optional[asyncio.Task] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+        self._listeners: Dict[str, int] = {}
+        self._submitted = 0
+        self._offline = 0
+        self._items_succeeded = 0
+        self._items_failed = 0
+
+    async def start(self, extract: Extractor, ai_client: Callable[[], AiClient]) -> None:
+        if self._sweeper is not None:
+            return
+        self._extract = extract
+        self._ai_client = ai_client
+        self._slots = asyncio.Semaphore(self.concurrency)
+        await self.store.prune(self.ttl_seconds)
+        self._sweeper = asyncio.create_task(self._sweep())
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        if self._sweeper is not None:
+            tasks.append(self._sweeper)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._sweeper = None
+        self._tasks = {}
+
+    async def submit(self, request: BatchRequest, idempotency_key: Optional[str], scope: str) -> BatchStatus:
+        # 작업 큐와 같이 키는 클라이언트(scope)별로 두고, 같은 키로 다른 요청을 보내면 거절한다.
+        if self._sweeper is None:
+            raise RuntimeError("BatchRunner is not started")
+        if len(request.items) > self.max_items:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"한 번에 최대 {self.max_items}개 문서까지 평가할 수 있습니다.",
+            )
+        key = f"{scope}:{idempotency_key}" if idempotency_key else None
+        if key:
+            existing = await self.store.get_by_key(key)
+            if existing is not None:
+                return await self._replay(existing, request)
+
+        now = _now()
+        batch = BatchStatus(
+            batchId=uuid.uuid4().hex,
+            status="queued",
+            mode=request.mode,
+            idempotencyKey=idempotency_key,
+            total=len(request.items),
+            createdAt=now,
+            updatedAt=now,
+        )
+        stored = await self.store.create(batch, request, key)
+        if stored.batchId != batch.batchId:
+            return await self._replay(stored, request)
+        self._submitted += 1
+        if self._submitted % 100 == 0:
+            await self.store.prune(self.ttl_seconds)
+        await self._claim_and_run(batch, stale_before=0)
+        return batch
+
+    async def get(self, batch_id: str) -> Optional[BatchStatus]:
+        batch = await self.store.get(batch_id)
+        return await self._with_results(batch) if batch else None
+
+    async def _replay(self, batch: BatchStatus, request: BatchRequest) -> BatchStatus:
+        stored_request = await self.store.get_request(batch.batchId)
+        if stored_request is None or stored_request.model_dump_json() != request.model_dump_json():
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="같은 Idempotency-Key 로 다른 요청을 보냈습니다.",
+            )
+        return await self._with_results(batch)
+
+    async def _with_results(self, batch: BatchStatus) -> BatchStatus:
+        results = await self.store.results(batch.batchId)
+        batch.succeeded = sum(1 for result in results if result.status == "succeeded")
+        batch.failed = len(results) - batch.succeeded
+        batch.ranking = rank_results(results)
+        return batch
+
+    async def stream(self, batch_id: str, after: int = 0, follow: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        # after 는 클라이언트가 마지막으로 받은 seq 다. 연결이 끊겨도 그 다음 결과부터 이어 받을 수 있다.
+        while True:
+            # 이 프로세스가 처리 중인 배치만 결과가 기록될 때 깨워 줄 수 있다. 결과를 읽기 전에 등록해야 그 사이의 기록을 놓치지 않는다.
+            event = self._listen(batch_id) if follow and batch_id in self._tasks else None
+            try:
+                batch = await self.store.get(batch_id)
+                if batch is None:
+                    return
+                for result in await self.store.results(batch_id, after):
+                    after = result.seq
+                    yield {"type": "item", **result.model_dump(mode="json")}
+                # 상태를 결과보다 먼저 읽었으므로 끝난 배치라면 위에서 결과를 모두 보냈다.
+                if batch.status in _FINISHED or not follow:
+                    summary = await self._with_results(batch)
+                    yield {"type": "summary", **summary.model_dump(mode="json")}
+                    return
+                # 다른 워커가 처리하는 배치는 주기적으로 다시 읽는다.
+                if event is None:
+                    await asyncio.sleep(_STREAM_POLL)
+                    continue
+                try:
+                    await asyncio.wait_for(event.wait(), _STREAM_POLL)
+                except asyncio.TimeoutError:
+                    pass
+            finally:
+                if event is not None:
+                    self._unlisten(batch_id)
+
+    def _listen(self, batch_id: str) -> asyncio.Event:
+        self._listeners[batch_id] = self._listeners.get(batch_id, 0) + 1
+        return self._events.setdefault(batch_id, asyncio.Event())
+
+    def _unlisten(self, batch_id: str) -> None:
+        # 마지막으로 기다리던 스트림이 떠나면 이벤트를 지워 끝난 배치의 항목이 남지 않게 한다.
+        remaining = self._listeners.get(batch_id, 0) - 1
+        if remaining > 0:
+            self._listeners[batch_id] = remaining
+            return
+        self._listeners.pop(batch_id, None)
+        self._events.pop(batch_id, None)
+
+    def _wake(self, batch_id: str) -> None:
+        event = self._events.pop(batch_id, None)
+        if event is not None:
+            event.set()
+
+    async def _sweep(self) -> None:
+        # 재시작이나 다른 워커 장애로 멈춘 배치를 이어받고, offline 배치의 공급자 결과를 확인한다.
+        while True:
+            try:
+                now = time.time()
+                for batch, heartbeat in await self.store.unfinished():
+                    if batch.batchId in self._tasks:
+                        continue
+                    window = self.poll_interval if batch.providerBatchId else self.lease
+                    if batch.status == "queued" or heartbeat < now - window:
+                        await self._claim_and_run(batch, stale_before=now - window)
+            except Exception:
+                logger.exception("batch sweep failed")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _claim_and_run(self, batch: BatchStatus, stale_before: float) -> None:
+        if batch.batchId in self._tasks:
+            return
+        batch = batch.model_copy(update={"status": "running", "updatedAt": _now()})
+        if not await self.store.claim(batch, stale_before):
+            return
+        self._tasks[batch.batchId] = asyncio.create_task(self._run(batch))
+
+    async def _run(self, batch: BatchStatus) -> None:
+        try:
+            finished = await self._process(batch)
+        except Exception:
+            logger.exception("batch %s failed", batch.batchId)
+            batch.status = "failed"
+            batch.error = "일괄 평가를 처리하는 중 오류가 발생했습니다."
+            finished = True
+        finally:
+            self._tasks.pop(batch.batchId, None)
+        if finished and batch.status == "running":
+            batch.status = "succeeded"
+        batch.updatedAt = _now()
+        await self.store.update(batch)
+        self._wake(batch.batchId)
+
+    async def _process(self, batch: BatchStatus) -> bool:
+        request = await self.store.get_request(batch.batchId)
+        if request is None:
+            raise RuntimeError(f"batch {batch.batchId} has no stored request")
+        if batch.mode == "offline" and batch.providerBatchId is None:
+            texts = await self._extract_pending(batch, request)
+            if await self._submit_offline(batch, request, texts):
+                return False
+            await self._run_online(batch, request, texts)
+            return True
+        if batch.mode == "offline" and not await self._collect_offline(batch, request):
+            return False
+        await self._run_online(batch, request)
+        return True
+
+    def _item_id(self, index: int, item: BatchItem) -> str:
+        return item.itemId or str(index)
+
+    def _evaluate_request(self, request: BatchRequest, text: str) -> EvaluateRequest:
+        return EvaluateRequest(
+            extractedText=text,
+            docKind=request.docKind,
+            language=request.language,
+            targetRole=request.targetRole,
+        )
+
+    def _failure(self, index: int, item: BatchItem, exc: Exception) -> BatchItemResult:
+        if isinstance(exc, HTTPException):
+            error = OperationError(status=exc.status_code, detail=str(exc.detail))
+        else:
+            logger.exception("batch item %s failed", index, exc_info=exc)
+            error = OperationError(
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="문서를 처리하는 중 오류가 발생했습니다.",
+            )
+        return BatchItemResult(index=index, itemId=self._item_id(index, item), status="failed", error=error)
+
+    async def _record(self, batch: BatchStatus, result: BatchItemResult) -> None:
+        stored = await self.store.add_result(batch.batchId, result)
+        if stored is None:
+            return
+        if stored.status == "succeeded":
+            self._items_succeeded += 1
+        else:
+            self._items_failed += 1
+        self._wake(batch.batchId)
+
+    async def _pending(self, batch: BatchStatus, request: BatchRequest) -> List[Tuple[int, BatchItem]]:
+        done = {result.index for result in await self.store.results(batch.batchId)}
+        return [(index, item) for index, item in enumerate(request.items) if index not in done]
+
+    async def _run_online(
+        self, batch: BatchStatus, request: BatchRequest, texts: Optional[Dict[int, str]] = None
+    ) -> None:
+        texts = texts or {}
+        pending = await self._pending(batch, request)
+        await asyncio.gather(
+            *(self._run_item(batch, request, index, item, texts.get(index)) for index, item in pending)
+        )
+
+    async def _run_item(
+        self, batch: BatchStatus, request: BatchRequest, index: int, item: BatchItem, text: Optional[str]
+    ) -> None:
+        # 문서 수와 상관없이 BATCH_CONCURRENCY 개만 동시에 추출, 평가한다.
+        async with self._slots:
+            try:
+                if text is None:
+                    text = await self._extract(item)
+                evaluation = await self._ai_client().evaluate(self._evaluate_request(request, text))
+                result = BatchItemResult(
+                    index=index,
+                    itemId=self._item_id(index, item),
+                    status="succeeded",
+                    evaluation=evaluation,
+                )
+            except Exception as exc:
+                result = self._failure(index, item, exc)
+        await self._record(batch, result)
+
+    async def _extract_pending(self, batch: BatchStatus, request: BatchRequest) -> Dict[int, str]:
+        texts: Dict[int, str] = {}
+
+        async def extract(index: int, item: BatchItem) -> None:
+            async with self._slots:
+                try:
+                    texts[index] = await self._extract(item)
+                except Exception as exc:
+                    await self._record(batch, self._failure(index, item, exc))
+
+        await asyncio.gather(*(extract(index, item) for index, item in await self._pending(batch, request)))
+        return texts
+
+    async def _submit_offline(self, batch: BatchStatus, request: BatchRequest, texts: Dict[int, str]) -> bool:
+        ai_client = self._ai_client()
+        lines = []
+        for index, text in sorted(texts.items()):
+            body = ai_client.batch_request_body(self._evaluate_request(request, text))
+            if body is not None:
+                lines.append(
+                    json.dumps(
+                        {"custom_id": str(index), "method": "POST", "url": "/v1/responses", "body": body},
+                        ensure_ascii=False,
+                    )
+                )
+        if not lines:
+            return False
+        try:
+            client = get_http_clients().openai()
+            uploaded = await client.files.create(
+                file=(f"{batch.batchId}.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch",
+            )
+            provider = await client.batches.create(
+                input_file_id=uploaded.id,
+                endpoint="/v1/responses",
+                completion_window="24h",
+                metadata={"batchId": batch.batchId},
+            )
+        except Exception as exc:
+            logger.warning("batch %s could not be submitted to the Batch API, evaluating online: %s", batch.batchId, exc)
+            return False
+
+        self._offline += 1
+        batch.providerBatchId = provider.id
+        batch.updatedAt = _now()
+        await self.store.update(batch)
+        logger.info("batch %s submitted %s items as provider batch %s", batch.batchId, len(lines), provider.id)
+        # map-reduce 가 필요한 긴 문서는 Batch API 로 보낼 수 없으므로 기다리지 않고 바로 평가한다.
+        submitted = {int(json.loads(line)["custom_id"]) for line in lines}
+        await asyncio.gather(
+            *(
+                self._run_item(batch, request, index, request.items[index], text)
+                for index, text in texts.items()
+                if index not in submitted
+            )
+        )
+        return True
+
+    async def _collect_offline(self, batch: BatchStatus, request: BatchRequest) -> bool:
+        client = get_http_clients().openai()
+        provider = await client.batches.retrieve(batch.providerBatchId)
+        if provider.status in _PROVIDER_PENDING:
+            return False
+        if provider.status == "completed" and provider.output_file_id:
+            ai_client = self._ai_client()
+            content = await client.files.content(provider.output_file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                index = int(record["custom_id"])
+                response = record.get("response") or {}
+                if response.get("status_code") != 200:
+                    continue
+                item = request.items[index]
+                try:
+                    evaluation = await ai_client.parse_batch_output(_output_text(response.get("body") or {}))
+                    result = BatchItemResult(
+                        index=index,
+                        itemId=self._item_id(index, item),
+                        status="succeeded",
+                        evaluation=evaluation,
+                    )
+                except Exception as exc:
+                    result = self._failure(index, item, exc)
+                await self._record(batch, result)
+        else:
+            logger.warning(
+                "provider batch %s ended as %s, evaluating remaining items online",
+                batch.providerBatchId,
+                provider.status,
+            )
+        # 공급자 쪽에서 실패했거나 빠진 항목은 _process 가 이어서 온라인으로 평가한다.
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "running": len(self._tasks),
+            "concurrency": self.concurrency,
+            "submitted": self._submitted,
+            "offlineSubmitted": self._offline,
+            "itemsSucceeded": self._items_succeeded,
+            "itemsFailed": self._items_failed,
+        }
+
+
+def _build_store() -> BatchStore:
+    if settings.job_backend == "sqlite":
+        return SqliteBatchStore(settings.job_db_path)
+    if settings.job_backend == "memory":
+        return MemoryBatchStore()
+    raise RuntimeError(f"Unknown JOB_BACKEND: {settings.job_backend}")
+
+
+_batch_runner = BatchRunner(
+    store=_build_store(),
+    concurrency=settings.batch_concurrency,
+    max_items=settings.batch_max_items,
+    poll_interval=settings.batch_poll_interval,
+    lease=settings.batch_lease,
+    ttl_seconds=settings.job_ttl,
+)
+
+
+def get_batch_runner() -> BatchRunner:
+    return _batch_runner
@@ -1,17 +1,92 @@
+import asyncio
+import logging
+import math
+import os
+import random
 import shutil
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import httpx
-import pdfplumber
-import pytesseract
 from fastapi import HTTPException, status
-from pdf2image import convert_from_path
 
+from app.config import get_settings
+from app.observability import PDF_PAGES, stage
 from app.schemas import ProcessedDocument
-from app.utils.text_utils import clean_text, strip_headers_and_footers
+from app.services.extraction_cache import get_extraction_cache, hash_file
+from app.services.http_clients import get_http_clients
+from app.services.hwp_extractor import HwpParseError, extract_hwp_text
+from app.services.office_pool import OfficeUnavailableError, get_office_pool
+from app.services.pdf_extractor import (
+    PageText,
+    count_pages,
+    extract_pages,
+    is_sparse,
+    log_page_timings,
+    ocr_page,
+    visible_chars,
+)
+from app.services.uploads import SpooledUpload
+from app.services.worker_pool import get_worker_pool
+from app.utils.text_utils import normalize_pages
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+_DOWNLOAD_CHUNK = 64 * 1024
+# PDF 헤더는 앞쪽 1KB 안 어디에나 올 수 있다.
+_MAGIC_WINDOW = 1024
+_PDF_MAGIC = b"%PDF-"
+_HWP_MAGICS = (
+    b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",  # HWP 5.0 (OLE 복합 문서)
+    b"PK\x03\x04",  # HWPX (zip)
+)
+
+
+class _TransientDownloadError(Exception):
+    pass
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail="문서 파일이 너무 큽니다.",
+    )
+
+
+def _check_magic(head: bytes, file_type: str) -> None:
+    if file_type == "pdf":
+        valid = _PDF_MAGIC in head[:_MAGIC_WINDOW]
+    else:
+        valid = head.startswith(_HWP_MAGICS)
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="파일 형식이 fileType 과 일치하지 않습니다.",
+        )
+
+
+def detect_file_type(head: bytes, declared: Optional[str]) -> str:
+    # 업로드에 fileType 이 있으면 앞부분과 맞는지 확인하고, 없으면 앞부분으로 정한다.
+    if declared:
+        if declared not in ("pdf", "hwp"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="fileType 은 pdf 또는 hwp 여야 합니다.",
+            )
+        _check_magic(head, declared)
+        return declared
+    if _PDF_MAGIC in head[:_MAGIC_WINDOW]:
+        return "pdf"
+    if head.startswith(_HWP_MAGICS):
+        return "hwp"
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="PDF 또는 HWP 파일만 처리할 수 있습니다.",
+    )
 
 
 class DocumentProcessor:
@@ -21,15 +96,61 @@ class DocumentProcessor:
     async def download_file(self, url: str, suffix: str) -> Path:
         tmp_dir = Path(tempfile.mkdtemp())
         target = tmp_dir / f"source.{suffix}"
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.get(url)
-        if response.status_code >= 400:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="문서를 다운로드하지 못했습니다.",
-            )
-        target.write_bytes(response.content)
-        return target
+        try:
+            for attempt in range(max(0, settings.download_retries) + 1):
+                try:
+                    await self._stream_to_file(url, suffix, target)
+                    return target
+                except _TransientDownloadError as exc:
+                    if attempt >= settings.download_retries:
+                        logger.warning("download failed after %s attempts: %s", attempt + 1, exc)
+                        raise HTTPException(
+                            status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="문서를 다운로드하지 못했습니다.",
+                        ) from exc
+                    delay = settings.download_backoff * (2 ** attempt)
+                    await asyncio.sleep(delay + random.uniform(0, delay))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    async def _stream_to_file(self, url: str, suffix: str, target: Path) -> None:
+        timeout = httpx.Timeout(
+            settings.download_read_timeout,
+            connect=settings.download_connect_timeout,
+        )
+        max_bytes = settings.download_max_bytes
+        try:
+            async with get_http_clients().download().stream("GET", url, timeout=timeout) as response:
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise _TransientDownloadError(f"HTTP {response.status_code}")
+                if response.status_code >= 400:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="문서를 다운로드하지 못했습니다.",
+                    )
+                content_length = response.headers.get("content-length")
+                if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+                    raise _too_large()
+
+                received = 0
+                head = b""
+                checked = False
+                with target.open("wb") as fh:
+                    async for chunk in response.aiter_bytes(_DOWNLOAD_CHUNK):
+                        received += len(chunk)
+                        if received > max_bytes:
+                            raise _too_large()
+                        if not checked:
+                            head += chunk
+                            if len(head) >= _MAGIC_WINDOW:
+                                _check_magic(head, suffix)
+                                checked = True
+                        fh.write(chunk)
+                if not checked:
+                    _check_magic(head, suffix)
+        except (httpx.TimeoutException, httpx.TransportError) as exc:
+            raise _TransientDownloadError(repr(exc)) from exc
 
     def convert_hwp_to_pdf(self, source_path: Path) -> Path:
         output_dir = source_path.parent
@@ -43,6 +164,8 @@ class DocumentProcessor:
                     str(source_path),
                     "--outdir",
                     str(output_dir),
+                    # 동시에 실행되는 변환끼리 기본 사용자 프로필을 두고 충돌하지 않게 한다.
+                    f"-env:UserInstallation={(output_dir / 'office-profile').as_uri()}",
                 ],
                 check=True,
                 stdout=subprocess.PIPE,
@@ -62,45 +185,144 @@ class DocumentProcessor:
             )
         return pdf_path
 
-    def extract_text_from_pdf(self, pdf_path: Path) -> tuple[str, int]:
-        with pdfplumber.open(pdf_path) as pdf:
-            pages = [page.extract_text() or "" for page in pdf.pages]
-            page_count = len(pdf.pages)
-        cleaned = clean_text(pages)
-        cleaned = strip_headers_and_footers(cleaned)
-        return cleaned, page_count
+    async def convert_hwp(self, source_path: Path) -> Path:
+        office_pool = get_office_pool()
+        if office_pool.enabled:
+            try:
+                return await office_pool.convert(source_path)
+            except OfficeUnavailableError as exc:
+                logger.warning("office pool unavailable, falling back to one-shot conversion: %s", exc)
+                office_pool.record_fallback()
+        return await get_worker_pool().run(self.convert_hwp_to_pdf, source_path)
+
+    async def extract_hwp(self, source_path: Path) -> Optional[tuple[str, int]]:
+        if not settings.hwp_native:
+            return None
+        try:
+            with stage("hwp_text"):
+                result = await get_worker_pool().run(
+                    extract_hwp_text, source_path, settings.hwp_max_unpacked_bytes
+                )
+        except HwpParseError as exc:
+            logger.info("native HWP extraction failed, converting with LibreOffice: %s", exc)
+            return None
+        # 섹션은 쪽이 아니므로 반복 머리말 제거는 하지 않는다. 머리말/꼬리말 컨트롤은 본문에 한 번만 들어 있다.
+        return normalize_pages(result.sections, strip_repeated=False), result.page_count
+
+    async def extract_pdf(self, pdf_path: Path) -> tuple[str, int]:
+        with stage("pdf_text"):
+            page_count = await asyncio.to_thread(count_pages, pdf_path)
+            limit = min(page_count, settings.pdf_max_pages)
+            pool = get_worker_pool()
+            if limit <= settings.pdf_parallel_threshold:
+                pages = await pool.run(extract_pages, pdf_path, 0, limit)
+            else:
+                # 큰 문서는 페이지 구간을 나눠 워커들에 동시에 맡긴다. 구간 수는 워커 수를 넘지 않는다.
+                span = max(settings.pdf_pages_per_task, math.ceil(limit / pool.max_workers))
+                chunks = await asyncio.gather(
+                    *(pool.run(extract_pages, pdf_path, start, min(start + span, limit))
+                      for start in range(0, limit, span))
+                )
+                pages = [page for chunk in chunks for page in chunk]
+        pages = await self._ocr_sparse_pages(pdf_path, pages)
+        log_page_timings(pdf_path, pages, page_count)
+        for page in pages:
+            PDF_PAGES.labels(engine=page.engine).inc()
+        return self._join_pages(pages), page_count
+
+    def _ocr_candidates(self, pages: List[PageText]) -> List[int]:
+        if not settings.ocr_enabled:
+            return []
+        candidates = [
+            position
+            for position, page in enumerate(pages)
+            if is_sparse(page, settings.ocr_min_chars)
+        ]
+        return candidates[: settings.ocr_max_pages]
+
+    def _ocr_page(self, pdf_path: Path, page: PageText) -> PageText:
+        result = ocr_page(pdf_path, page.index, settings.ocr_dpi, settings.ocr_lang)
+        # OCR 결과가 기존 텍스트 레이어보다 빈약하면 원래 텍스트를 유지한다.
+        return result if visible_chars(result.text) > visible_chars(page.text) else page
+
+    async def _ocr_sparse_pages(self, pdf_path: Path, pages: List[PageText]) -> List[PageText]:
+        candidates = self._ocr_candidates(pages)
+        if not candidates:
+            return pages
+        pool = get_worker_pool()
+        # 한 문서가 워커 대기열을 독차지하지 않도록 동시에 맡기는 OCR 페이지 수를 제한한다.
+        limit = asyncio.Semaphore(min(pool.max_workers, settings.ocr_workers or (os.cpu_count() or 1)))
+
+        async def run(position: int) -> None:
+            async with limit:
+                pages[position] = await pool.run(self._ocr_page, pdf_path, pages[position])
+
+        with stage("ocr"):
+            await asyncio.gather(*(run(position) for position in candidates))
+        return pages
+
+    def _join_pages(self, pages: List[PageText]) -> str:
+        return normalize_pages(page.text for page in pages)
 
     def ocr_pdf(self, pdf_path: Path) -> str:
-        images = convert_from_path(str(pdf_path), fmt="png")
-        texts = [pytesseract.image_to_string(img, lang="kor+eng") for img in images]
-        return clean_text(texts)
+        page_count = min(count_pages(pdf_path), settings.pdf_max_pages)
+        texts = (
+            ocr_page(pdf_path, index, settings.ocr_dpi, settings.ocr_lang).text
+            for index in range(page_count)
+        )
+        return normalize_pages(texts)
 
     async def process(self, url: str, file_type: str) -> ProcessedDocument:
         source_path: Path | None = None
-        pdf_path: Path | None = None
         try:
-            source_path = await self.download_file(url, file_type)
-            pdf_path = source_path
-            if file_type == "hwp":
-                pdf_path = self.convert_hwp_to_pdf(source_path)
-
-            text, page_count = self.extract_text_from_pdf(pdf_path)
-
-            text = text.strip()
-            if not text:
-                raise HTTPException(
-                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                    detail="문서에서 텍스트를 추출하지 못했습니다.",
-                )
-
-            return ProcessedDocument(
-                extractedText=text,
-                pageCount=page_count,
-                pdfUrl=None,
-            )
+            with stage("download"):
+                source_path = await self.download_file(url, file_type)
+            # 같은 파일을 다시 올리면 변환과 파싱을 건너뛰고 캐시된 결과를 돌려준다.
+            with stage("cache_lookup"):
+                digest = await asyncio.to_thread(hash_file, source_path)
+                cached = await get_extraction_cache().get(digest)
+            if cached is not None:
+                return cached
+            return await self._extract(source_path, file_type, digest)
         finally:
             if source_path is not None:
                 try:
                     shutil.rmtree(source_path.parent)
                 except Exception:
-                    pass
\ No newline at end of file
+                    pass
+
+    async def process_upload(self, upload: SpooledUpload, file_type: str) -> ProcessedDocument:
+        # 업로드는 받는 동안 해시가 끝나 있으므로 캐시에 있으면 디스크에 쓰지 않고 돌려준다.
+        # 작업 디렉터리는 호출한 쪽이 원본 보관까지 마친 뒤 upload.close() 로 지운다.
+        with stage("cache_lookup"):
+            cached = await get_extraction_cache().get(upload.digest)
+        if cached is not None:
+            return cached
+        source_path = await asyncio.to_thread(upload.materialize, file_type)
+        return await self._extract(source_path, file_type, upload.digest)
+
+    async def _extract(self, source_path: Path, file_type: str, digest: str) -> ProcessedDocument:
+        pdf_path = source_path
+        extracted = await self.extract_hwp(source_path) if file_type == "hwp" else None
+        if extracted is None:
+            if file_type == "hwp":
+                with stage("hwp_convert"):
+                    pdf_path = await self.convert_hwp(source_path)
+            # PDF 파싱은 이벤트 루프를 막으므로 워커 풀에서 실행한다.
+            extracted = await self.extract_pdf(pdf_path)
+        text, page_count = extracted
+
+        text = text.strip()
+        if not text:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="문서에서 텍스트를 추출하지 못했습니다.",
+            )
+
+        document = ProcessedDocument(
+            extractedText=text,
+            pageCount=page_count,
+            pdfUrl=None,
+        )
+        await get_extraction_cache().put(digest, document)
+        return document
@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import shutil
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from app.config import get_settings
+from app.schemas import ProcessedDocument
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# 추출 로직(변환, 파싱, 텍스트 정리)이 바뀌면 올린다. 이전 버전 캐시는 모두 무효가 된다.
+EXTRACTOR_VERSION = "5"
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        while chunk := fh.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    def __init__(
+        self,
+        max_entries: int,
+        disk_dir: Optional[str],
+        disk_max_bytes: int,
+        ttl_seconds: int,
+        version: str = EXTRACTOR_VERSION,
+    ) -> None:
+        self.max_entries = max_entries
+        self.disk_max_bytes = disk_max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.version = version
+        self._memory: "OrderedDict[str, ProcessedDocument]" = OrderedDict()
+        self._disk_dir: Optional[Path] = None
+        self._disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            self._open_disk(Path(disk_dir))
+
+    def _open_disk(self, root: Path) -> None:
+        root.mkdir(parents=True, exist_ok=True)
+        # 캐시를 비우는 방법은 EXTRACTOR_VERSION 을 올리는 것뿐이다. 다른 버전의 v<버전> 디렉터리는 시작 시 지운다.
+        for child in root.iterdir():
+            if child.is_dir() and re.fullmatch(r"v\d+", child.name) and child.name != f"v{self.version}":
+                shutil.rmtree(child, ignore_errors=True)
+        self._disk_dir = root / f"v{self.version}"
+        self._disk_dir.mkdir(exist_ok=True)
+        self._disk_bytes = sum(p.stat().st_size for p in self._disk_dir.glob("*/*.json"))
+
+    def _disk_path(self, digest: str) -> Path:
+        assert self._disk_dir is not None
+        return self._disk_dir / digest[:2] / f"{digest}.json"
+
+    async def get(self, digest: str) -> Optional[ProcessedDocument]:
+        cached = self._memory.get(digest)
+        if cached is not None:
+            self._memory.move_to_end(digest)
+            self.hits += 1
+            return cached.model_copy()
+
+        if self._disk_dir is not None:
+            cached = await asyncio.to_thread(self._read_disk, digest)
+            if cached is not None:
+                self.disk_hits += 1
+                self._remember(digest, cached)
+                return cached.model_copy()
+
+        self.misses += 1
+        return None
+
+    async def put(self, digest: str, document: ProcessedDocument) -> None:
+        self._remember(digest, document.model_copy())
+        if self._disk_dir is not None:
+            await asyncio.to_thread(self._write_disk, digest, document)
+
+    def _remember(self, digest: str, document: ProcessedDocument) -> None:
+        if self.max_entries <= 0:
+            return
+        self._memory[digest] = document
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, digest: str) -> Optional[ProcessedDocument]:
+        path = self._disk_path(digest)
+        try:
+            stat = path.stat()
+            if time.time() - stat.st_mtime > self.ttl_seconds:
+                self._unlink(path)
+                return None
+            return ProcessedDocument.model_validate_json(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            logger.warning("discarding unreadable extraction cache entry %s: %s", path, exc)
+            self._unlink(path)
+            return None
+
+    def _write_disk(self, digest: str, document: ProcessedDocument) -> None:
+        path = self._disk_path(digest)
+        path.parent.mkdir(exist_ok=True)
+        data = document.model_dump_json().encode("utf-8")
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        previous = path.stat().st_size if path.exists() else 0
+        tmp_path.replace(path)
+        self._disk_bytes += len(data) - previous
+        if self._disk_bytes > self.disk_max_bytes:
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        assert self._disk_dir is not None
+        now = time.time()
+        entries = []
+        for path in self._disk_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.ttl_seconds:
+                self._unlink(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        # 만료 항목을 지운 뒤에도 넘치면 오래된 것부터 용량의 90% 까지 줄인다.
+        total = sum(size for _, size, _ in entries)
+        target = int(self.disk_max_bytes * 0.9)
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            self._unlink(path)
+            total -= size
+        self._disk_bytes = total
+
+    def _unlink(self, path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._memory),
+            "diskBytes": self._disk_bytes if self._disk_dir is not None else None,
+            "hits": self.hits,
+            "diskHits": self.disk_hits,
+            "misses": self.misses,
+            "hitRatio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+
+_cache = ExtractionCache(
+    max_entries=settings.extraction_cache_size,
+    disk_dir=settings.extraction_cache_dir,
+    disk_max_bytes=settings.extraction_cache_max_bytes,
+    ttl_seconds=settings.extraction_cache_ttl,
+)
+
+
+def get_extraction_cache() -> ExtractionCache:
+    return _cache
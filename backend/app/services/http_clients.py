@@ -0,0 +1,141 @@
+import importlib.util
+from typing import TYPE_CHECKING, Dict, Optional
+
+import httpx
+
+# openai 패키지는 임포트에 0.5초 가까이 걸린다. 클라이언트를 처음 만들 때 읽는다.
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def _http2_available() -> bool:
+    return settings.http2 and importlib.util.find_spec("h2") is not None
+
+
+def _limits(max_connections: int) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(settings.http_max_keepalive, max_connections),
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+
+
+def _parse_host_limits(raw: str) -> Dict[str, int]:
+    # "firebasestorage.googleapis.com=32,storage.googleapis.com=16"
+    limits: Dict[str, int] = {}
+    for item in raw.split(","):
+        host, _, size = item.strip().partition("=")
+        if host and size:
+            limits[host] = int(size)
+    return limits
+
+
+def _pool_stats(transport: httpx.AsyncBaseTransport) -> dict:
+    # httpx 는 풀 상태를 공개하지 않으므로 httpcore 풀을 직접 들여다본다.
+    pool = getattr(transport, "_pool", None)
+    if pool is None:
+        return {}
+    connections = list(getattr(pool, "connections", []))
+    requests = list(getattr(pool, "_requests", []))
+    idle = sum(1 for conn in connections if conn.is_idle())
+    queued = sum(1 for req in requests if req.is_queued())
+    return {
+        "maxConnections": getattr(pool, "_max_connections", None),
+        "connections": len(connections),
+        "activeConnections": len(connections) - idle,
+        "idleConnections": idle,
+        "activeRequests": len(requests) - queued,
+        "queuedRequests": queued,
+    }
+
+
+class HttpClients:
+    def __init__(self) -> None:
+        self._download: Optional[httpx.AsyncClient] = None
+        self._openai_http: Optional[httpx.AsyncClient] = None
+        self._openai: Optional["AsyncOpenAI"] = None
+        self._openai_fallback: Optional["AsyncOpenAI"] = None
+
+    def download(self) -> httpx.AsyncClient:
+        if self._download is None:
+            http2 = _http2_available()
+            mounts = {
+                f"all://{host}": httpx.AsyncHTTPTransport(limits=_limits(size), http2=http2)
+                for host, size in _parse_host_limits(settings.http_host_limits).items()
+            }
+            self._download = httpx.AsyncClient(
+                timeout=60,
+                limits=_limits(settings.http_max_connections),
+                http2=http2,
+                mounts=mounts,
+            )
+        return self._download
+
+    def openai(self) -> "AsyncOpenAI":
+        if self._openai is None:
+            from openai import AsyncOpenAI
+
+            if not settings.openai_api_key:
+                raise RuntimeError("OPENAI_API_KEY is required")
+            self._openai_http = httpx.AsyncClient(
+                limits=_limits(settings.openai_max_connections),
+                http2=_http2_available(),
+            )
+            # 재시도와 시간 제한은 LlmGovernor 가 맡으므로 SDK 자체 재시도는 끈다.
+            self._openai = AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.api_base_url,
+                http_client=self._openai_http,
+                max_retries=0,
+            )
+        return self._openai
+
+    def openai_fallback(self) -> Optional["AsyncOpenAI"]:
+        if not (settings.openai_fallback_model or settings.openai_fallback_base_url):
+            return None
+        if not settings.openai_fallback_base_url:
+            return self.openai()
+        if self._openai_fallback is None:
+            from openai import AsyncOpenAI
+
+            self.openai()
+            self._openai_fallback = AsyncOpenAI(
+                api_key=settings.openai_fallback_api_key,
+                base_url=settings.openai_fallback_base_url,
+                http_client=self._openai_http,
+                max_retries=0,
+            )
+        return self._openai_fallback
+
+    async def aclose(self) -> None:
+        if self._download is not None:
+            await self._download.aclose()
+            self._download = None
+        if self._openai is not None:
+            # 예비 클라이언트는 같은 httpx 풀을 쓰므로 주 클라이언트만 닫으면 된다.
+            await self._openai.close()
+            self._openai = None
+            self._openai_fallback = None
+            self._openai_http = None
+
+    def stats(self) -> dict:
+        result: Dict[str, dict] = {}
+        if self._download is not None:
+            result["download"] = _pool_stats(self._download._transport)
+            for pattern, transport in self._download._mounts.items():
+                if transport is not None:
+                    result[f"download:{pattern.pattern}"] = _pool_stats(transport)
+        if self._openai_http is not None:
+            result["openai"] = _pool_stats(self._openai_http._transport)
+        return result
+
+
+_clients = HttpClients()
+
+
+def get_http_clients() -> HttpClients:
+    return _clients
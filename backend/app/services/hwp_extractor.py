@@ -0,0 +1,276 @@
+import logging
+import re
+import struct
+import time
+import zipfile
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+from xml.etree import ElementTree
+
+import olefile
+
+logger = logging.getLogger(__name__)
+
+_OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+_ZIP_MAGIC = b"PK\x03\x04"
+_READ_CHUNK = 64 * 1024
+
+# HWP 5.0 FileHeader 속성 비트: 압축, 암호, 배포용 문서.
+_FLAG_COMPRESSED = 0x01
+_FLAG_PASSWORD = 0x02
+_FLAG_DISTRIBUTION = 0x04
+
+_TAG_PARA_HEADER = 0x42
+_TAG_PARA_TEXT = 0x43
+_TAG_PARA_LINE_SEG = 0x45
+_LINE_SEG_SIZE = 36
+
+# PARA_TEXT 의 제어 문자. 문자 제어는 한 글자, 나머지(인라인/확장 제어)는 부가 정보를 포함해 8글자를 차지한다.
+_CHAR_CONTROLS = {0: "", 10: "\n", 13: "", 24: "-", 25: "", 26: "", 27: "", 28: "", 29: "", 30: " ", 31: " "}
+_INLINE_TEXT = {9: "\t"}
+_CONTROL_WIDTH = 8
+# UTF-16LE 에서 0x00~0x1F 코드 유닛. 홀수 위치 일치는 글자 경계가 아니므로 걸러낸다.
+_CONTROL = re.compile(rb"(?=[\x00-\x1f]\x00)")
+
+_SECTION_NAME = re.compile(r"Contents/section(\d+)\.xml")
+
+
+class HwpParseError(Exception):
+    pass
+
+
+@dataclass
+class HwpText:
+    sections: List[str]
+    page_count: int
+    engine: str
+    elapsed_ms: float
+
+
+class _PageCounter:
+    # 한글 파일에는 쪽 수가 저장되지 않는다. 최상위 문단 줄의 세로 위치가 다시 작아지면 새 쪽으로 센다.
+    def __init__(self) -> None:
+        self.pages = 0
+        self._last = None
+
+    def line(self, vertical_pos: int) -> None:
+        if self._last is None or vertical_pos < self._last:
+            self.pages += 1
+        self._last = vertical_pos
+
+    def section(self) -> None:
+        self._last = None
+
+
+def _para_text(payload: bytes) -> str:
+    parts: List[str] = []
+    start = 0
+    for match in _CONTROL.finditer(payload):
+        position = match.start()
+        if position < start or position % 2:
+            continue
+        if position > start:
+            parts.append(payload[start:position].decode("utf-16-le", "replace"))
+        code = payload[position]
+        if code in _CHAR_CONTROLS:
+            parts.append(_CHAR_CONTROLS[code])
+            start = position + 2
+        else:
+            parts.append(_INLINE_TEXT.get(code, ""))
+            start = position + _CONTROL_WIDTH * 2
+    if start < len(payload):
+        parts.append(payload[start:].decode("utf-16-le", "replace"))
+    return "".join(parts)
+
+
+def _spend(budget: List[int], size: int) -> None:
+    budget[0] -= size
+    if budget[0] < 0:
+        raise HwpParseError("sections exceed the unpacked size limit")
+
+
+def _unpacked(stream, compressed: bool, budget: List[int]) -> Iterator[bytes]:
+    # 섹션 스트림을 조각 단위로 풀어 흘려보낸다. 남은 예산보다 크게 풀리면 바로 멈춘다.
+    inflater = zlib.decompressobj(-15) if compressed else None
+    while True:
+        chunk = stream.read(_READ_CHUNK)
+        if not chunk:
+            break
+        if inflater is not None:
+            chunk = inflater.decompress(chunk, budget[0] + 1)
+            if inflater.unconsumed_tail:
+                raise HwpParseError("sections exceed the unpacked size limit")
+        _spend(budget, len(chunk))
+        yield chunk
+    if inflater is not None:
+        tail = inflater.flush()
+        _spend(budget, len(tail))
+        yield tail
+
+
+def _records(chunks: Iterable[bytes]) -> Iterator[Tuple[int, int, bytes]]:
+    # 레코드 헤더: 태그 10비트, 깊이 10비트, 크기 12비트. 크기가 0xFFF 면 뒤따르는 4바이트가 실제 크기다.
+    buffer = bytearray()
+    offset = 0
+    for chunk in chunks:
+        buffer += chunk
+        while True:
+            if len(buffer) - offset < 4:
+                break
+            (header,) = struct.unpack_from("<I", buffer, offset)
+            size = header >> 20
+            head = 4
+            if size == 0xFFF:
+                if len(buffer) - offset < 8:
+                    break
+                (size,) = struct.unpack_from("<I", buffer, offset + 4)
+                head = 8
+            if len(buffer) - offset < head + size:
+                break
+            body = bytes(buffer[offset + head:offset + head + size])
+            yield header & 0x3FF, (header >> 10) & 0x3FF, body
+            offset += head + size
+        # 처리한 앞부분은 버려 버퍼가 섹션 전체 크기로 자라지 않게 한다.
+        del buffer[:offset]
+        offset = 0
+    # 스트림 끝의 0 채움은 무시한다.
+    if any(buffer):
+        raise HwpParseError("truncated record")
+
+
+def _hwp5_section(ole: olefile.OleFileIO, name: str, compressed: bool, budget: List[int], pages: _PageCounter) -> str:
+    paragraphs: List[str] = []
+    top_level = False
+    with ole.openstream(name) as stream:
+        for tag, level, body in _records(_unpacked(stream, compressed, budget)):
+            if tag == _TAG_PARA_HEADER:
+                top_level = level == 0
+            elif tag == _TAG_PARA_TEXT:
+                # 표, 글상자 안의 문단도 같은 스트림에 차례로 들어 있으므로 그대로 이어 붙인다.
+                paragraphs.append(_para_text(body))
+            elif tag == _TAG_PARA_LINE_SEG and top_level:
+                for position in range(0, len(body) - _LINE_SEG_SIZE + 1, _LINE_SEG_SIZE):
+                    pages.line(struct.unpack_from("<i", body, position + 4)[0])
+    pages.section()
+    return "\n".join(paragraphs)
+
+
+def _section_order(name: str) -> int:
+    return int(name.rsplit("Section", 1)[1])
+
+
+def extract_hwp5(path: Path, max_unpacked_bytes: int) -> Tuple[List[str], int]:
+    try:
+        ole = olefile.OleFileIO(str(path))
+    except Exception as exc:
+        raise HwpParseError(f"not an OLE file: {exc}") from exc
+    try:
+        with ole.openstream("FileHeader") as stream:
+            header = stream.read(40)
+        if not header.startswith(b"HWP Document File") or len(header) < 40:
+            raise HwpParseError("missing HWP file header")
+        (flags,) = struct.unpack_from("<I", header, 36)
+        if flags & (_FLAG_PASSWORD | _FLAG_DISTRIBUTION):
+            raise HwpParseError("encrypted or distribution-only document")
+        names = sorted(
+            ("/".join(entry) for entry in ole.listdir() if len(entry) == 2 and entry[0] == "BodyText"),
+            key=_section_order,
+        )
+        if not names:
+            raise HwpParseError("no BodyText sections")
+        budget = [max_unpacked_bytes]
+        pages = _PageCounter()
+        sections = [_hwp5_section(ole, name, bool(flags & _FLAG_COMPRESSED), budget, pages) for name in names]
+        return sections, pages.pages
+    except HwpParseError:
+        raise
+    except Exception as exc:
+        # 손상된 파일은 어떤 예외로든 깨질 수 있다. 모두 변환 경로로 넘긴다.
+        raise HwpParseError(repr(exc)) from exc
+    finally:
+        ole.close()
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _hwpx_section(stream, pages: _PageCounter) -> str:
+    parts: List[str] = []
+    depth = 0
+    # 문단(p) 안에 표가 있으면 셀 문단이 다시 p 로 중첩된다. 쪽 수는 최상위 문단의 줄 위치로만 센다.
+    for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+        name = _local(element.tag)
+        if event == "start":
+            if name == "p":
+                depth += 1
+            elif name == "lineseg" and depth == 1:
+                pages.line(int(element.get("vertpos", "0")))
+            continue
+        if name == "t":
+            parts.append(element.text or "")
+            for child in element:
+                child_name = _local(child.tag)
+                parts.append("\t" if child_name == "tab" else "\n" if child_name == "lineBreak" else "")
+                parts.append(child.tail or "")
+            element.clear()
+        elif name == "p":
+            depth -= 1
+            parts.append("\n")
+            if depth == 0:
+                element.clear()
+    pages.section()
+    return "".join(parts)
+
+
+def extract_hwpx(path: Path, max_unpacked_bytes: int) -> Tuple[List[str], int]:
+    try:
+        with zipfile.ZipFile(path) as archive:
+            entries = sorted(
+                (info for info in archive.infolist() if _SECTION_NAME.fullmatch(info.filename)),
+                key=lambda info: int(_SECTION_NAME.fullmatch(info.filename).group(1)),
+            )
+            if not entries:
+                raise HwpParseError("no section XML in HWPX package")
+            if sum(info.file_size for info in entries) > max_unpacked_bytes:
+                raise HwpParseError("sections exceed the unpacked size limit")
+            pages = _PageCounter()
+            sections = []
+            for info in entries:
+                with archive.open(info) as stream:
+                    sections.append(_hwpx_section(stream, pages))
+            return sections, pages.pages
+    except HwpParseError:
+        raise
+    except Exception as exc:
+        raise HwpParseError(repr(exc)) from exc
+
+
+def extract_hwp_text(path: Path, max_unpacked_bytes: int) -> HwpText:
+    started = time.perf_counter()
+    with path.open("rb") as fh:
+        magic = fh.read(8)
+    if magic.startswith(_OLE_MAGIC):
+        sections, page_count = extract_hwp5(path, max_unpacked_bytes)
+        engine = "hwp5"
+    elif magic.startswith(_ZIP_MAGIC):
+        sections, page_count = extract_hwpx(path, max_unpacked_bytes)
+        engine = "hwpx"
+    else:
+        raise HwpParseError("unknown HWP container")
+    if not any(section.strip() for section in sections):
+        # 본문이 그림뿐인 문서는 변환 후 OCR 해야 하므로 실패로 돌려보낸다.
+        raise HwpParseError("no text in document")
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(
+        "extracted %s sections (~%s pages) from %s with %s in %.1f ms",
+        len(sections),
+        page_count,
+        path.name,
+        engine,
+        elapsed_ms,
+    )
+    # 줄 위치 정보가 없는 파일은 섹션 수를 쪽 수로 삼는다.
+    return HwpText(sections=sections, page_count=page_count or len(sections), engine=engine, elapsed_ms=elapsed_ms)
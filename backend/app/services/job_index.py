@@ -0,0 +1,401 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from fastapi import HTTPException, status
+
+from app.config import get_settings
+from app.schemas import JobMatchRequest, JobMatchResponse, JobPostingMatch
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# BM25 매개변수.
+_K1 = 1.2
+_B = 0.75
+# 제목은 본문보다 무겁게 본다. 토큰을 이만큼 반복해 넣는다.
+_TITLE_BOOST = 3
+
+# 한글 음절 bigram(겹쳐서), 한 글자 한글 단어, 두 글자 이상 영숫자 단어.
+_HANGUL_BIGRAM = re.compile(r"(?=([가-힣]{2}))")
+_HANGUL_SINGLE = re.compile(r"(?<![가-힣])[가-힣](?![가-힣])")
+_LATIN = re.compile(r"[a-z0-9]{2,}")
+_NO_DEADLINE = 99991231
+
+# 공고 데이터의 지역 표기(서울, 경남)에 맞춘다. 나머지는 앞 두 글자가 약칭이다(서울특별시, 대전광역시, 강원도 원주).
+_REGION_ALIASES = {
+    "충청북도": "충북",
+    "충청남도": "충남",
+    "경상북도": "경북",
+    "경상남도": "경남",
+    "전라북도": "전북",
+    "전북특별자치도": "전북",
+    "전라남도": "전남",
+}
+_REGIONS = ("강원", "경기", "경남", "경북", "광주", "대구", "대전", "부산", "서울", "세종", "울산", "인천", "전남", "전북", "제주", "충남", "충북")
+_NATIONWIDE = "전국"
+
+
+def tokenize(text: str) -> List[str]:
+    # 한글은 형태소 분석 없이 음절 bigram 으로 쪼갠다. "데이터분석가" 와 "데이터 분석" 이 같은 토큰을 나눠 갖는다.
+    # 순서는 쓰지 않으므로 정규식 세 번으로 모은다. 글자 단위 파이썬 루프보다 몇 배 빠르다.
+    text = text.lower()
+    return _HANGUL_BIGRAM.findall(text) + _HANGUL_SINGLE.findall(text) + _LATIN.findall(text)
+
+
+def normalize_region(value: str) -> str:
+    value = value.strip()
+    for name, short in _REGION_ALIASES.items():
+        if value.startswith(name):
+            return short
+    return value[:2] if value[:2] in _REGIONS else value
+
+
+def _split(value: Any) -> List[str]:
+    if not value:
+        return []
+    return [part.strip() for part in str(value).split(",") if part.strip()]
+
+
+def _ymd(value: Any) -> Optional[date]:
+    digits = re.sub(r"\D", "", str(value or ""))[:8]
+    try:
+        return datetime.strptime(digits, "%Y%m%d").date() if len(digits) == 8 else None
+    except ValueError:
+        return None
+
+
+@dataclass
+class _Posting:
+    postingId: str
+    title: str
+    institution: Optional[str]
+    regions: List[str]
+    ncsCategories: List[str]
+    hireTypes: List[str]
+    deadline: Optional[date]
+    url: Optional[str]
+    body: str = field(repr=False)
+
+
+def _from_public(entry: Dict[str, Any]) -> Optional[_Posting]:
+    # scripts/results.json: 공공기관 채용정보 API 의 listItem 을 그대로 저장한 형식.
+    item = entry.get("listItem")
+    if not isinstance(item, dict):
+        return None
+    title = " ".join(str(item.get("recrutPbancTtl") or "").split())
+    if not title:
+        return None
+    body = "\n".join(
+        str(item.get(key) or "")
+        for key in ("instNm", "ncsCdNmLst", "hireTypeNmLst", "recrutSeNm", "acbgCondNmLst", "aplyQlfcCn", "prefCondCn", "prefCn")
+    )
+    return _Posting(
+        postingId=str(item.get("recrutPblntSn") or hashlib.sha256(title.encode()).hexdigest()[:16]),
+        title=title,
+        institution=item.get("instNm") or None,
+        regions=[normalize_region(region) for region in _split(item.get("workRgnNmLst"))],
+        ncsCategories=_split(item.get("ncsCdNmLst")),
+        hireTypes=_split(item.get("hireTypeNmLst")),
+        deadline=_ymd(item.get("pbancEndYmd")),
+        url=item.get("srcUrl") or None,
+        body=body,
+    )
+
+
+def _from_curated(entry: Dict[str, Any]) -> Optional[_Posting]:
+    # jobs.json: 앱이 쓰는 정리된 공고 형식(title, company, region, date, summaryItems, detailRows).
+    title = " ".join(str(entry.get("title") or "").split())
+    if not title:
+        return None
+    parts = [str(entry.get("company") or ""), str(entry.get("description") or "")]
+    parts += [str(row.get("value") or "") for row in entry.get("summaryItems") or [] if isinstance(row, dict)]
+    parts += [str(row.get("description") or "") for row in entry.get("detailRows") or [] if isinstance(row, dict)]
+    digest = hashlib.sha256(f"{title}\n{entry.get('url') or ''}".encode()).hexdigest()[:16]
+    return _Posting(
+        postingId=f"curated-{digest}",
+        title=title,
+        institution=entry.get("company") or None,
+        regions=[normalize_region(region) for region in _split(entry.get("region"))],
+        ncsCategories=_split(entry.get("ncsCdNmLst")),
+        hireTypes=[],
+        deadline=_ymd(entry.get("date")),
+        url=entry.get("url") or None,
+        body="\n".join(parts),
+    )
+
+
+def load_postings(paths: Iterable[Path]) -> List[_Posting]:
+    postings: Dict[str, _Posting] = {}
+    for path in paths:
+        with path.open(encoding="utf-8") as fh:
+            entries = json.load(fh)
+        if not isinstance(entries, list):
+            raise ValueError(f"{path} is not a JSON list")
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            posting = _from_public(entry) if "listItem" in entry else _from_curated(entry)
+            # 같은 공고가 여러 파일에 있으면 뒤에 나온 것을 쓴다.
+            if posting is not None:
+                postings[posting.postingId] = posting
+    return list(postings.values())
+
+
+class _Snapshot:
+    # 한 번 만들면 바꾸지 않는다. 재적재는 새 스냅샷을 만들어 참조만 바꾼다.
+    def __init__(self, postings: List[_Posting], version: str) -> None:
+        self.postings = postings
+        self.version = version
+        self.loaded_at = datetime.now(timezone.utc)
+        n_docs = len(postings)
+        vocabulary: Dict[str, int] = {}
+        rows: List[np.ndarray] = []
+        cols: List[np.ndarray] = []
+        counts: List[np.ndarray] = []
+        lengths = np.zeros(n_docs, dtype=np.float32)
+        for doc, posting in enumerate(postings):
+            tokens = tokenize(posting.title) * _TITLE_BOOST + tokenize(posting.body)
+            tf = Counter(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+            lengths[doc] = len(tokens)
+            rows.append(np.fromiter(tf.keys(), dtype=np.int32, count=len(tf)))
+            cols.append(np.full(len(tf), doc, dtype=np.int32))
+            counts.append(np.fromiter(tf.values(), dtype=np.float32, count=len(tf)))
+        self.vocabulary = vocabulary
+        term = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+        docs = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int32)
+        tf = np.concatenate(counts) if counts else np.zeros(0, dtype=np.float32)
+
+        # 용어 x 문서 CSR 행렬. 행 t 는 용어 t 가 나오는 문서와 BM25 가중치(idf 포함)다.
+        # 질의는 행 몇 개를 골라 문서별로 더하는 것이라 희소 행렬-벡터 곱과 같다.
+        order = np.argsort(term, kind="stable")
+        term, docs, tf = term[order], docs[order], tf[order]
+        df = np.bincount(term, minlength=len(vocabulary))
+        self.indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(df, out=self.indptr[1:])
+        self.idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avg_length = float(lengths.mean()) if n_docs else 1.0
+        norm = _K1 * (1 - _B + _B * lengths[docs] / max(avg_length, 1.0))
+        self.docs = docs
+        self.weights = (self.idf[term] * tf * (_K1 + 1) / (tf + norm)).astype(np.float32)
+
+        # 필터용 비트마스크. 전국 공고는 모든 지역 마스크에 켠다.
+        self.region_masks: Dict[str, np.ndarray] = {}
+        self.ncs_masks: Dict[str, np.ndarray] = {}
+        nationwide = np.zeros(n_docs, dtype=bool)
+        for doc, posting in enumerate(postings):
+            for region in posting.regions:
+                if region == _NATIONWIDE:
+                    nationwide[doc] = True
+                else:
+                    self.region_masks.setdefault(region, np.zeros(n_docs, dtype=bool))[doc] = True
+            for category in posting.ncsCategories:
+                self.ncs_masks.setdefault(category, np.zeros(n_docs, dtype=bool))[doc] = True
+        for region in _REGIONS:
+            self.region_masks[region] = self.region_masks.get(region, np.zeros(n_docs, dtype=bool)) | nationwide
+        self.deadlines = np.array(
+            [int(p.deadline.strftime("%Y%m%d")) if p.deadline else _NO_DEADLINE for p in postings],
+            dtype=np.int32,
+        )
+
+    def _mask(self, masks: Dict[str, np.ndarray], values: List[str]) -> np.ndarray:
+        combined = np.zeros(len(self.postings), dtype=bool)
+        for value in values:
+            mask = masks.get(value)
+            if mask is not None:
+                combined |= mask
+        return combined
+
+    def filter(self, request: JobMatchRequest) -> Optional[np.ndarray]:
+        mask: Optional[np.ndarray] = None
+
+        def narrow(other: np.ndarray) -> None:
+            nonlocal mask
+            mask = other if mask is None else mask & other
+
+        if request.regions:
+            narrow(self._mask(self.region_masks, [normalize_region(region) for region in request.regions]))
+        if request.ncsCategories:
+            narrow(self._mask(self.ncs_masks, [category.strip() for category in request.ncsCategories]))
+        # 마감일이 없는 공고(상시 채용)는 deadlineFrom 은 통과하고 deadlineTo 에는 걸린다.
+        if request.deadlineFrom is not None:
+            narrow(self.deadlines >= int(request.deadlineFrom.strftime("%Y%m%d")))
+        if request.deadlineTo is not None:
+            narrow(self.deadlines <= int(request.deadlineTo.strftime("%Y%m%d")))
+        return mask
+
+    def score(self, text: str, max_terms: int) -> np.ndarray:
+        terms = np.fromiter(
+            {self.vocabulary[token] for token in tokenize(text) if token in self.vocabulary},
+            dtype=np.int64,
+        )
+        if len(terms) > max_terms:
+            # 긴 이력서는 흔한 토큰이 대부분이다. idf 가 높은 용어만 남겨 더할 행 수를 묶어 둔다.
+            terms = terms[np.argpartition(-self.idf[terms], max_terms)[:max_terms]]
+        if not len(terms):
+            return np.zeros(len(self.postings), dtype=np.float32)
+        slices = [slice(self.indptr[t], self.indptr[t + 1]) for t in terms.tolist()]
+        docs = np.concatenate([self.docs[s] for s in slices])
+        weights = np.concatenate([self.weights[s] for s in slices])
+        return np.bincount(docs, weights=weights, minlength=len(self.postings))
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "loadedAt": self.loaded_at.isoformat(),
+            "postings": len(self.postings),
+            "terms": len(self.vocabulary),
+            "nonzeros": int(len(self.docs)),
+            "regions": len(self.region_masks),
+            "ncsCategories": len(self.ncs_masks),
+        }
+
+
+def _fingerprint(paths: List[Path]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        stat = path.stat()
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+class JobIndex:
+    def __init__(self, paths: List[str], reload_interval: float, max_query_terms: int, query_chars: int) -> None:
+        self.paths = [Path(path) for path in paths]
+        self.reload_interval = reload_interval
+        self.max_query_terms = max_query_terms
+        self.query_chars = query_chars
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = asyncio.Lock()
+        self._watcher: Optional[asyncio.Task] = None
+        self._failed_version: Optional[str] = None
+        self.reloads = 0
+        self.reload_failures = 0
+        self.matches = 0
+        self._match_seconds = 0.0
+
+    def _existing(self) -> List[Path]:
+        return [path for path in self.paths if path.is_file()]
+
+    def _build(self, paths: List[Path], version: str) -> _Snapshot:
+        started = time.perf_counter()
+        snapshot = _Snapshot(load_postings(paths), version)
+        logger.info(
+            "job index %s built from %s: %s postings, %s terms in %.1f ms",
+            version,
+            ", ".join(str(path) for path in paths),
+            len(snapshot.postings),
+            len(snapshot.vocabulary),
+            (time.perf_counter() - started) * 1000,
+        )
+        return snapshot
+
+    async def reload(self, force: bool = False) -> bool:
+        async with self._lock:
+            paths = self._existing()
+            if not paths:
+                if self._snapshot is None:
+                    logger.warning("no job posting data found in %s", ", ".join(str(path) for path in self.paths))
+                return False
+            version = _fingerprint(paths)
+            if not force and version in (getattr(self._snapshot, "version", None), self._failed_version):
+                return False
+            try:
+                snapshot = await asyncio.to_thread(self._build, paths, version)
+            except Exception:
+                # 파일을 쓰는 도중에 읽었거나 형식이 깨졌으면 기존 인덱스로 계속 응답한다.
+                # 같은 파일로는 다시 시도하지 않는다. 파일이 바뀌거나 강제 재적재를 요청하면 다시 읽는다.
+                self._failed_version = version
+                self.reload_failures += 1
+                logger.exception("job index reload failed; keeping version %s", getattr(self._snapshot, "version", None))
+                return False
+            self._snapshot = snapshot
+            self._failed_version = None
+            self.reloads += 1
+            return True
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.reload()
+            except Exception:
+                logger.exception("job index watcher failed")
+
+    async def start(self) -> None:
+        await self.reload()
+        if self.reload_interval > 0 and self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            await asyncio.gather(self._watcher, return_exceptions=True)
+            self._watcher = None
+
+    def match(self, request: JobMatchRequest) -> JobMatchResponse:
+        snapshot = self._snapshot
+        if snapshot is None or not snapshot.postings:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="채용공고 데이터가 준비되지 않았습니다.",
+            )
+        started = time.perf_counter()
+        scores = snapshot.score(request.extractedText[: self.query_chars], self.max_query_terms)
+        mask = snapshot.filter(request)
+        candidates = np.flatnonzero(scores > 0) if mask is None else np.flatnonzero(mask & (scores > 0))
+        if len(candidates) > request.limit:
+            top = candidates[np.argpartition(-scores[candidates], request.limit)[: request.limit]]
+        else:
+            top = candidates
+        top = top[np.argsort(-scores[top], kind="stable")]
+        matches = []
+        for doc in top.tolist():
+            posting = snapshot.postings[doc]
+            matches.append(
+                JobPostingMatch(
+                    postingId=posting.postingId,
+                    title=posting.title,
+                    institution=posting.institution,
+                    regions=posting.regions,
+                    ncsCategories=posting.ncsCategories,
+                    hireTypes=posting.hireTypes,
+                    deadline=posting.deadline,
+                    url=posting.url,
+                    score=round(float(scores[doc]), 4),
+                )
+            )
+        self.matches += 1
+        self._match_seconds += time.perf_counter() - started
+        return JobMatchResponse(matches=matches, candidates=len(candidates), indexVersion=snapshot.version)
+
+    def stats(self) -> dict:
+        return {
+            **(self._snapshot.stats() if self._snapshot is not None else {"version": None, "postings": 0}),
+            "reloads": self.reloads,
+            "reloadFailures": self.reload_failures,
+            "matches": self.matches,
+            "avgMatchMs": self._match_seconds * 1000 / self.matches if self.matches else 0.0,
+        }
+
+
+_job_index = JobIndex(
+    paths=[path.strip() for path in settings.jobs_data_paths.split(",") if path.strip()],
+    reload_interval=settings.jobs_reload_interval,
+    max_query_terms=settings.jobs_max_query_terms,
+    query_chars=settings.jobs_query_chars,
+)
+
+
+def get_job_index() -> JobIndex:
+    return _job_index
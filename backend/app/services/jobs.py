@@ -0,0 +1,518 @@
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import logging
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from fastapi import HTTPException, status
+
+from app.config import get_settings
+from app.schemas import JobRequest, JobResult, JobStatus
+from app.services.http_clients import get_http_clients
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+Pipeline = Callable[[JobRequest], Awaitable[JobResult]]
+
+_FINISHED = ("succeeded", "failed")
+# 완료된 작업 정리는 제출 이만큼마다 한 번씩 한다.
+_PRUNE_EVERY = 100
+_INTERRUPTED = "작업이 처리 도중 중단되었습니다. 다시 제출해 주세요."
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobStore(ABC):
+    # key 는 클라이언트 범위를 붙인 idempotency 키다. create 는 같은 키의 작업이 이미 있으면
+    # 새로 만들지 않고 기존 작업과 그 요청을 돌려준다.
+    @abstractmethod
+    async def create(self, job: JobStatus, request: JobRequest, key: Optional[str]) -> Tuple[JobStatus, JobRequest]:
+        ...
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[JobStatus]:
+        ...
+
+    @abstractmethod
+    async def get_by_key(self, key: str) -> Optional[Tuple[JobStatus, JobRequest]]:
+        ...
+
+    @abstractmethod
+    async def update(self, job: JobStatus) -> None:
+        ...
+
+    # queued 상태인 작업을 running 으로 바꾸는 데 성공한 쪽만 실행한다.
+    @abstractmethod
+    async def claim(self, job: JobStatus) -> bool:
+        ...
+
+    @abstractmethod
+    async def delete(self, job_id: str) -> None:
+        ...
+
+    @abstractmethod
+    async def pending(self) -> List[Tuple[JobStatus, JobRequest]]:
+        ...
+
+    # stale_before 보다 오래 running 에 머문 작업을 실패로 바꾸고 바꾼 작업을 돌려준다.
+    @abstractmethod
+    async def fail_stale(self, stale_before: float, error: str) -> List[Tuple[JobStatus, JobRequest]]:
+        ...
+
+    @abstractmethod
+    async def prune(self, ttl_seconds: int) -> None:
+        ...
+
+
+class MemoryJobStore(JobStore):
+    def __init__(self) -> None:
+        self._jobs: Dict[str, Tuple[JobStatus, JobRequest]] = {}
+        self._keys: Dict[str, str] = {}
+        self._key_of: Dict[str, str] = {}
+
+    async def create(self, job: JobStatus, request: JobRequest, key: Optional[str]) -> Tuple[JobStatus, JobRequest]:
+        if key:
+            existing = await self.get_by_key(key)
+            if existing is not None:
+                return existing
+            self._keys[key] = job.jobId
+            self._key_of[job.jobId] = key
+        self._jobs[job.jobId] = (job, request)
+        return job, request
+
+    async def get(self, job_id: str) -> Optional[JobStatus]:
+        entry = self._jobs.get(job_id)
+        return entry[0].model_copy() if entry else None
+
+    async def get_by_key(self, key: str) -> Optional[Tuple[JobStatus, JobRequest]]:
+        entry = self._jobs.get(self._keys.get(key, ""))
+        return (entry[0].model_copy(), entry[1]) if entry else None
+
+    async def update(self, job: JobStatus) -> None:
+        entry = self._jobs.get(job.jobId)
+        if entry is not None:
+            self._jobs[job.jobId] = (job.model_copy(), entry[1])
+
+    async def claim(self, job: JobStatus) -> bool:
+        entry = self._jobs.get(job.jobId)
+        if entry is None or entry[0].status != "queued":
+            return False
+        self._jobs[job.jobId] = (job.model_copy(), entry[1])
+        return True
+
+    async def delete(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+        key = self._key_of.pop(job_id, None)
+        if key is not None:
+            self._keys.pop(key, None)
+
+    async def pending(self) -> List[Tuple[JobStatus, JobRequest]]:
+        return []
+
+    async def fail_stale(self, stale_before: float, error: str) -> List[Tuple[JobStatus, JobRequest]]:
+        # 메모리 저장소는 프로세스와 함께 사라지므로 남은 running 작업이 없다.
+        return []
+
+    async def prune(self, ttl_seconds: int) -> None:
+        cutoff = time.time() - ttl_seconds
+        expired = [
+            job_id
+            for job_id, (job, _) in self._jobs.items()
+            if job.status in _FINISHED and job.updatedAt.timestamp() < cutoff
+        ]
+        for job_id in expired:
+            await self.delete(job_id)
+
+
+class SqliteJobStore(JobStore):
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    idempotency_key TEXT UNIQUE,
+                    state TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_state_updated ON jobs (state, updated_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # 여러 uvicorn 워커가 같은 파일을 쓰므로 WAL 모드와 busy timeout 을 켠다.
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _create(self, job: JobStatus, request: JobRequest, key: Optional[str]) -> Tuple[JobStatus, JobRequest]:
+        with closing(self._connect()) as conn, conn:
+            try:
+                conn.execute(
+                    "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        job.jobId,
+                        key,
+                        job.status,
+                        request.model_dump_json(),
+                        job.model_dump_json(),
+                        job.updatedAt.timestamp(),
+                    ),
+                )
+                return job, request
+            except sqlite3.IntegrityError:
+                existing = self._get_by_key(conn, key) if key else None
+                if existing is None:
+                    raise
+                return existing
+
+    @staticmethod
+    def _get_by_key(conn: sqlite3.Connection, key: str) -> Optional[Tuple[JobStatus, JobRequest]]:
+        row = conn.execute("SELECT status, request FROM jobs WHERE idempotency_key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return JobStatus.model_validate_json(row[0]), JobRequest.model_validate_json(row[1])
+
+    def _get(self, job_id: str) -> Optional[JobStatus]:
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return JobStatus.model_validate_json(row[0]) if row else None
+
+    def _get_key(self, key: str) -> Optional[Tuple[JobStatus, JobRequest]]:
+        with closing(self._connect()) as conn, conn:
+            return self._get_by_key(conn, key)
+
+    def _update(self, job: JobStatus) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, status = ?, updated_at = ? WHERE job_id = ?",
+                (job.status, job.model_dump_json(), job.updatedAt.timestamp(), job.jobId),
+            )
+
+    def _claim(self, job: JobStatus) -> bool:
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, status = ?, updated_at = ? WHERE job_id = ? AND state = 'queued'",
+                (job.status, job.model_dump_json(), job.updatedAt.timestamp(), job.jobId),
+            )
+            return cursor.rowcount == 1
+
+    def _delete(self, job_id: str) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def _pending(self) -> List[Tuple[JobStatus, JobRequest]]:
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute(
+                "SELECT status, request FROM jobs WHERE state = 'queued' ORDER BY updated_at"
+            ).fetchall()
+        return [
+            (JobStatus.model_validate_json(status_json), JobRequest.model_validate_json(request_json))
+            for status_json, request_json in rows
+        ]
+
+    def _fail_stale(self, stale_before: float, error: str) -> List[Tuple[JobStatus, JobRequest]]:
+        failed: List[Tuple[JobStatus, JobRequest]] = []
+        with closing(self._connect()) as conn, conn:
+            # 여러 워커가 동시에 시작해도 한 쪽만 바꾸도록 쓰기 잠금을 먼저 잡는다.
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT status, request FROM jobs WHERE state = 'running' AND updated_at < ?", (stale_before,)
+            ).fetchall()
+            for status_json, request_json in rows:
+                job = JobStatus.model_validate_json(status_json)
+                job.status = "failed"
+                job.error = error
+                job.updatedAt = _now()
+                conn.execute(
+                    "UPDATE jobs SET state = ?, status = ?, updated_at = ? WHERE job_id = ?",
+                    (job.status, job.model_dump_json(), job.updatedAt.timestamp(), job.jobId),
+                )
+                failed.append((job, JobRequest.model_validate_json(request_json)))
+        return failed
+
+    def _prune(self, ttl_seconds: int) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE state IN ('succeeded', 'failed') AND updated_at < ?",
+                (time.time() - ttl_seconds,),
+            )
+
+    async def create(self, job: JobStatus, request: JobRequest, key: Optional[str]) -> Tuple[JobStatus, JobRequest]:
+        return await asyncio.to_thread(self._create, job, request, key)
+
+    async def get(self, job_id: str) -> Optional[JobStatus]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def get_by_key(self, key: str) -> Optional[Tuple[JobStatus, JobRequest]]:
+        return await asyncio.to_thread(self._get_key, key)
+
+    async def update(self, job: JobStatus) -> None:
+        await asyncio.to_thread(self._update, job)
+
+    async def claim(self, job: JobStatus) -> bool:
+        return await asyncio.to_thread(self._claim, job)
+
+    async def delete(self, job_id: str) -> None:
+        await asyncio.to_thread(self._delete, job_id)
+
+    async def pending(self) -> List[Tuple[JobStatus, JobRequest]]:
+        return await asyncio.to_thread(self._pending)
+
+    async def fail_stale(self, stale_before: float, error: str) -> List[Tuple[JobStatus, JobRequest]]:
+        return await asyncio.to_thread(self._fail_stale, stale_before, error)
+
+    async def prune(self, ttl_seconds: int) -> None:
+        await asyncio.to_thread(self._prune, ttl_seconds)
+
+
+def _callback_hosts() -> List[str]:
+    return [host.strip().lower() for host in settings.job_callback_allowed_hosts.split(",") if host.strip()]
+
+
+async def check_callback_url(url: str) -> None:
+    # 작업 결과 전체를 보내므로 내부 주소로는 보내지 않는다. JOB_CALLBACK_ALLOWED_HOSTS 가 있으면 그 호스트로만 보내고,
+    # 없으면 모든 주소가 공인 주소로 풀리는 호스트만 받는다. DNS 가 바뀔 수 있어 보낼 때 한 번 더 확인한다.
+    def rejected(detail: str) -> HTTPException:
+        return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
+
+    if not settings.job_callback_secret:
+        raise rejected("이 서버에서는 callbackUrl 을 쓸 수 없습니다.")
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or not host:
+        raise rejected("callbackUrl 이 올바르지 않습니다.")
+    allowed = _callback_hosts()
+    if allowed:
+        if host not in allowed:
+            raise rejected("허용되지 않은 callbackUrl 호스트입니다.")
+        return
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, parts.port or 443)
+    except OSError:
+        raise rejected("callbackUrl 호스트를 찾을 수 없습니다.") from None
+    if not infos or any(not ipaddress.ip_address(info[4][0].split("%")[0]).is_global for info in infos):
+        raise rejected("내부 주소로는 callbackUrl 을 보낼 수 없습니다.")
+
+
+def sign_callback(body: bytes, timestamp: str) -> str:
+    # 받는 쪽은 같은 비밀키로 "<timestamp>.<body>" 의 HMAC-SHA256 을 계산해 X-Callback-Signature 와 비교한다.
+    digest = hmac.new(settings.job_callback_secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256)
+    return f"sha256={digest.hexdigest()}"
+
+
+def _replay(existing: Tuple[JobStatus, JobRequest], request: JobRequest) -> JobStatus:
+    job, stored_request = existing
+    if stored_request.model_dump_json() != request.model_dump_json():
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="같은 Idempotency-Key 로 다른 요청을 보냈습니다.",
+        )
+    return job
+
+
+class JobQueue:
+    def __init__(
+        self,
+        store: JobStore,
+        concurrency: int,
+        max_queue: int,
+        retry_after: int,
+        ttl_seconds: int,
+        lease_seconds: float,
+    ) -> None:
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._pipeline: Optional[Pipeline] = None
+        self._running = 0
+        self._succeeded = 0
+        self._failed = 0
+        self._submitted = 0
+
+    async def start(self, pipeline: Pipeline) -> None:
+        if self._queue is not None:
+            return
+        self._pipeline = pipeline
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        await self.store.prune(self.ttl_seconds)
+        # 실행 중에 프로세스가 죽은 작업은 running 으로 남아 클라이언트가 끝없이 조회하게 된다. JOB_LEASE 보다
+        # 오래 running 인 작업은 죽은 것으로 보고 실패 처리한다. 같은 요청으로 또 죽을 수 있어 다시 돌리지는 않는다.
+        for job, request in await self.store.fail_stale(time.time() - self.lease_seconds, _INTERRUPTED):
+            self._failed += 1
+            logger.warning("job %s was left running; marked as failed", job.jobId)
+            if request.callbackUrl:
+                await self._notify(str(request.callbackUrl), job)
+        # 재시작 전에 시작하지 못한 작업은 다시 대기열에 넣는다(SQLite 저장소일 때).
+        for job, request in await self.store.pending():
+            if not self._queue.full():
+                self._queue.put_nowait((job.jobId, request))
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def submit(self, request: JobRequest, idempotency_key: Optional[str], scope: str) -> JobStatus:
+        # 키는 클라이언트(scope)별로 따로 두어 다른 클라이언트의 작업 결과를 키만 맞춰 받아 가지 못하게 한다.
+        if self._queue is None:
+            raise RuntimeError("JobQueue is not started")
+        key = f"{scope}:{idempotency_key}" if idempotency_key else None
+        if key:
+            existing = await self.store.get_by_key(key)
+            if existing is not None:
+                return _replay(existing, request)
+        if request.callbackUrl:
+            await check_callback_url(str(request.callbackUrl))
+        if self._queue.full():
+            raise self._busy()
+        self._submitted += 1
+        if self._submitted % _PRUNE_EVERY == 0:
+            await self.store.prune(self.ttl_seconds)
+
+        now = _now()
+        job = JobStatus(
+            jobId=uuid.uuid4().hex,
+            status="queued",
+            idempotencyKey=idempotency_key,
+            createdAt=now,
+            updatedAt=now,
+        )
+        stored = await self.store.create(job, request, key)
+        if stored[0].jobId != job.jobId:
+            return _replay(stored, request)
+        try:
+            self._queue.put_nowait((job.jobId, request))
+        except asyncio.QueueFull:
+            await self.store.delete(job.jobId)
+            raise self._busy()
+        return job
+
+    async def get(self, job_id: str) -> Optional[JobStatus]:
+        return await self.store.get(job_id)
+
+    def _busy(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="작업 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    async def _work(self) -> None:
+        assert self._queue is not None and self._pipeline is not None
+        while True:
+            job_id, request = await self._queue.get()
+            try:
+                await self._run(job_id, request)
+            except Exception:
+                logger.exception("job %s crashed", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str, request: JobRequest) -> None:
+        job = await self.store.get(job_id)
+        if job is None or job.status != "queued":
+            return
+        job.status = "running"
+        job.updatedAt = _now()
+        # 여러 워커가 같은 SQLite 저장소를 공유하면 재시작 시 같은 작업을 동시에 집을 수 있다.
+        if not await self.store.claim(job):
+            return
+
+        self._running += 1
+        try:
+            job.result = await self._pipeline(request)
+            job.status = "succeeded"
+            self._succeeded += 1
+        except HTTPException as exc:
+            job.status = "failed"
+            job.error = str(exc.detail)
+            self._failed += 1
+        except Exception:
+            logger.exception("job %s failed", job_id)
+            job.status = "failed"
+            job.error = "작업을 처리하는 중 오류가 발생했습니다."
+            self._failed += 1
+        finally:
+            self._running -= 1
+        job.updatedAt = _now()
+        await self.store.update(job)
+
+        if request.callbackUrl:
+            await self._notify(str(request.callbackUrl), job)
+
+    async def _notify(self, url: str, job: JobStatus) -> None:
+        try:
+            await check_callback_url(url)
+            body = job.model_dump_json().encode()
+            timestamp = str(int(time.time()))
+            response = await get_http_clients().download().post(
+                url,
+                content=body,
+                headers={
+                    "Content-Type": "application/json",
+                    "X-Callback-Timestamp": timestamp,
+                    "X-Callback-Signature": sign_callback(body, timestamp),
+                },
+                timeout=10,
+                follow_redirects=False,
+            )
+            if response.status_code >= 400:
+                logger.warning("job %s callback returned HTTP %s", job.jobId, response.status_code)
+        except Exception as exc:
+            logger.warning("job %s callback failed: %s", job.jobId, exc)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "maxQueue": self.max_queue,
+            "running": self._running,
+            "concurrency": self.concurrency,
+            "succeeded": self._succeeded,
+            "failed": self._failed,
+        }
+
+
+def _build_store() -> JobStore:
+    if settings.job_backend == "sqlite":
+        return SqliteJobStore(settings.job_db_path)
+    if settings.job_backend == "memory":
+        return MemoryJobStore()
+    raise RuntimeError(f"Unknown JOB_BACKEND: {settings.job_backend}")
+
+
+_job_queue = JobQueue(
+    store=_build_store(),
+    concurrency=settings.job_concurrency,
+    max_queue=settings.job_queue_size,
+    retry_after=settings.doc_retry_after,
+    ttl_seconds=settings.job_ttl,
+    lease_seconds=settings.job_lease,
+)
+
+
+def get_job_queue() -> JobQueue:
+    return _job_queue
@@ -0,0 +1,357 @@
+import asyncio
+import logging
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.config import get_settings
+from app.observability import LLM_ATTEMPT_SECONDS, LLM_QUEUE_SECONDS, span
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+# openai 는 임포트가 무거워 실제로 요청을 처리할 때 읽는다(http_clients 참고).
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+
+@dataclass
+class Upstream:
+    name: str
+    model: str
+    client: "AsyncOpenAI"
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int, reset_timeout: float) -> None:
+        self.threshold = max(1, threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            # 열린 뒤 reset_timeout 이 지나면 요청 하나만 흘려 보내 회복 여부를 본다.
+            self._probing = True
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def release_probe(self) -> None:
+        # 공급자 상태와 무관한 오류로 끝난 시험 요청은 판정 없이 다음 요청에 기회를 넘긴다.
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.threshold:
+            if self.opened_at is None or self._probing:
+                logger.warning("LLM circuit opened after %s consecutive failures", self.failures)
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class TokenBudget:
+    def __init__(self, tokens_per_minute: int) -> None:
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    async def take(self, tokens: int) -> None:
+        if self.capacity <= 0:
+            return
+        # 분당 한도보다 큰 요청은 한도 전체를 쓰는 것으로 보고 통과시킨다.
+        needed = min(float(tokens), self.capacity)
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= needed:
+                self.tokens -= needed
+                return
+            await asyncio.sleep((needed - self.tokens) / self.rate)
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    import openai
+
+    if isinstance(exc, (asyncio.TimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in (408, 409, 429) or exc.status_code >= 500
+    return False
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+class LlmGovernor:
+    def __init__(
+        self,
+        max_concurrency: int,
+        model_concurrency: int,
+        tokens_per_minute: int,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        deadline: float,
+        breaker_threshold: int,
+        breaker_reset: float,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.model_concurrency = max(1, model_concurrency)
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._model_slots: Dict[str, asyncio.Semaphore] = {}
+        self._budgets: Dict[str, TokenBudget] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._in_flight = 0
+        self._calls = 0
+        self._retries = 0
+        self._fallbacks = 0
+        self._failures: Dict[str, int] = {"deadline": 0, "circuitOpen": 0, "upstream": 0}
+
+    def _breaker(self, upstream: Upstream) -> CircuitBreaker:
+        if upstream.name not in self._breakers:
+            self._breakers[upstream.name] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+        return self._breakers[upstream.name]
+
+    async def _acquire(self, upstream: Upstream, estimated_tokens: int) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        if upstream.model not in self._model_slots:
+            self._model_slots[upstream.model] = asyncio.Semaphore(self.model_concurrency)
+            self._budgets[upstream.model] = TokenBudget(self.tokens_per_minute)
+        # 토큰 예산을 먼저 기다려 슬롯을 잡은 채로 잠들지 않게 한다.
+        await self._budgets[upstream.model].take(estimated_tokens)
+        await self._slots.acquire()
+        try:
+            await self._model_slots[upstream.model].acquire()
+        except BaseException:
+            self._slots.release()
+            raise
+        self._in_flight += 1
+
+    def _release(self, upstream: Upstream) -> None:
+        self._in_flight -= 1
+        self._model_slots[upstream.model].release()
+        self._slots.release()
+
+    def _backoff(self, exc: BaseException, attempt: int) -> float:
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            return retry_after
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _open(
+        self,
+        upstreams: List[Upstream],
+        request: Callable[["AsyncOpenAI", str], Awaitable[T]],
+        estimated_tokens: int,
+        deadline: float,
+    ) -> Tuple[T, Upstream]:
+        # 성공하면 슬롯을 쥔 채로 돌려준다. 호출한 쪽이 _release 해야 한다.
+        last_exc: Optional[BaseException] = None
+        for position, upstream in enumerate(upstreams):
+            breaker = self._breaker(upstream)
+            for attempt in range(self.max_retries + 1):
+                if not breaker.allow():
+                    break
+                if attempt:
+                    self._retries += 1
+                elif position:
+                    self._fallbacks += 1
+                    logger.warning("LLM falling back to %s (%s)", upstream.name, upstream.model)
+                acquired = False
+                try:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    queued_at = time.perf_counter()
+                    await asyncio.wait_for(self._acquire(upstream, estimated_tokens), remaining)
+                    acquired = True
+                    started = time.perf_counter()
+                    LLM_QUEUE_SECONDS.labels(upstream=upstream.name).observe(started - queued_at)
+                    with span("llm.attempt", upstream=upstream.name, model=upstream.model, attempt=attempt):
+                        result = await asyncio.wait_for(
+                            request(upstream.client, upstream.model), deadline - time.monotonic()
+                        )
+                    LLM_ATTEMPT_SECONDS.labels(upstream=upstream.name, outcome="ok").observe(
+                        time.perf_counter() - started
+                    )
+                except BaseException as exc:
+                    if acquired:
+                        LLM_ATTEMPT_SECONDS.labels(upstream=upstream.name, outcome="error").observe(
+                            time.perf_counter() - started
+                        )
+                        self._release(upstream)
+                    if not isinstance(exc, Exception) or not _is_retryable(exc):
+                        breaker.release_probe()
+                        raise
+                    if acquired:
+                        breaker.record_failure()
+                    else:
+                        # 슬롯을 얻기 전에 끝난 시도는 공급자를 거치지 않았으므로 판정 없이 시험 기회만 돌려준다.
+                        breaker.release_probe()
+                    last_exc = exc
+                    delay = self._backoff(exc, attempt)
+                    logger.warning(
+                        "LLM call to %s failed (attempt %s): %r", upstream.name, attempt + 1, exc
+                    )
+                    if attempt == self.max_retries or time.monotonic() + delay >= deadline:
+                        break
+                    await asyncio.sleep(delay)
+                    continue
+                breaker.record_success()
+                return result, upstream
+        raise self._exhausted(upstreams, last_exc, deadline)
+
+    def _exhausted(
+        self, upstreams: List[Upstream], last_exc: Optional[BaseException], deadline: float
+    ) -> HTTPException:
+        import openai
+
+        if last_exc is None or isinstance(last_exc, openai.RateLimitError):
+            # 모든 공급자의 회로가 열려 있거나 한도에 걸렸으면 바로 실패시키고 다시 올 시점을 알려준다.
+            self._failures["circuitOpen"] += 1
+            wait = min([self._breaker(upstream).retry_after() for upstream in upstreams] or [0.0])
+            if last_exc is not None:
+                wait = max(wait, _retry_after(last_exc) or 0.0)
+            return HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="AI 서비스가 일시적으로 혼잡합니다. 잠시 후 다시 시도해 주세요.",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+        if isinstance(last_exc, asyncio.TimeoutError) or time.monotonic() >= deadline:
+            self._failures["deadline"] += 1
+            return HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="AI 응답 시간이 초과되었습니다.",
+            )
+        self._failures["upstream"] += 1
+        return HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(last_exc))
+
+    async def call(
+        self,
+        upstreams: List[Upstream],
+        request: Callable[["AsyncOpenAI", str], Awaitable[T]],
+        estimated_tokens: int,
+    ) -> T:
+        self._calls += 1
+        deadline = time.monotonic() + self.deadline
+        result, upstream = await self._open(upstreams, request, estimated_tokens, deadline)
+        self._release(upstream)
+        return result
+
+    async def stream(
+        self,
+        upstreams: List[Upstream],
+        request: Callable[["AsyncOpenAI", str], Awaitable[Any]],
+        estimated_tokens: int,
+    ) -> AsyncIterator[Any]:
+        # 스트림을 여는 데까지만 재시도한다. 첫 이벤트를 내보낸 뒤에는 다시 보낼 수 없다.
+        self._calls += 1
+        deadline = time.monotonic() + self.deadline
+        stream, upstream = await self._open(upstreams, request, estimated_tokens, deadline)
+        breaker = self._breaker(upstream)
+        try:
+            events = stream.__aiter__()
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.__anext__(), deadline - time.monotonic())
+                except StopAsyncIteration:
+                    break
+                yield event
+        except asyncio.TimeoutError as exc:
+            breaker.record_failure()
+            self._failures["deadline"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="AI 응답 시간이 초과되었습니다.",
+            ) from exc
+        except Exception as exc:
+            if _is_retryable(exc):
+                breaker.record_failure()
+            raise
+        finally:
+            self._release(upstream)
+
+    def stats(self) -> dict:
+        return {
+            "inFlight": self._in_flight,
+            "maxConcurrency": self.max_concurrency,
+            "modelConcurrency": self.model_concurrency,
+            "tokensPerMinute": self.tokens_per_minute,
+            "calls": self._calls,
+            "retries": self._retries,
+            "fallbacks": self._fallbacks,
+            "failures": dict(self._failures),
+            "breakers": {
+                name: {"state": breaker.state, "failures": breaker.failures}
+                for name, breaker in self._breakers.items()
+            },
+        }
+
+
+_governor = LlmGovernor(
+    max_concurrency=settings.llm_max_concurrency,
+    model_concurrency=settings.llm_model_concurrency,
+    tokens_per_minute=settings.llm_tokens_per_minute,
+    max_retries=settings.llm_max_retries,
+    backoff_base=settings.llm_backoff_base,
+    backoff_max=settings.llm_backoff_max,
+    deadline=settings.llm_deadline,
+    breaker_threshold=settings.llm_breaker_threshold,
+    breaker_reset=settings.llm_breaker_reset,
+)
+
+
+def get_llm_governor() -> LlmGovernor:
+    return _governor
@@ -0,0 +1,306 @@
+import asyncio
+import importlib.util
+import logging
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+
+from fastapi import HTTPException, status
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+# 상주 LibreOffice 인스턴스를 쓸 수 없을 때 발생한다. 호출 측은 1회성 변환으로 대체한다.
+class OfficeUnavailableError(Exception):
+    pass
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def convert_with_uno(port: int, source_path: Path) -> Path:
+    try:
+        import uno
+        from com.sun.star.beans import PropertyValue
+    except ImportError as exc:
+        raise OfficeUnavailableError("pyuno is not installed") from exc
+
+    def props(**kwargs) -> tuple:
+        values = []
+        for name, value in kwargs.items():
+            prop = PropertyValue()
+            prop.Name = name
+            prop.Value = value
+            values.append(prop)
+        return tuple(values)
+
+    local_ctx = uno.getComponentContext()
+    resolver = local_ctx.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local_ctx
+    )
+    try:
+        ctx = resolver.resolve(
+            f"uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"
+        )
+    except Exception as exc:
+        raise OfficeUnavailableError(f"cannot connect to soffice on port {port}") from exc
+
+    desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+    pdf_path = source_path.parent / f"{source_path.stem}.pdf"
+    document = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(str(source_path.resolve())),
+        "_blank",
+        0,
+        props(Hidden=True, ReadOnly=True),
+    )
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="HWP 파일을 PDF로 변환할 수 없습니다.",
+        )
+    try:
+        document.storeToURL(
+            uno.systemPathToFileUrl(str(pdf_path.resolve())),
+            props(FilterName="writer_pdf_Export"),
+        )
+    finally:
+        document.close(True)
+    return pdf_path
+
+
+class OfficeInstance:
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.port = 0
+        self.profile_dir: Optional[Path] = None
+        self.process: Optional[subprocess.Popen] = None
+        self.conversions = 0
+        self.ready = False
+
+    def launch(self) -> None:
+        self.port = _free_port()
+        # 인스턴스마다 별도 사용자 프로필을 써야 동시 변환 시 잠금 충돌이 없다.
+        self.profile_dir = Path(tempfile.mkdtemp(prefix=f"office-profile-{self.index}-"))
+        self.process = subprocess.Popen(
+            [
+                settings.office_binary,
+                "--headless",
+                "--invisible",
+                "--nologo",
+                "--nodefault",
+                "--norestore",
+                "--nolockcheck",
+                f"-env:UserInstallation={self.profile_dir.as_uri()}",
+                f"--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.conversions = 0
+        self.ready = False
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def terminate(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+        self.ready = False
+        if self.profile_dir is not None:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
+
+
+class OfficeConverterPool:
+    def __init__(
+        self,
+        size: int,
+        max_conversions: int,
+        convert_timeout: float,
+        startup_timeout: float,
+        max_queue: int,
+        retry_after: int,
+    ) -> None:
+        self.size = size
+        self.max_conversions = max_conversions
+        self.convert_timeout = convert_timeout
+        self.startup_timeout = startup_timeout
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self._instances: List[OfficeInstance] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._waiting = 0
+        self._restarts = 0
+        self._fallbacks = 0
+        self._rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return (
+            self.size > 0
+            and shutil.which(settings.office_binary) is not None
+            and importlib.util.find_spec("uno") is not None
+        )
+
+    def start(self) -> None:
+        if self._idle is not None or not self.enabled:
+            return
+        self._idle = asyncio.Queue()
+        for index in range(self.size):
+            instance = OfficeInstance(index)
+            instance.launch()
+            self._instances.append(instance)
+            self._idle.put_nowait(instance)
+
+    def shutdown(self) -> None:
+        for instance in self._instances:
+            instance.terminate()
+        self._instances = []
+        self._idle = None
+
+    async def _probe(self, instance: OfficeInstance) -> bool:
+        if not instance.alive():
+            return False
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection("127.0.0.1", instance.port), timeout=1
+            )
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
+
+    async def _ensure_ready(self, instance: OfficeInstance) -> None:
+        if instance.ready and await self._probe(instance):
+            return
+        if not instance.alive():
+            await self._restart(instance)
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if await self._probe(instance):
+                instance.ready = True
+                return
+            if not instance.alive():
+                break
+            await asyncio.sleep(0.2)
+        await self._restart(instance)
+        raise OfficeUnavailableError(f"soffice instance {instance.index} did not become ready")
+
+    async def _restart(self, instance: OfficeInstance) -> None:
+        self._restarts += 1
+        await asyncio.to_thread(instance.terminate)
+        instance.launch()
+
+    @asynccontextmanager
+    async def _lease(self) -> AsyncIterator[OfficeInstance]:
+        if self._idle is None:
+            self.start()
+        if self._idle is None:
+            raise OfficeUnavailableError("office pool is disabled")
+        if self._idle.empty() and self._waiting >= self.max_queue:
+            self._rejected += 1
+            raise self._busy("HWP 변환 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.")
+
+        self._waiting += 1
+        try:
+            instance = await asyncio.wait_for(self._idle.get(), timeout=self.startup_timeout)
+        except asyncio.TimeoutError as exc:
+            self._rejected += 1
+            raise self._busy("HWP 변환기가 모두 사용 중입니다. 잠시 후 다시 시도해 주세요.") from exc
+        finally:
+            self._waiting -= 1
+        try:
+            yield instance
+        finally:
+            if instance.conversions >= self.max_conversions:
+                await self._restart(instance)
+            if self._idle is not None:
+                self._idle.put_nowait(instance)
+
+    def _busy(self, detail: str) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    async def convert(self, source_path: Path) -> Path:
+        async with self._lease() as instance:
+            await self._ensure_ready(instance)
+            try:
+                pdf_path = await asyncio.wait_for(
+                    asyncio.to_thread(convert_with_uno, instance.port, source_path),
+                    timeout=self.convert_timeout,
+                )
+            except asyncio.TimeoutError as exc:
+                # 멈춘 soffice 를 종료하면 블로킹된 UNO 호출도 함께 풀린다.
+                logger.warning("soffice instance %s hung, restarting", instance.index)
+                await self._restart(instance)
+                raise HTTPException(
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                    detail="HWP 파일 변환 시간이 초과되었습니다.",
+                ) from exc
+            except OfficeUnavailableError:
+                await self._restart(instance)
+                raise
+            except HTTPException:
+                raise
+            except Exception as exc:
+                # UNO 예외(DisposedException 등)는 인스턴스 이상으로 보고 재시작한다.
+                logger.warning("soffice instance %s failed: %s", instance.index, exc)
+                await self._restart(instance)
+                raise OfficeUnavailableError(str(exc)) from exc
+            instance.conversions += 1
+
+        if not pdf_path.exists():
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="PDF 변환 결과를 찾을 수 없습니다.",
+            )
+        return pdf_path
+
+    def record_fallback(self) -> None:
+        self._fallbacks += 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self._idle is not None,
+            "size": len(self._instances),
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+            "waiting": self._waiting,
+            "restarts": self._restarts,
+            "fallbacks": self._fallbacks,
+            "rejected": self._rejected,
+        }
+
+
+_office_pool = OfficeConverterPool(
+    size=settings.office_pool_size,
+    max_conversions=settings.office_max_conversions,
+    convert_timeout=settings.office_convert_timeout,
+    startup_timeout=settings.office_startup_timeout,
+    max_queue=settings.doc_queue_size,
+    retry_after=settings.doc_retry_after,
+)
+
+
+def get_office_pool() -> OfficeConverterPool:
+    return _office_pool
@@ -0,0 +1,135 @@
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# pypdf 결과가 이보다 짧거나 깨진 글자가 많으면 pdfplumber 로 다시 읽는다.
+_MIN_TEXT_CHARS = 20
+_MAX_GARBLED_RATIO = 0.05
+
+# pypdf, pdfplumber, pdf2image, pytesseract 는 임포트에만 수백 ms 가 걸린다. 문서를 처리하지 않는 프로세스가
+# 이 모듈을 불러도 그 비용을 내지 않도록 쓰는 함수 안에서 임포트한다. 미리 읽어 두는 건 app.roles.import_stack 이 한다.
+
+
+@dataclass
+class PageText:
+    index: int
+    text: str
+    engine: str
+    elapsed_ms: float
+
+
+def count_pages(pdf_path: Path) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(str(pdf_path)).pages)
+
+
+def _needs_layout(text: str) -> bool:
+    stripped = "".join(text.split())
+    if len(stripped) < _MIN_TEXT_CHARS:
+        return True
+    garbled = stripped.count("�") + stripped.count("(cid:")
+    return garbled / len(stripped) > _MAX_GARBLED_RATIO
+
+
+def iter_pages(pdf_path: Path, start: int, stop: int) -> Iterator[PageText]:
+    import pdfplumber
+    from pypdf import PdfReader
+
+    reader = PdfReader(str(pdf_path))
+    stop = min(stop, len(reader.pages))
+    plumber: Optional[pdfplumber.PDF] = None
+    try:
+        for index in range(start, stop):
+            started = time.perf_counter()
+            try:
+                text = reader.pages[index].extract_text() or ""
+            except Exception as exc:
+                logger.debug("pypdf failed on page %s of %s: %s", index, pdf_path, exc)
+                text = ""
+            engine = "pypdf"
+            if _needs_layout(text):
+                # 텍스트 레이어가 비었거나 깨진 페이지만 pdfplumber 로 레이아웃 분석을 한다.
+                if plumber is None:
+                    plumber = pdfplumber.open(pdf_path)
+                layout_text = plumber.pages[index].extract_text() or ""
+                if len("".join(layout_text.split())) >= len("".join(text.split())):
+                    text = layout_text
+                    engine = "pdfplumber"
+                # 페이지 객체가 캐시한 레이아웃 정보를 바로 놓아 메모리를 잡아두지 않는다.
+                plumber.pages[index].close()
+            yield PageText(
+                index=index,
+                text=text,
+                engine=engine,
+                elapsed_ms=(time.perf_counter() - started) * 1000,
+            )
+    finally:
+        if plumber is not None:
+            plumber.close()
+
+
+def extract_pages(pdf_path: Path, start: int, stop: int) -> List[PageText]:
+    return list(iter_pages(pdf_path, start, stop))
+
+
+def visible_chars(text: str) -> int:
+    return len(text) - sum(1 for ch in text if ch.isspace())
+
+
+def is_sparse(page: PageText, min_chars: int) -> bool:
+    return visible_chars(page.text) < min_chars
+
+
+def ocr_page(pdf_path: Path, index: int, dpi: int, lang: str) -> PageText:
+    import pytesseract
+    from pdf2image import convert_from_path
+
+    # tesseract 가 코어를 모두 잡으면 병렬 워커끼리 경합하므로 워커당 스레드 하나로 제한한다.
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    started = time.perf_counter()
+    # 문서 전체가 아니라 해당 페이지 한 장만 회색조로 래스터화해 메모리를 페이지 하나 분량으로 유지한다.
+    images = convert_from_path(
+        str(pdf_path),
+        dpi=dpi,
+        first_page=index + 1,
+        last_page=index + 1,
+        grayscale=True,
+    )
+    try:
+        text = "\n".join(pytesseract.image_to_string(image, lang=lang) for image in images)
+    finally:
+        for image in images:
+            image.close()
+    return PageText(
+        index=index,
+        text=text,
+        engine="tesseract",
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+
+
+def log_page_timings(pdf_path: Path, pages: List[PageText], page_count: int) -> None:
+    if not pages:
+        return
+    total_ms = sum(page.elapsed_ms for page in pages)
+    slowest = max(pages, key=lambda page: page.elapsed_ms)
+    layout_pages = sum(1 for page in pages if page.engine == "pdfplumber")
+    ocr_pages = sum(1 for page in pages if page.engine == "tesseract")
+    logger.info(
+        "extracted %s/%s pages from %s in %.1f ms "
+        "(pdfplumber pages: %s, ocr pages: %s, slowest page %s: %.1f ms)",
+        len(pages),
+        page_count,
+        pdf_path.name,
+        total_ms,
+        layout_pages,
+        ocr_pages,
+        slowest.index + 1,
+        slowest.elapsed_ms,
+    )
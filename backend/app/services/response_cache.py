@@ -0,0 +1,290 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+
+class MemoryBackend(CacheBackend):
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        self._items[key] = (time.monotonic() + ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._items.pop(key, None)
+
+
+# 디스크 캐시는 용량을 넘지 않아도 이 간격마다 만료된 파일을 훑어 지운다.
+_DISK_SWEEP_SECONDS = 600
+
+
+class DiskBackend(CacheBackend):
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.disk_bytes = 0
+        self._swept_at = 0.0
+        self._sweep()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _read(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text("utf-8"))
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            self._remove(key)
+            return None
+        if entry["expiresAt"] < time.time():
+            self._remove(key)
+            return None
+        return entry["value"]
+
+    def _write(self, key: str, value: str, ttl: int) -> None:
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        expires_at = time.time() + ttl
+        data = json.dumps({"expiresAt": expires_at, "value": value}).encode("utf-8")
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        # 파일을 열지 않고도 만료 여부를 알 수 있게 수정 시각을 만료 시각으로 둔다.
+        os.utime(tmp_path, (expires_at, expires_at))
+        previous = path.stat().st_size if path.exists() else 0
+        tmp_path.replace(path)
+        self.disk_bytes += len(data) - previous
+        if self.disk_bytes > self.max_bytes or time.monotonic() - self._swept_at > _DISK_SWEEP_SECONDS:
+            self._sweep()
+
+    def _sweep(self) -> None:
+        self._swept_at = time.monotonic()
+        now = time.time()
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime < now:
+                self._unlink(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        # 만료 항목을 지운 뒤에도 넘치면 먼저 만료될 것부터 용량의 90% 까지 줄인다.
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                self._unlink(path)
+                total -= size
+        self.disk_bytes = total
+
+    def _remove(self, key: str) -> None:
+        path = self._path(key)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return
+        self._unlink(path)
+        self.disk_bytes -= size
+
+    def _unlink(self, path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._read, key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        await asyncio.to_thread(self._write, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._remove, key)
+
+
+class RedisBackend(CacheBackend):
+    def __init__(self, url: str, prefix: str = "ai-cache:") -> None:
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as exc:
+            raise RuntimeError("AI_CACHE_BACKEND=redis requires the redis package") from exc
+        self.prefix = prefix
+        self._redis = redis_asyncio.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._redis.get(self.prefix + key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        await self._redis.set(self.prefix + key, value, ex=ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self.prefix + key)
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+class ResponseCache:
+    def __init__(self, backend: Optional[CacheBackend], ttl: int) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def make_key(self, operation: str, **parts: Any) -> str:
+        if "text" in parts:
+            parts["text"] = normalize_text(parts["text"])
+        raw = json.dumps({"op": operation, **parts}, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def lookup(self, key: str, model_cls: Type[M]) -> Optional[M]:
+        if self.backend is None:
+            return None
+        try:
+            cached = await self.backend.get(key)
+        except Exception as exc:
+            logger.warning("response cache read failed: %s", exc)
+            return None
+        if cached is None:
+            self.misses += 1
+            return None
+        try:
+            result = model_cls.model_validate_json(cached)
+        except (ValidationError, ValueError) as exc:
+            # 깨졌거나 이전 스키마로 저장된 항목은 지우고 없는 것으로 본다.
+            logger.warning("discarding unreadable response cache entry %s: %s", key[:12], exc)
+            self.misses += 1
+            try:
+                await self.backend.delete(key)
+            except Exception as delete_exc:
+                logger.warning("response cache delete failed: %s", delete_exc)
+            return None
+        self.hits += 1
+        return result
+
+    async def store(self, key: str, result: BaseModel) -> None:
+        if self.backend is None:
+            return
+        try:
+            await self.backend.set(key, result.model_dump_json(), self.ttl)
+        except Exception as exc:
+            logger.warning("response cache write failed: %s", exc)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        model_cls: Type[M],
+        compute: Callable[[], Awaitable[M]],
+    ) -> M:
+        task = self._inflight.get(key)
+        if task is not None:
+            # 같은 요청이 이미 진행 중이면 업스트림 호출 하나를 함께 기다린다.
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        cached = await self.lookup(key, model_cls)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(self._compute_and_store(key, compute))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # 요청자가 연결을 끊어도 같은 키를 기다리는 다른 요청을 위해 계산은 계속한다.
+        return await asyncio.shield(task)
+
+    async def _compute_and_store(self, key: str, compute: Callable[[], Awaitable[M]]) -> M:
+        result = await compute()
+        await self.store(key, result)
+        return result
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend is not None else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "diskBytes": self.backend.disk_bytes if isinstance(self.backend, DiskBackend) else None,
+            "hitRatio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _build_backend() -> Optional[CacheBackend]:
+    backend = settings.ai_cache_backend
+    if backend == "memory":
+        return MemoryBackend(settings.ai_cache_size)
+    if backend == "disk":
+        return DiskBackend(settings.ai_cache_dir, settings.ai_cache_max_bytes)
+    if backend == "redis":
+        return RedisBackend(settings.ai_cache_redis_url)
+    if backend == "none":
+        return None
+    raise RuntimeError(f"Unknown AI_CACHE_BACKEND: {backend}")
+
+
+_response_cache = ResponseCache(_build_backend(), ttl=settings.ai_cache_ttl)
+
+
+def get_response_cache() -> ResponseCache:
+    return _response_cache
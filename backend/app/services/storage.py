@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import quote
+
+from app.config import get_settings
+from app.services.http_clients import get_http_clients
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+_UPLOAD_CHUNK = 256 * 1024
+_TOKEN_SCOPE = "https://www.googleapis.com/auth/devstorage.read_write"
+
+
+class ObjectStorage(ABC):
+    def __init__(self) -> None:
+        self.stored = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes_stored = 0
+
+    @abstractmethod
+    async def exists(self, name: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def put(self, name: str, data: bytes | Path, content_type: str) -> None:
+        ...
+
+    async def store_once(self, name: str, data: bytes | Path, content_type: str) -> bool:
+        # 이름이 내용 해시라서 이미 있는 객체는 다시 올리지 않는다. 객체가 저장소에 있으면 True 를 돌려준다.
+        started = time.perf_counter()
+        try:
+            if await self.exists(name):
+                self.skipped += 1
+                return True
+            await self.put(name, data, content_type)
+            self.stored += 1
+            self.bytes_stored += len(data) if isinstance(data, bytes) else data.stat().st_size
+            logger.info("stored upload %s in %.1f ms", name, (time.perf_counter() - started) * 1000)
+            return True
+        except Exception as exc:
+            self.failed += 1
+            logger.warning("failed to store upload %s: %r", name, exc)
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "stored": self.stored,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "bytesStored": self.bytes_stored,
+        }
+
+
+async def _file_chunks(path: Path) -> AsyncIterator[bytes]:
+    with path.open("rb") as fh:
+        while chunk := await asyncio.to_thread(fh.read, _UPLOAD_CHUNK):
+            yield chunk
+
+
+class FirebaseStorage(ObjectStorage):
+    # Firebase Storage REST API. FIREBASE_STORAGE_EMULATOR_HOST 가 있으면 인증 없이 로컬 에뮬레이터로 보낸다.
+    # 실제 버킷은 google-auth 의 기본 자격 증명(서비스 계정)으로 받은 토큰을 쓴다.
+    def __init__(self, bucket: str, emulator_host: str) -> None:
+        super().__init__()
+        self.bucket = bucket
+        self.emulator = bool(emulator_host)
+        self.base_url = f"http://{emulator_host}" if emulator_host else "https://firebasestorage.googleapis.com"
+        self._credentials = None
+        self._token_lock = asyncio.Lock()
+        if not self.emulator:
+            try:
+                import google.auth  # noqa: F401
+                import google.auth.transport.requests  # noqa: F401
+            except ImportError as exc:
+                raise RuntimeError("UPLOAD_STORE_ORIGINALS=1 requires google-auth unless the storage emulator is used") from exc
+
+    async def _headers(self) -> Dict[str, str]:
+        if self.emulator:
+            return {}
+        async with self._token_lock:
+            if self._credentials is None or not self._credentials.valid:
+                import google.auth
+                import google.auth.transport.requests
+
+                def refresh():
+                    credentials = self._credentials
+                    if credentials is None:
+                        credentials, _ = google.auth.default(scopes=[_TOKEN_SCOPE])
+                    credentials.refresh(google.auth.transport.requests.Request())
+                    return credentials
+
+                self._credentials = await asyncio.to_thread(refresh)
+        return {"Authorization": f"Bearer {self._credentials.token}"}
+
+    def _object_url(self, name: str) -> str:
+        return f"{self.base_url}/v0/b/{self.bucket}/o/{quote(name, safe='')}"
+
+    async def exists(self, name: str) -> bool:
+        response = await get_http_clients().download().get(self._object_url(name), headers=await self._headers())
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    async def put(self, name: str, data: bytes | Path, content_type: str) -> None:
+        size = len(data) if isinstance(data, bytes) else data.stat().st_size
+        response = await get_http_clients().download().post(
+            f"{self.base_url}/v0/b/{self.bucket}/o",
+            params={"name": name, "uploadType": "media"},
+            headers={**await self._headers(), "Content-Type": content_type, "Content-Length": str(size)},
+            content=data if isinstance(data, bytes) else _file_chunks(data),
+        )
+        response.raise_for_status()
+
+    def stats(self) -> dict:
+        return {"bucket": self.bucket, "emulator": self.emulator, **super().stats()}
+
+
+def _build_storage() -> Optional[ObjectStorage]:
+    if not settings.upload_store_originals:
+        return None
+    if not settings.firebase_bucket:
+        raise RuntimeError("UPLOAD_STORE_ORIGINALS=1 requires FIREBASE_BUCKET")
+    return FirebaseStorage(settings.firebase_bucket, settings.firebase_storage_emulator_host)
+
+
+_storage = _build_storage()
+
+
+def get_object_storage() -> Optional[ObjectStorage]:
+    return _storage
@@ -0,0 +1,199 @@
+import hashlib
+import io
+import shutil
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+
+# 형식 확인에 쓰는 앞부분 길이. PDF 헤더는 앞쪽 1KB 안 어디에나 올 수 있다.
+_HEAD_BYTES = 1024
+# 파일 외 폼 필드(fileType 등)는 짧은 값만 받는다.
+_FIELD_MAX_BYTES = 1024
+_MAX_PARTS = 16
+_FILE_FIELD = "file"
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail="문서 파일이 너무 큽니다.",
+    )
+
+
+def _bad_form(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+class SpooledUpload:
+    # SpooledTemporaryFile 처럼 spool_bytes 까지는 메모리에 두고 넘치면 파일로 옮긴다.
+    # 다만 워커 프로세스와 soffice 는 경로로 파일을 열어야 하므로, 이름 없는 임시 파일 대신
+    # 작업 디렉터리의 파일로 넘겨 그 파일을 그대로 파이프라인에 준다. 받는 동안 해시와 앞부분도 같이 모은다.
+    def __init__(self, spool_bytes: int, max_bytes: int) -> None:
+        self.spool_bytes = spool_bytes
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.head = b""
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.path: Optional[Path] = None
+        self._hash = hashlib.sha256()
+        self._buffer: Optional[io.BytesIO] = io.BytesIO()
+        self._file: Optional[BinaryIO] = None
+        self._dir: Optional[Path] = None
+
+    @property
+    def digest(self) -> str:
+        return self._hash.hexdigest()
+
+    def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise _too_large()
+        self._hash.update(data)
+        if len(self.head) < _HEAD_BYTES:
+            self.head += data[: _HEAD_BYTES - len(self.head)]
+        if self._buffer is not None:
+            self._buffer.write(data)
+            if self._buffer.tell() > self.spool_bytes:
+                self._rollover()
+        else:
+            assert self._file is not None
+            self._file.write(data)
+
+    def _rollover(self) -> None:
+        assert self._buffer is not None
+        self._dir = Path(tempfile.mkdtemp())
+        # 형식은 폼 필드 순서에 따라 파일보다 늦게 올 수 있다. 이름은 materialize 에서 확장자를 붙여 바꾼다.
+        self._file = (self._dir / "upload.part").open("wb")
+        self._file.write(self._buffer.getbuffer())
+        self._buffer = None
+
+    def data(self) -> bytes | Path:
+        # 원본 보관용. 메모리에 있으면 바이트를, 디스크로 넘쳤으면 그 파일 경로를 준다.
+        if self._buffer is not None:
+            return self._buffer.getvalue()
+        if self._file is not None:
+            self._file.flush()
+            return self._dir / "upload.part"
+        assert self.path is not None
+        return self.path
+
+    def materialize(self, suffix: str) -> Path:
+        # 파이프라인에 넘길 source.<suffix> 를 만든다. 디스크로 넘친 업로드는 이름만 바꾸므로 복사가 없다.
+        if self.path is not None:
+            return self.path
+        if self._dir is None:
+            self._dir = Path(tempfile.mkdtemp())
+        target = self._dir / f"source.{suffix}"
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            (self._dir / "upload.part").rename(target)
+        else:
+            assert self._buffer is not None
+            target.write_bytes(self._buffer.getbuffer())
+            self._buffer = None
+        self.path = target
+        return target
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._buffer = None
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+
+async def receive_upload(request: Request, spool_bytes: int, max_bytes: int) -> Tuple[SpooledUpload, Dict[str, str]]:
+    # Starlette 의 request.form() 은 파일 부분을 자체 SpooledTemporaryFile 에 쓴 뒤 돌려주므로
+    # 파이프라인용 파일로 한 번 더 복사해야 한다. 본문을 직접 파싱해 받는 대로 SpooledUpload 에 쓴다.
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="multipart/form-data 로 올려야 합니다.",
+        )
+
+    upload = SpooledUpload(spool_bytes, max_bytes)
+    fields: Dict[str, str] = {}
+    part: Dict[str, object] = {}
+    parts = 0
+    seen_file = False
+
+    def on_part_begin() -> None:
+        nonlocal parts
+        parts += 1
+        if parts > _MAX_PARTS:
+            raise _bad_form("폼 필드가 너무 많습니다.")
+        part.clear()
+        part.update(headers={}, field=b"", value=b"", name=None, is_file=False, data=bytearray())
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        part["field"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        part["value"] += data[start:end]
+
+    def on_header_end() -> None:
+        part["headers"][part["field"].lower()] = part["value"]
+        part["field"] = part["value"] = b""
+
+    def on_headers_finished() -> None:
+        nonlocal seen_file
+        _, options = parse_options_header(part["headers"].get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        part["name"] = name
+        if name == _FILE_FIELD:
+            if seen_file:
+                raise _bad_form("파일은 하나만 올릴 수 있습니다.")
+            seen_file = True
+            part["is_file"] = True
+            upload.filename = options.get(b"filename", b"").decode("utf-8", "replace") or None
+            upload.content_type = part["headers"].get(b"content-type", b"").decode("latin-1") or None
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if part["is_file"]:
+            upload.write(data[start:end])
+            return
+        buffer = part["data"]
+        buffer += data[start:end]
+        if len(buffer) > _FIELD_MAX_BYTES:
+            raise _bad_form("폼 필드 값이 너무 깁니다.")
+
+    def on_part_end() -> None:
+        if not part["is_file"] and part["name"]:
+            fields[part["name"]] = bytes(part["data"]).decode("utf-8", "replace").strip()
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },
+    )
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+    except MultipartParseError as exc:
+        upload.close()
+        raise _bad_form("multipart 본문을 해석하지 못했습니다.") from exc
+    except BaseException:
+        upload.close()
+        raise
+    if not seen_file or not upload.size:
+        upload.close()
+        raise _bad_form("file 필드로 문서를 올려야 합니다.")
+    return upload, fields
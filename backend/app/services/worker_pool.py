@@ -0,0 +1,136 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.config import get_settings
+from app.roles import import_stack
+
+T = TypeVar("T")
+
+settings = get_settings()
+
+
+class _RemoteHTTPError(Exception):
+    # HTTPException 은 키워드 인자로 생성되어 pickle 로 복원되지 않으므로
+    # 워커 프로세스에서는 위치 인자만 가진 예외로 바꿔 전달한다.
+    def __init__(self, status_code: int, detail: Any) -> None:
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _invoke(fn: Callable[..., T], args: tuple) -> T:
+    try:
+        return fn(*args)
+    except HTTPException as exc:
+        raise _RemoteHTTPError(exc.status_code, exc.detail) from None
+
+
+class DocumentWorkerPool:
+    def __init__(self, max_workers: int, max_queue: int, retry_after: int) -> None:
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._busy = 0
+        self._queued = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # uvicorn 이벤트 루프 스레드를 fork 하지 않도록 spawn 으로 띄운다.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                # spawn 된 워커는 부모의 모듈을 물려받지 않으므로 시작할 때 PDF·OCR 스택을 읽어 둔다.
+                initializer=import_stack,
+                initargs=("document",),
+            )
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        return self._slots
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        slots = self._get_slots()
+        if slots.locked() and self._queued >= self.max_queue:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="문서 처리 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        self._queued += 1
+        try:
+            await slots.acquire()
+        finally:
+            self._queued -= 1
+
+        self._busy += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), _invoke, fn, args)
+        except _RemoteHTTPError as exc:
+            raise HTTPException(status_code=exc.status_code, detail=exc.detail) from None
+        except BrokenProcessPool as exc:
+            # 워커가 비정상 종료(OOM 등)하면 풀을 다시 만든다.
+            self._reset_executor()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="문서 처리 워커가 재시작되었습니다. 잠시 후 다시 시도해 주세요.",
+                headers={"Retry-After": str(self.retry_after)},
+            ) from exc
+        finally:
+            self._busy -= 1
+            self._completed += 1
+            slots.release()
+
+    async def warm(self) -> None:
+        # 워커를 모두 미리 띄워 첫 문서 요청이 프로세스 생성과 임포트를 기다리지 않게 한다.
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(self.max_workers)))
+        except BrokenProcessPool:
+            self._reset_executor()
+
+    def _reset_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "maxWorkers": self.max_workers,
+            "busyWorkers": self._busy,
+            "queueDepth": self._queued,
+            "maxQueue": self.max_queue,
+            "completed": self._completed,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+_pool = DocumentWorkerPool(
+    max_workers=settings.doc_workers or (os.cpu_count() or 1),
+    max_queue=settings.doc_queue_size,
+    retry_after=settings.doc_retry_after,
+)
+
+
+def get_worker_pool() -> DocumentWorkerPool:
+    return _pool
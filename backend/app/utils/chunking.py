@@ -0,0 +1,123 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional
+
+# 제목처럼 보이는 줄(■ 경력사항, [학력], 1. 프로젝트 등) 앞에서 섹션을 나눈다.
+_SECTION_BREAK = re.compile(r"\n\s*\n|\n(?=\s*(?:[■□◆◇●○▶▷※#]|\[[^\]\n]{1,30}\]|\d{1,2}[.)]\s))")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?。])\s+|\n")
+
+
+@lru_cache()
+def _tiktoken_encoder() -> Optional[Callable[[str], List[int]]]:
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base").encode
+    except Exception:
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    encode = _tiktoken_encoder()
+    if encode is not None:
+        return len(encode(text))
+    # tiktoken 이 없으면 근사치: 영문은 약 4자당 1토큰, 한글 등 비ASCII 문자는 글자당 약 1토큰.
+    ascii_chars = sum(1 for ch in text if ch.isascii() and not ch.isspace())
+    other_chars = sum(1 for ch in text if not ch.isascii() and not ch.isspace())
+    return ascii_chars // 4 + other_chars + 1
+
+
+def _split(text: str, pattern: re.Pattern) -> List[str]:
+    return [part.strip() for part in pattern.split(text) if part and part.strip()]
+
+
+def _hard_split(text: str, max_tokens: int) -> Iterable[str]:
+    # 문장 하나가 한도를 넘으면 토큰 추정치에 비례한 글자 수로 자른다.
+    tokens = estimate_tokens(text)
+    step = max(1, int(len(text) * max_tokens / tokens))
+    for start in range(0, len(text), step):
+        yield text[start:start + step]
+
+
+def _units(text: str, max_tokens: int) -> Iterable[str]:
+    for section in _split(text, _SECTION_BREAK):
+        if estimate_tokens(section) <= max_tokens:
+            yield section
+            continue
+        for sentence in _split(section, _SENTENCE_BREAK):
+            if estimate_tokens(sentence) <= max_tokens:
+                yield sentence
+            else:
+                yield from _hard_split(sentence, max_tokens)
+
+
+def chunk_text(text: str, max_tokens: int) -> List[str]:
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for unit in _units(text, max_tokens):
+        unit_tokens = estimate_tokens(unit)
+        if current and current_tokens + unit_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks or [text]
+
+
+# 제목 줄: 기호로 시작하거나 [학력] 같은 괄호 제목, 또는 문장 부호로 끝나지 않는 짧은 줄.
+_HEADING_MARK = re.compile(r"(?:[■□◆◇●○▶▷※#]|\[[^\]\n]{1,30}\]|\d{1,2}[.)]\s)")
+_HEADING_MAX_CHARS = 30
+_SENTENCE_END = (".", "!", "?", "。", ",", ":", ";", "다", "요")
+
+
+@dataclass
+class Section:
+    sectionId: str
+    heading: Optional[str]
+    text: str
+
+
+def _is_heading(line: str) -> bool:
+    line = line.strip()
+    if not line or len(line) > _HEADING_MAX_CHARS:
+        return False
+    return bool(_HEADING_MARK.match(line)) or (len(line.split()) <= 4 and not line.endswith(_SENTENCE_END))
+
+
+def _section_id(text: str) -> str:
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()[:16]
+
+
+def split_sections(text: str, max_tokens: int, min_tokens: int) -> List[Section]:
+    # 재평가 단위. 경계를 제목 줄에만 두어 한 문단을 고쳐도 그 섹션의 해시만 바뀌게 한다.
+    # 고정 길이로 자르면 앞쪽 수정이 뒤쪽 경계를 모두 밀어 전부 다시 분석하게 된다.
+    groups: List[List[str]] = []
+    for line in text.splitlines():
+        if not groups or (_is_heading(line) and any(part.strip() for part in groups[-1])):
+            groups.append([])
+        groups[-1].append(line)
+
+    blocks: List[str] = []
+    for group in groups:
+        block = "\n".join(group).strip()
+        if not block:
+            continue
+        # 너무 짧은 섹션(제목만 있는 줄 등)은 앞 섹션에 붙여 호출 수를 줄인다.
+        if blocks and estimate_tokens(block) < min_tokens:
+            blocks[-1] = f"{blocks[-1]}\n{block}"
+        else:
+            blocks.append(block)
+
+    sections: List[Section] = []
+    for block in blocks:
+        first_line = block.split("\n", 1)[0]
+        heading = first_line.strip() if _is_heading(first_line) else None
+        parts = [block] if estimate_tokens(block) <= max_tokens else chunk_text(block, max_tokens)
+        for part in parts:
+            sections.append(Section(sectionId=_section_id(part), heading=heading, text=part))
+    return sections
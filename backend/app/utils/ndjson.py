@@ -0,0 +1,21 @@
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi.responses import StreamingResponse
+
+
+def format_ndjson(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False) + "\n"
+
+
+async def _encode(lines: AsyncIterator[Any]) -> AsyncIterator[str]:
+    async for data in lines:
+        yield format_ndjson(data)
+
+
+def ndjson_response(lines: AsyncIterator[Any], headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    return StreamingResponse(
+        _encode(lines),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(headers or {})},
+    )
@@ -0,0 +1,26 @@
+import json
+from typing import Any, AsyncIterator, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+
+def format_sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _encode(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[str]:
+    try:
+        async for event, data in events:
+            yield format_sse(event, data)
+    except HTTPException as exc:
+        # 스트림이 시작된 뒤에는 상태 코드를 바꿀 수 없으므로 error 이벤트로 알린다.
+        yield format_sse("error", {"status": exc.status_code, "detail": exc.detail})
+
+
+def sse_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    return StreamingResponse(
+        _encode(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
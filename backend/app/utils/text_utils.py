@@ -1,22 +1,125 @@
 import re
-from typing import Iterable
-
-
-def clean_text(blocks: Iterable[str]) -> str:
-    text = "\n".join(blocks)
-    text = re.sub(r"\s+", " ", text)
-    text = re.sub(r"(\s{2,})", " ", text)
-    text = text.replace("\u3000", " ").strip()
-    return text
-
-
-def strip_headers_and_footers(text: str) -> str:
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-    if not lines:
-        return text
-    if len(lines) < 6:
-        return " \n".join(lines)
-    first_line = lines[0]
-    last_line = lines[-1]
-    filtered = [line for line in lines if line not in {first_line, last_line}]
-    return " \n".join(filtered) if filtered else " \n".join(lines)
\ No newline at end of file
+from collections import Counter
+from typing import Iterable, List, Optional, Set, Tuple
+
+# 페이지 위아래 몇 줄까지를 머리말/꼬리말 후보로 볼지, 그리고 전체 페이지 중 몇 할 이상에 반복돼야 지우는지.
+_EDGE_LINES = 2
+_EDGE_MAX_CHARS = 80
+_REPEAT_RATIO = 0.5
+_REPEAT_MIN_PAGES = 3
+
+# 폭 없는 문자, 소프트 하이픈, BOM, 제어 문자는 지운다. 줄 구분 문자(\v, \f 등)는 splitlines 가 처리한다.
+_INVISIBLE = re.compile(r"[\x00-\x08\x0e-\x1b\x1f\x7f\u00ad\u200b-\u200d\u2060\ufeff]")
+# 전각 영숫자와 기호(！～)는 반각으로 바꿔 토큰 수를 줄인다.
+_FULLWIDTH = re.compile(r"[\uff01-\uff5e]")
+# "- 3 -", "Page 3 of 60", "p. 3", "3 / 60", "3쪽" 처럼 꾸밈이 있어 쪽 번호임이 분명한 줄.
+_PAGE_NUMBER = re.compile(
+    r"[-–—]+\s*\d{1,4}\s*[-–—]+"
+    r"|(?:page|p\.|페이지)\s*\d{1,4}(?:\s*(?:/|of)\s*\d{1,4})?"
+    r"|\d{1,4}\s*(?:/|of)\s*\d{1,4}(?:\s*(?:쪽|페이지|pages?))?"
+    r"|\d{1,4}\s*(?:쪽|페이지)",
+    re.IGNORECASE,
+)
+# 숫자만 있는 줄은 연도("2017")일 수도 있어서, 여러 페이지에서 번호가 페이지 순서와 함께 늘 때만 쪽 번호로 본다.
+_BARE_NUMBER = re.compile(r"\d{1,4}")
+
+
+def _halfwidth(match: re.Match) -> str:
+    return chr(ord(match.group()) - 0xFEE0)
+
+
+def _normalize_page(text: str) -> List[str]:
+    # 줄 구조는 그대로 두고 줄 안의 공백만 접는다. 빈 줄 여러 개는 문단 구분 하나로 줄인다.
+    # str.split() 은 전각 공백(U+3000), NBSP, 탭 등 유니코드 공백을 모두 구분자로 본다.
+    lines: List[str] = []
+    blank = True
+    for line in _FULLWIDTH.sub(_halfwidth, _INVISIBLE.sub("", text)).splitlines():
+        line = " ".join(line.split())
+        if line:
+            lines.append(line)
+            blank = False
+        elif not blank:
+            lines.append("")
+            blank = True
+    if lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _edge_key(line: str, page: int, offset: Optional[int]) -> str:
+    # 쪽 번호 줄은 번호가 달라도 같은 줄로 본다. 나머지는 글자가 같아야 반복으로 센다.
+    if _PAGE_NUMBER.fullmatch(line):
+        return "#page"
+    if offset is not None and _BARE_NUMBER.fullmatch(line) and int(line) - page == offset:
+        return "#page"
+    return line
+
+
+def _edges(lines: List[str]) -> List[int]:
+    # 앞뒤에서 빈 줄이 아닌 줄을 _EDGE_LINES 개씩만 훑는다. 본문 전체를 복사하지 않는다.
+    head = _first_content(lines, range(len(lines)))
+    if not head:
+        return head
+    # 꼬리 쪽은 머리 후보와 겹치지 않게 뒤에서부터 찾는다.
+    return head + _first_content(lines, range(len(lines) - 1, head[-1], -1))
+
+
+def _first_content(lines: List[str], indexes: Iterable[int]) -> List[int]:
+    found: List[int] = []
+    for index in indexes:
+        if lines[index]:
+            found.append(index)
+            if len(found) == _EDGE_LINES:
+                break
+    return found
+
+
+def _page_offset(pages: List[List[str]], threshold: int) -> Optional[int]:
+    # 숫자만 있는 가장자리 줄의 (번호 - 페이지 위치)가 threshold 개 이상의 페이지에서 같으면 그 차이를 돌려준다.
+    offsets: Counter = Counter()
+    for page, lines in enumerate(pages):
+        offsets.update({int(lines[index]) - page for index in _edges(lines) if _BARE_NUMBER.fullmatch(lines[index])})
+    if not offsets:
+        return None
+    offset, count = offsets.most_common(1)[0]
+    return offset if count >= threshold else None
+
+
+def _repeated_edges(pages: List[List[str]]) -> Tuple[Set[str], Optional[int]]:
+    if len(pages) < _REPEAT_MIN_PAGES:
+        return set(), None
+    threshold = max(2, int(len(pages) * _REPEAT_RATIO + 0.5))
+    offset = _page_offset(pages, threshold)
+    counts: Counter = Counter()
+    for page, lines in enumerate(pages):
+        counts.update(
+            {_edge_key(lines[index], page, offset) for index in _edges(lines) if len(lines[index]) <= _EDGE_MAX_CHARS}
+        )
+    return {key for key, count in counts.items() if count >= threshold}, offset
+
+
+def normalize_pages(pages: Iterable[str], strip_repeated: bool = True) -> str:
+    normalized = [_normalize_page(page) for page in pages]
+    repeated, offset = _repeated_edges(normalized) if strip_repeated else (set(), None)
+    out: List[str] = []
+    for page, lines in enumerate(normalized):
+        drop = {
+            index for index in _edges(lines)
+            if len(lines[index]) <= _EDGE_MAX_CHARS and _edge_key(lines[index], page, offset) in repeated
+        } if repeated else set()
+        # 짧은 페이지가 통째로 지워지지 않도록, 남는 줄이 없으면 그 페이지는 그대로 둔다.
+        if drop and len(drop) >= sum(1 for line in lines if line):
+            drop = set()
+        # 머리말을 지우고 남은 앞뒤 빈 줄과 겹친 빈 줄은 버리고, 페이지 사이는 빈 줄 하나로 잇는다.
+        kept: List[str] = []
+        for index, line in enumerate(lines):
+            if index in drop or (not line and (not kept or not kept[-1])):
+                continue
+            kept.append(line)
+        if kept and not kept[-1]:
+            kept.pop()
+        if kept:
+            if out:
+                out.append("")
+            out.extend(kept)
+    return "\n".join(out)
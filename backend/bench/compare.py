@@ -0,0 +1,65 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# 두 결과 파일을 비교해 회귀를 찾는다. 지연(p50/p95/p99)은 낮을수록, throughput 은 높을수록 좋다.
+#   python -m bench.compare bench/results/baseline.json bench/results/load.json --threshold 0.10
+# 회귀가 하나라도 있으면 종료 코드 1 로 끝나 CI 에서 바로 쓸 수 있다.
+
+LOWER_IS_BETTER = ("p50", "p95", "p99")
+HIGHER_IS_BETTER = ("throughput",)
+
+
+def _load(path: str) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> Tuple[List[List[str]], List[str]]:
+    rows: List[List[str]] = []
+    regressions: List[str] = []
+    for name, base in baseline["results"].items():
+        now = current["results"].get(name)
+        if now is None:
+            rows.append([name, "-", "-", "-", "missing"])
+            continue
+        if now.get("errors", 0) > base.get("errors", 0):
+            regressions.append(f"{name}: errors {base.get('errors', 0)} -> {now['errors']}")
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            before, after = base.get(metric), now.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+            rows.append([name, metric, f"{before:.4g}", f"{after:.4g}", f"{change:+.1%}" + (" REGRESSION" if worse else "")])
+            if worse:
+                regressions.append(f"{name}: {metric} {before:.4g} -> {after:.4g} ({change:+.1%})")
+    return rows, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative change, e.g. 0.10 = 10%%")
+    args = parser.parse_args()
+    baseline, current = _load(args.baseline), _load(args.current)
+    if baseline.get("kind") != current.get("kind"):
+        raise SystemExit(f"cannot compare {baseline.get('kind')} results with {current.get('kind')} results")
+    rows, regressions = compare(baseline, current, args.threshold)
+    print(f"baseline {baseline['environment']['commit']}  current {current['environment']['commit']}")
+    for row in rows:
+        print(f"{row[0]:<48} {row[1]:<10} {row[2]:>10} {row[3]:>10}  {row[4]}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import argparse
+import io
+import json
+import random
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from PIL import Image, ImageDraw, ImageFont
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.pdfgen import canvas
+
+# 벤치마크용 합성 문서 묶음을 만든다. 실제 이력서는 저장소에 둘 수 없으므로 문장 풀에서 결정적으로 조합한다.
+#   python -m bench.corpus --out bench/corpus
+# HWP 5.0(OLE) 바이너리는 만들 수 있는 도구가 없어 HWPX(zip)만 생성한다.
+
+KOREAN_FONT = "HYSMyeongJo-Medium"
+_HANGUL_TTF_CANDIDATES = (
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/System/Library/Fonts/AppleSDGothicNeo.ttc",
+)
+
+EN_SENTENCES = [
+    "Led the migration of a monolithic billing service to event-driven microservices.",
+    "Reduced p95 API latency from 850 ms to 210 ms by introducing read replicas and caching.",
+    "Designed a feature store used by 12 data science teams across three regions.",
+    "Mentored four junior engineers and ran the weekly architecture review.",
+    "Built CI pipelines that cut average build time by 40 percent.",
+    "Owned on-call for the payments platform handling 3,000 requests per second.",
+    "Shipped a document search feature with hybrid BM25 and vector retrieval.",
+    "Coordinated with product and design to define quarterly OKRs.",
+    "Automated infrastructure provisioning with Terraform and Kubernetes operators.",
+    "Improved test coverage of the core library from 45 to 88 percent.",
+]
+
+KO_SENTENCES = [
+    "결제 시스템을 이벤트 기반 마이크로서비스로 전환하는 프로젝트를 주도했습니다.",
+    "읽기 전용 복제본과 캐시를 도입해 API 응답 시간을 850ms에서 210ms로 줄였습니다.",
+    "세 개 지역의 데이터 과학 팀 열두 곳이 사용하는 피처 스토어를 설계했습니다.",
+    "주니어 개발자 네 명을 멘토링하고 매주 아키텍처 리뷰를 진행했습니다.",
+    "CI 파이프라인을 개선해 평균 빌드 시간을 40퍼센트 단축했습니다.",
+    "초당 3천 건을 처리하는 결제 플랫폼의 온콜을 담당했습니다.",
+    "BM25와 벡터 검색을 결합한 문서 검색 기능을 출시했습니다.",
+    "제품, 디자인 팀과 협업하여 분기별 목표를 정의했습니다.",
+    "Terraform과 쿠버네티스 오퍼레이터로 인프라 구성을 자동화했습니다.",
+    "핵심 라이브러리의 테스트 커버리지를 45퍼센트에서 88퍼센트로 높였습니다.",
+]
+
+EN_HEADINGS = ["Summary", "Experience", "Projects", "Skills", "Education"]
+KO_HEADINGS = ["자기소개", "경력", "프로젝트", "기술", "학력"]
+
+
+def _paragraphs(language: str, count: int, rng: random.Random) -> List[str]:
+    sentences = KO_SENTENCES if language == "ko" else EN_SENTENCES
+    headings = KO_HEADINGS if language == "ko" else EN_HEADINGS
+    lines: List[str] = []
+    for index in range(count):
+        if index % 6 == 0:
+            lines.append(headings[(index // 6) % len(headings)])
+        lines.append(" ".join(rng.sample(sentences, 2)))
+    return lines
+
+
+def _wrap(line: str, width: int) -> List[str]:
+    # 한글은 공백이 드물어 글자 수로 자른다.
+    if len(line) <= width:
+        return [line]
+    return [line[start:start + width] for start in range(0, len(line), width)]
+
+
+def _text_pages(language: str, page_count: int, seed: int) -> List[List[str]]:
+    rng = random.Random(seed)
+    width = 45 if language == "ko" else 90
+    per_page = 38
+    body: List[str] = []
+    for paragraph in _paragraphs(language, page_count * 20, rng):
+        body.extend(_wrap(paragraph, width))
+    return [body[start:start + per_page] for start in range(0, page_count * per_page, per_page)]
+
+
+def _font(language: str) -> str:
+    if language == "ko":
+        pdfmetrics.registerFont(UnicodeCIDFont(KOREAN_FONT))
+        return KOREAN_FONT
+    return "Helvetica"
+
+
+def write_text_pdf(path: Path, language: str, page_count: int, seed: int, headers: bool = False) -> str:
+    font = _font(language)
+    pdf = canvas.Canvas(str(path), pagesize=A4)
+    width, height = A4
+    written: List[str] = []
+    for number, lines in enumerate(_text_pages(language, page_count, seed), start=1):
+        if headers:
+            # 모든 페이지에 반복되는 머리말/꼬리말. normalize_pages 가 걸러내야 하는 부분이다.
+            pdf.setFont(font, 8)
+            pdf.drawString(40, height - 30, "Confidential - Candidate Portfolio" if language == "en" else "대외비 - 지원자 포트폴리오")
+            pdf.drawString(width / 2 - 20, 20, f"- {number} -")
+        pdf.setFont(font, 10)
+        y = height - 60
+        for line in lines:
+            pdf.drawString(40, y, line)
+            written.append(line)
+            y -= 18
+        pdf.showPage()
+    pdf.save()
+    return "\n".join(written)
+
+
+def _raster_font(language: str, size: int) -> Optional[Any]:
+    candidates = _HANGUL_TTF_CANDIDATES if language == "ko" else ("DejaVuSans.ttf",)
+    for candidate in candidates:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    return None
+
+
+def _scanned_page(lines: List[str], language: str, rng: random.Random) -> Image.Image:
+    image = Image.new("L", (1240, 1754), 255)
+    draw = ImageDraw.Draw(image)
+    font = _raster_font(language, 26) or ImageFont.load_default()
+    y = 120
+    for line in lines:
+        draw.text((100, y), line, fill=0, font=font)
+        y += 40
+    # 스캔처럼 보이도록 약간 기울이고 점 잡음을 넣는다.
+    image = image.rotate(rng.uniform(-0.8, 0.8), fillcolor=255)
+    pixels = image.load()
+    for _ in range(4000):
+        pixels[rng.randrange(image.width), rng.randrange(image.height)] = rng.choice((0, 160))
+    return image
+
+
+def write_scanned_pdf(path: Path, language: str, page_count: int, seed: int, text_pages: int = 0) -> str:
+    # 한글 TTF 가 없으면 래스터화할 수 없어 영어로 대신 만든다.
+    if language == "ko" and _raster_font("ko", 26) is None:
+        language = "en"
+    rng = random.Random(seed)
+    font = _font(language)
+    pdf = canvas.Canvas(str(path), pagesize=A4)
+    width, height = A4
+    written: List[str] = []
+    for number, lines in enumerate(_text_pages(language, page_count, seed)):
+        lines = lines[:30]
+        written.extend(lines)
+        if number < text_pages:
+            pdf.setFont(font, 10)
+            y = height - 60
+            for line in lines:
+                pdf.drawString(40, y, line)
+                y -= 18
+        else:
+            buffer = io.BytesIO()
+            _scanned_page(lines, language, rng).save(buffer, format="PNG")
+            buffer.seek(0)
+            pdf.drawImage(ImageReader(buffer), 0, 0, width=width, height=height)
+        pdf.showPage()
+    pdf.save()
+    return "\n".join(written)
+
+
+def write_hwpx(path: Path, language: str, page_count: int, seed: int) -> str:
+    lines = [line for page in _text_pages(language, page_count, seed) for line in page]
+    paragraphs = "".join(
+        f'<hp:p id="{index}" paraPrIDRef="0" styleIDRef="0"><hp:run charPrIDRef="0"><hp:t>{escape(line)}</hp:t></hp:run></hp:p>'
+        for index, line in enumerate(lines)
+    )
+    section = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<hs:sec xmlns:hs="http://www.hancom.co.kr/hwpml/2011/section" '
+        'xmlns:hp="http://www.hancom.co.kr/hwpml/2011/paragraph">'
+        f"{paragraphs}</hs:sec>"
+    )
+    manifest = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<opf:package xmlns:opf="http://www.idpf.org/2007/opf/"><opf:manifest>'
+        '<opf:item id="section0" href="Contents/section0.xml" media-type="application/xml"/>'
+        '</opf:manifest><opf:spine><opf:itemref idref="section0"/></opf:spine></opf:package>'
+    )
+    with zipfile.ZipFile(path, "w") as archive:
+        # mimetype 은 압축하지 않은 첫 항목이어야 한다.
+        archive.writestr(zipfile.ZipInfo("mimetype"), "application/hwp+zip", compress_type=zipfile.ZIP_STORED)
+        archive.writestr("version.xml", '<?xml version="1.0" encoding="UTF-8"?><hv:HCFVersion xmlns:hv="http://www.hancom.co.kr/hwpml/2011/version" major="5" minor="1"/>', compress_type=zipfile.ZIP_DEFLATED)
+        archive.writestr("Contents/content.hpf", manifest, compress_type=zipfile.ZIP_DEFLATED)
+        archive.writestr("Contents/section0.xml", section, compress_type=zipfile.ZIP_DEFLATED)
+    return "\n".join(lines)
+
+
+def build(out: Path, long_pages: int = 60) -> List[Dict[str, Any]]:
+    out.mkdir(parents=True, exist_ok=True)
+    scanned_ko = "ko" if _raster_font("ko", 26) is not None else "en"
+    specs = [
+        ("resume_en.pdf", "pdf", "en", "text", lambda p: write_text_pdf(p, "en", 2, 1)),
+        ("resume_ko.pdf", "pdf", "ko", "text", lambda p: write_text_pdf(p, "ko", 2, 2)),
+        (f"long_en_{long_pages}p.pdf", "pdf", "en", "text", lambda p: write_text_pdf(p, "en", long_pages, 3, headers=True)),
+        (f"long_ko_{long_pages}p.pdf", "pdf", "ko", "text", lambda p: write_text_pdf(p, "ko", long_pages, 4, headers=True)),
+        ("scanned_en.pdf", "pdf", "en", "scanned", lambda p: write_scanned_pdf(p, "en", 2, 5)),
+        ("scanned_ko.pdf", "pdf", scanned_ko, "scanned", lambda p: write_scanned_pdf(p, "ko", 2, 6)),
+        ("mixed_en.pdf", "pdf", "en", "mixed", lambda p: write_scanned_pdf(p, "en", 4, 7, text_pages=2)),
+        ("resume_ko.hwpx", "hwp", "ko", "text", lambda p: write_hwpx(p, "ko", 2, 8)),
+        (f"long_ko_{long_pages}p.hwpx", "hwp", "ko", "text", lambda p: write_hwpx(p, "ko", long_pages, 9)),
+    ]
+    manifest: List[Dict[str, Any]] = []
+    for name, file_type, language, layout, writer in specs:
+        path = out / name
+        text = writer(path)
+        # 원문을 같이 남겨 추출 결과나 AI 엔드포인트 입력으로 바로 쓸 수 있게 한다.
+        path.with_suffix(".txt").write_text(text, encoding="utf-8")
+        manifest.append(
+            {
+                "file": name,
+                "fileType": file_type,
+                "language": language,
+                "layout": layout,
+                "bytes": path.stat().st_size,
+                "text": path.with_suffix(".txt").name,
+            }
+        )
+    (out / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return manifest
+
+
+def load_manifest(corpus: Path) -> List[Dict[str, Any]]:
+    manifest_path = corpus / "manifest.json"
+    if not manifest_path.exists():
+        raise SystemExit(f"{manifest_path} not found; run `python -m bench.corpus --out {corpus}` first")
+    return json.loads(manifest_path.read_text(encoding="utf-8"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate the synthetic benchmark corpus")
+    parser.add_argument("--out", default="bench/corpus")
+    parser.add_argument("--long-pages", type=int, default=60)
+    args = parser.parse_args()
+    for entry in build(Path(args.out), args.long_pages):
+        print(f"{entry['file']:<24} {entry['fileType']:<4} {entry['language']:<3} {entry['layout']:<8} {entry['bytes']:>9} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import argparse
+import asyncio
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+from bench.corpus import load_manifest
+from bench.report import print_table, summarize, write_results
+
+# 실행 중인 서비스에 부하를 걸어 엔드포인트별 p50/p95/p99 와 처리량을 잰다.
+# 코퍼스는 내장 정적 서버로 내보내고, AI 호출은 bench.mock_openai 를 OPENAI_BASE_URL 로 붙여 쓴다.
+#   python -m bench.load --base-url http://127.0.0.1:8000 --concurrency 16 --requests 200 --cold
+
+ENDPOINTS = ("process", "evaluate", "evaluate_sections", "summarize", "proofread", "evaluate_stream", "analyze", "jobs_match", "upload")
+
+
+class _CorpusHandler(SimpleHTTPRequestHandler):
+    # ?n=<nonce> 가 붙으면 %%EOF 뒤에 바이트를 덧붙여 내용 해시를 바꾼다. 추출 캐시를 우회하는 콜드 측정용.
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        nonce = parse_qs(parsed.query).get("n", [""])[0]
+        path = Path(self.translate_path(parsed.path))
+        if not path.is_file():
+            self.send_error(404)
+            return
+        body = path.read_bytes()
+        if nonce:
+            body += f"\n% {nonce}\n".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def serve_corpus(corpus: Path, host: str) -> Tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer((host, 0), partial(_CorpusHandler, directory=str(corpus)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+class LoadRun:
+    def __init__(self, args: argparse.Namespace, documents: List[Dict[str, Any]], corpus: Path, corpus_url: str) -> None:
+        self.args = args
+        self.documents = documents
+        self.texts = {entry["file"]: (corpus / entry["text"]).read_text(encoding="utf-8") for entry in documents}
+        self.corpus_url = corpus_url
+        self.files = {entry["file"]: (corpus / entry["file"]).read_bytes() for entry in documents}
+
+    def _document(self, index: int) -> Dict[str, Any]:
+        return self.documents[index % len(self.documents)]
+
+    def _nonce(self) -> str:
+        return uuid.uuid4().hex if self.args.cold else ""
+
+    def _file_payload(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        nonce = self._nonce()
+        url = f"{self.corpus_url}/{entry['file']}" + (f"?n={nonce}" if nonce else "")
+        return {"fileUrl": url, "fileType": entry["fileType"], "docKind": "resume", "language": entry["language"]}
+
+    def _upload_payload(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        # process 와 같은 문서를 fileUrl 대신 multipart 본문으로 보낸다. --cold 면 서버와 같은 방식으로 바이트를 덧붙인다.
+        body = self.files[entry["file"]]
+        nonce = self._nonce()
+        if nonce:
+            body += f"\n% {nonce}\n".encode()
+        return {"files": {"file": (entry["file"], body)}, "data": {"fileType": entry["fileType"]}}
+
+    def _text_payload(self, entry: Dict[str, Any], endpoint: str) -> Dict[str, Any]:
+        text = self.texts[entry["file"]][: self.args.max_chars]
+        nonce = self._nonce()
+        if nonce:
+            # 응답 캐시 키가 바뀌도록 본문 끝에 식별자를 붙인다.
+            text = f"{text}\n[{nonce}]"
+        payload: Dict[str, Any] = {"extractedText": text, "language": entry["language"]}
+        if endpoint in ("evaluate", "evaluate_sections", "evaluate_stream"):
+            payload["docKind"] = "resume"
+        return payload
+
+    def request(self, endpoint: str, index: int) -> Tuple[str, Dict[str, Any]]:
+        entry = self._document(index)
+        if endpoint == "process":
+            return "/api/document/process", self._file_payload(entry)
+        if endpoint == "analyze":
+            return "/api/analyze", self._file_payload(entry)
+        if endpoint == "evaluate_stream":
+            return "/api/ai/evaluate/stream", self._text_payload(entry, endpoint)
+        if endpoint == "upload":
+            return "/api/document/process/upload", self._upload_payload(entry)
+        if endpoint == "jobs_match":
+            return "/api/jobs/match", {"extractedText": self._text_payload(entry, endpoint)["extractedText"]}
+        if endpoint == "evaluate_sections":
+            return "/api/ai/evaluate/sections", self._text_payload(entry, endpoint)
+        return f"/api/ai/{endpoint}", self._text_payload(entry, endpoint)
+
+    async def _stream(self, client: httpx.AsyncClient, path: str, payload: Dict[str, Any]) -> Tuple[int, Optional[float]]:
+        started = time.perf_counter()
+        first: Optional[float] = None
+        failed = False
+        async with client.stream("POST", path, json=payload) as response:
+            async for line in response.aiter_lines():
+                if first is None and line.startswith("event: delta"):
+                    first = time.perf_counter() - started
+                if line.startswith("event: error"):
+                    failed = True
+            # 스트림 도중 실패는 200 안의 error 이벤트로 온다.
+            return (599 if failed else response.status_code), first
+
+    async def endpoint(self, client: httpx.AsyncClient, endpoint: str) -> Dict[str, Any]:
+        latencies: List[float] = []
+        first_bytes: List[float] = []
+        statuses: Counter = Counter()
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        for index in range(self.args.requests):
+            queue.put_nowait(index)
+
+        async def worker() -> None:
+            while True:
+                try:
+                    index = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                path, payload = self.request(endpoint, index)
+                started = time.perf_counter()
+                try:
+                    if endpoint == "evaluate_stream":
+                        status, first = await self._stream(client, path, payload)
+                        if first is not None:
+                            first_bytes.append(first)
+                    elif endpoint == "upload":
+                        status = (await client.post(path, **payload)).status_code
+                    else:
+                        status = (await client.post(path, json=payload)).status_code
+                except httpx.HTTPError as exc:
+                    status = type(exc).__name__
+                elapsed = time.perf_counter() - started
+                statuses[str(status)] += 1
+                if status == 200:
+                    latencies.append(elapsed)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+        wall = time.perf_counter() - started
+        stats: Dict[str, Any] = summarize(latencies)
+        stats["throughput"] = len(latencies) / wall if wall else 0.0
+        stats["errors"] = self.args.requests - len(latencies)
+        stats["statuses"] = dict(statuses)
+        stats["wallSeconds"] = wall
+        if first_bytes:
+            stats["ttfb"] = summarize(first_bytes)
+        return stats
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    corpus = Path(args.corpus)
+    documents = [
+        entry for entry in load_manifest(corpus)
+        if not args.files or any(name in entry["file"] for name in args.files.split(","))
+    ]
+    if not documents:
+        raise SystemExit("no corpus documents matched --files")
+    server, corpus_url = serve_corpus(corpus, args.corpus_host)
+    load = LoadRun(args, documents, corpus, corpus_url)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+            for endpoint in args.endpoints.split(","):
+                if endpoint not in ENDPOINTS:
+                    raise SystemExit(f"unknown endpoint {endpoint!r}; choose from {', '.join(ENDPOINTS)}")
+                results[endpoint] = await load.endpoint(client, endpoint)
+    finally:
+        server.shutdown()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end load generator for the resume AI service")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--corpus", default="bench/corpus")
+    parser.add_argument("--corpus-host", default="127.0.0.1", help="address the service can reach the corpus on")
+    parser.add_argument("--files", default="resume_en.pdf,resume_ko.pdf", help="comma-separated corpus file filters")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=50, help="requests per endpoint")
+    parser.add_argument("--cold", action="store_true", help="bust extraction and response caches on every request")
+    parser.add_argument("--max-chars", type=int, default=20000)
+    parser.add_argument("--timeout", type=float, default=180)
+    parser.add_argument("--out", default="bench/results/load.json")
+    args = parser.parse_args()
+    results = asyncio.run(run(args))
+    print_table(results)
+    for endpoint, stats in results.items():
+        if stats["statuses"].keys() - {"200"}:
+            print(f"{endpoint}: statuses {stats['statuses']}")
+        if "ttfb" in stats:
+            print(f"{endpoint}: ttfb p50 {stats['ttfb']['p50'] * 1000:.1f} ms, p95 {stats['ttfb']['p95'] * 1000:.1f} ms")
+    write_results(args.out, "load", results, vars(args))
+    print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
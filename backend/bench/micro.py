@@ -0,0 +1,76 @@
+import argparse
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from app.config import get_settings
+from app.services.hwp_extractor import extract_hwp_text
+from app.services.pdf_extractor import count_pages, extract_pages
+from app.utils.text_utils import normalize_pages
+from bench.corpus import load_manifest
+from bench.report import print_table, summarize, write_results
+
+# 문서 처리 핫패스 마이크로 벤치마크(PDF 추출, 텍스트 정리). 워커 풀과 캐시를 거치지 않고 함수를 직접 반복 호출한다.
+# OCR 은 워커 풀에서 페이지마다 따로 도므로 여기서는 재지 않는다.
+#   python -m bench.micro --corpus bench/corpus --repeat 5 --out bench/results/micro.json
+
+
+def _time(fn: Callable[[], Any], repeat: int, warmup: int) -> Dict[str, Any]:
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    stats = summarize(samples)
+    stats["throughput"] = len(samples) / sum(samples) if sum(samples) else 0.0
+    return stats
+
+
+def run(corpus: Path, repeat: int, warmup: int, only: str | None) -> Dict[str, Dict[str, Any]]:
+    settings = get_settings()
+    results: Dict[str, Dict[str, Any]] = {}
+    for entry in load_manifest(corpus):
+        if only and only not in entry["file"]:
+            continue
+        raw_lines = (corpus / entry["text"]).read_text(encoding="utf-8").splitlines()
+        # 페이지 텍스트 흉내: 38줄씩 묶어 normalize_pages 에 넘긴다.
+        blocks = ["\n".join(raw_lines[start:start + 38]) for start in range(0, len(raw_lines), 38)]
+        cases: Dict[str, Callable[[], Any]] = {
+            f"normalize_pages/{entry['file']}": lambda blocks=blocks: normalize_pages(blocks),
+        }
+        path = corpus / entry["file"]
+        if entry["fileType"] == "pdf":
+            # 서비스의 extract_pdf 와 같은 페이지 추출과 정리를 한 프로세스에서 차례로 한다.
+            cases[f"extract_pages/{entry['file']}"] = lambda path=path: normalize_pages(
+                page.text for page in extract_pages(path, 0, min(count_pages(path), settings.pdf_max_pages))
+            )
+        else:
+            limit = settings.hwp_max_unpacked_bytes
+            cases[f"extract_hwp_text/{entry['file']}"] = lambda path=path: extract_hwp_text(path, limit)
+        for name, fn in cases.items():
+            try:
+                results[name] = _time(fn, repeat, warmup)
+            except Exception as exc:
+                # 손상된 문서 등은 실패로 기록하고 계속 간다.
+                results[name] = {"count": 0, "errors": 1, "error": repr(exc)}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for document extraction and text cleanup")
+    parser.add_argument("--corpus", default="bench/corpus")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--only", help="substring filter on corpus file names")
+    parser.add_argument("--out", default="bench/results/micro.json")
+    args = parser.parse_args()
+    results = run(Path(args.corpus), args.repeat, args.warmup, args.only)
+    print_table(results)
+    write_results(args.out, "micro", results, vars(args))
+    print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
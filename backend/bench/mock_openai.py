@@ -0,0 +1,255 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# OpenAI 호환 Responses API 목 서버. 서비스를 OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 로 띄워 붙인다.
+#   python -m bench.mock_openai --port 9100 --latency-ms 800 --tokens-per-sec 80 --error-rate 0.02
+# 응답 내용은 요청의 text.format.name(구조화 출력 스키마 이름)에 맞춰 만들고, 점수는 입력 해시로 정해져 재현된다.
+
+
+class MockConfig:
+    def __init__(self) -> None:
+        self.latency_ms = float(os.getenv("MOCK_LATENCY_MS", "500"))
+        self.jitter_ms = float(os.getenv("MOCK_JITTER_MS", "100"))
+        self.tokens_per_sec = float(os.getenv("MOCK_TOKENS_PER_SEC", "100"))
+        self.error_rate = float(os.getenv("MOCK_ERROR_RATE", "0"))
+        self.rate_limit_rate = float(os.getenv("MOCK_RATE_LIMIT_RATE", "0"))
+        self.malformed_rate = float(os.getenv("MOCK_MALFORMED_RATE", "0"))
+        self.retry_after_ms = int(os.getenv("MOCK_RETRY_AFTER_MS", "500"))
+        self.seed = os.getenv("MOCK_SEED")
+
+
+config = MockConfig()
+_random = random.Random(config.seed)
+_counters: Dict[str, int] = {"requests": 0, "streams": 0, "errors": 0, "rateLimited": 0, "malformed": 0}
+
+app = FastAPI(title="Mock OpenAI")
+
+
+def _input_text(body: Dict[str, Any]) -> str:
+    value = body.get("input", "")
+    if isinstance(value, str):
+        return value
+    # 메시지 배열 형식도 받아 준다.
+    parts: List[str] = []
+    for message in value:
+        content = message.get("content", "")
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(item.get("text", "") for item in content if isinstance(item, dict))
+    return "\n".join(parts)
+
+
+def _score(text: str, salt: str, low: int = 40, high: int = 95) -> int:
+    digest = hashlib.sha256((salt + text).encode("utf-8")).digest()
+    return low + digest[0] % (high - low + 1)
+
+
+def _report(text: str) -> Dict[str, Any]:
+    return {
+        "overallScore": _score(text, "overall"),
+        "rubricScores": {
+            name: _score(text, name) for name in ("readability", "impact", "structure", "specificity", "roleFit")
+        },
+        "strengths": ["성과를 수치로 제시함", "기술 스택이 직무와 맞음"],
+        "weaknesses": ["문장이 길고 반복됨"],
+        "actionableEdits": [
+            {"section": "경력", "issue": "역할이 모호함", "suggestion": "담당 범위와 결과를 한 문장으로 요약하세요."}
+        ],
+        "redFlags": [],
+        "summary": "직무 적합도가 높은 편이나 서술을 간결하게 다듬을 필요가 있습니다.",
+    }
+
+
+def _output(body: Dict[str, Any]) -> Dict[str, Any]:
+    text = _input_text(body)
+    name = (((body.get("text") or {}).get("format") or {}).get("name")) or "resume_evaluation"
+    excerpt = text[-400:]
+    if name == "resume_summary":
+        return {
+            "bulletSummary": ["백엔드 개발 5년", "대규모 트래픽 서비스 운영", "팀 리드 경험"],
+            "oneLiner": "안정적인 서비스를 만들어 온 백엔드 개발자",
+            "keywords": ["Python", "FastAPI", "Kubernetes", "PostgreSQL"],
+        }
+    if name == "proofread_response":
+        return {
+            "correctedText": excerpt,
+            "comments": [{"lineOrSection": "1", "comment": "주어와 서술어의 호응을 맞추세요."}],
+        }
+    if name == "resume_section_evaluation":
+        return {**_report(text), "improved": excerpt}
+    if name == "resume_section_analysis":
+        return {"condensed": excerpt[:200], "improved": excerpt}
+    if name == "resume_evaluation_report":
+        return {"report": _report(text)}
+    return {"report": _report(text), "improvedVersion": excerpt}
+
+
+def _render(body: Dict[str, Any]) -> str:
+    rendered = json.dumps(_output(body), ensure_ascii=False)
+    if _random.random() < config.malformed_rate:
+        _counters["malformed"] += 1
+        # 파서의 관용 추출과 복구 재시도를 시험하도록 코드블록으로 감싸거나 필드를 빠뜨린다.
+        if _random.random() < 0.5:
+            return f"```json\n{rendered}\n```"
+        return rendered[: len(rendered) // 2]
+    return rendered
+
+
+def _usage(prompt: str, output: str) -> Dict[str, Any]:
+    input_tokens = max(1, len(prompt) // 3)
+    output_tokens = max(1, len(output) // 3)
+    return {
+        "input_tokens": input_tokens,
+        "input_tokens_details": {"cached_tokens": 0},
+        "output_tokens": output_tokens,
+        "output_tokens_details": {"reasoning_tokens": 0},
+        "total_tokens": input_tokens + output_tokens,
+    }
+
+
+def _response(body: Dict[str, Any], text: str, status: str = "completed") -> Dict[str, Any]:
+    response_id = f"resp_{uuid.uuid4().hex}"
+    return {
+        "id": response_id,
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": body.get("model", "mock-model"),
+        "status": status,
+        "output": [
+            {
+                "type": "message",
+                "id": f"msg_{uuid.uuid4().hex}",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ]
+        if text
+        else [],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": _usage(_input_text(body), text) if text else None,
+    }
+
+
+def _injected_error() -> JSONResponse | None:
+    roll = _random.random()
+    if roll < config.rate_limit_rate:
+        _counters["rateLimited"] += 1
+        return JSONResponse(
+            status_code=429,
+            content={"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_error"}},
+            headers={"retry-after-ms": str(config.retry_after_ms)},
+        )
+    if roll < config.rate_limit_rate + config.error_rate:
+        _counters["errors"] += 1
+        return JSONResponse(
+            status_code=500,
+            content={"error": {"message": "Internal error (mock)", "type": "server_error"}},
+        )
+    return None
+
+
+async def _first_token_delay() -> None:
+    delay = max(0.0, config.latency_ms + _random.uniform(-config.jitter_ms, config.jitter_ms)) / 1000
+    await asyncio.sleep(delay)
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def _stream(body: Dict[str, Any], text: str) -> AsyncIterator[str]:
+    base = _response(body, "", status="in_progress")
+    sequence = 0
+
+    def event(payload: Dict[str, Any]) -> str:
+        nonlocal sequence
+        sequence += 1
+        return _sse({**payload, "sequence_number": sequence})
+
+    yield event({"type": "response.created", "response": base})
+    await _first_token_delay()
+    item_id = f"msg_{uuid.uuid4().hex}"
+    # 토큰 하나를 약 4글자로 보고 tokens_per_sec 속도로 조각을 흘린다.
+    step = 16
+    delay = step / 4 / config.tokens_per_sec if config.tokens_per_sec > 0 else 0
+    for start in range(0, len(text), step):
+        yield event(
+            {
+                "type": "response.output_text.delta",
+                "item_id": item_id,
+                "output_index": 0,
+                "content_index": 0,
+                "delta": text[start:start + step],
+                "logprobs": [],
+            }
+        )
+        if delay:
+            await asyncio.sleep(delay)
+    completed = _response(body, text)
+    yield event({"type": "response.completed", "response": completed})
+
+
+@app.post("/v1/responses")
+async def create_response(request: Request):
+    body = await request.json()
+    _counters["requests"] += 1
+    error = _injected_error()
+    if error is not None:
+        await asyncio.sleep(config.latency_ms / 4000)
+        return error
+    text = _render(body)
+    if body.get("stream"):
+        _counters["streams"] += 1
+        return StreamingResponse(_stream(body, text), media_type="text/event-stream")
+    await _first_token_delay()
+    if config.tokens_per_sec > 0:
+        await asyncio.sleep(len(text) / 4 / config.tokens_per_sec)
+    return _response(body, text)
+
+
+@app.get("/mock/stats")
+async def stats() -> Dict[str, int]:
+    return dict(_counters)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=config.latency_ms, help="time to first token")
+    parser.add_argument("--jitter-ms", type=float, default=config.jitter_ms)
+    parser.add_argument("--tokens-per-sec", type=float, default=config.tokens_per_sec, help="0 = no output delay")
+    parser.add_argument("--error-rate", type=float, default=config.error_rate, help="fraction of HTTP 500s")
+    parser.add_argument("--rate-limit-rate", type=float, default=config.rate_limit_rate, help="fraction of HTTP 429s")
+    parser.add_argument("--malformed-rate", type=float, default=config.malformed_rate, help="fraction of bad JSON")
+    parser.add_argument("--retry-after-ms", type=int, default=config.retry_after_ms)
+    args = parser.parse_args()
+    config.latency_ms = args.latency_ms
+    config.jitter_ms = args.jitter_ms
+    config.tokens_per_sec = args.tokens_per_sec
+    config.error_rate = args.error_rate
+    config.rate_limit_rate = args.rate_limit_rate
+    config.malformed_rate = args.malformed_rate
+    config.retry_after_ms = args.retry_after_ms
+
+    import uvicorn
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # 최근접 순위(nearest-rank) 방식. 표본이 적을 때 보간보다 보수적으로 나온다.
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "min": min(samples),
+        "mean": sum(samples) / len(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "max": max(samples),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(path: str, kind: str, results: Dict[str, Any], config: Dict[str, Any]) -> None:
+    # compare.py 가 읽는 형식: results 의 각 항목은 초 단위 지연 통계(p50, p95, ...)와 선택적으로 throughput 을 가진다.
+    payload = {"kind": kind, "environment": environment(), "config": config, "results": results}
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def print_table(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'name':<48} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'thrpt/s':>9} {'errors':>7}")
+    for name, stats in results.items():
+        print(
+            f"{name:<48} {stats.get('count', 0):>6} "
+            f"{stats.get('p50', 0) * 1000:>10.1f} {stats.get('p95', 0) * 1000:>10.1f} "
+            f"{stats.get('p99', 0) * 1000:>10.1f} {stats.get('throughput', 0):>9.2f} "
+            f"{stats.get('errors', 0):>7}"
+        )
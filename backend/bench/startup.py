@@ -0,0 +1,144 @@
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from bench.report import print_table, summarize, write_results
+
+# 콜드 스타트 벤치마크. 새 프로세스마다 app.main 임포트 시간, 서버를 띄운 뒤 /health 가 200 을 줄 때까지와
+# 예열(preloaded)이 끝날 때까지의 시간, 그리고 그 뒤 역할별 첫 요청의 지연을 잰다.
+#   python -m bench.startup --roles all,document,ai --launcher serve --repeat 5 --out bench/results/startup.json
+
+_BACKEND = Path(__file__).resolve().parent.parent
+_IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+_MATCH_TEXT = "간호사 면허 보유, 대학병원 병동 간호 3년. Python 데이터 분석."
+
+
+def _env(role: str, extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    env = {**os.environ, "SERVICE_ROLE": role, "LOG_LEVEL": "WARNING", **(extra or {})}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(_BACKEND), env.get("PYTHONPATH")]))
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_time(role: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", _IMPORT_SNIPPET],
+        cwd=_BACKEND,
+        env=_env(role),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def _command(launcher: str, port: int) -> List[str]:
+    if launcher == "uvicorn":
+        return [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)]
+    return [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port)]
+
+
+def serve_once(role: str, launcher: str, pdf: Optional[bytes], timeout: float) -> Dict[str, float]:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        _command(launcher, port),
+        cwd=_BACKEND,
+        env=_env(role, {"RATE_LIMIT_DOCUMENT_BURST": "1000", "RATE_LIMIT_AI_BURST": "1000"}),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    timings: Dict[str, float] = {}
+    try:
+        with httpx.Client(base_url=base, timeout=timeout) as client:
+            # ready: /health 가 처음 200 을 준 시점. preloaded: 뒤에서 하는 스택 임포트와 문서 워커 준비까지 끝난 시점.
+            while "preloaded" not in timings:
+                if process.poll() is not None:
+                    raise RuntimeError(f"server exited with {process.returncode}")
+                if time.perf_counter() - started > timeout:
+                    raise TimeoutError("server did not become ready")
+                try:
+                    response = client.get("/health")
+                except httpx.TransportError:
+                    response = None
+                if response is not None and response.status_code == 200:
+                    timings.setdefault("ready", time.perf_counter() - started)
+                    if response.json().get("preloaded", True):
+                        timings["preloaded"] = time.perf_counter() - started
+                        break
+                time.sleep(0.02)
+            if role in ("all", "ai"):
+                begin = time.perf_counter()
+                response = client.post("/api/jobs/match", json={"extractedText": _MATCH_TEXT})
+                if response.status_code in (200, 503):
+                    timings["first_match"] = time.perf_counter() - begin
+            if role in ("all", "document") and pdf is not None:
+                begin = time.perf_counter()
+                response = client.post(
+                    "/api/document/process/upload", files={"file": ("resume.pdf", pdf)}, data={"fileType": "pdf"}
+                )
+                if response.status_code == 200:
+                    timings["first_document"] = time.perf_counter() - begin
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return timings
+
+
+def run(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    pdf_path = Path(args.pdf)
+    pdf = pdf_path.read_bytes() if pdf_path.is_file() else None
+    if pdf is None:
+        print(f"{pdf_path} not found; skipping first_document (python -m bench.corpus builds it)")
+    results: Dict[str, Dict[str, Any]] = {}
+    for role in args.roles.split(","):
+        samples: Dict[str, List[float]] = {"import": []}
+        errors = 0
+        for _ in range(args.repeat):
+            samples["import"].append(import_time(role))
+            try:
+                for name, value in serve_once(role, args.launcher, pdf, args.timeout).items():
+                    samples.setdefault(name, []).append(value)
+            except (RuntimeError, TimeoutError) as exc:
+                errors += 1
+                print(f"{role}: {exc}")
+        for name, values in samples.items():
+            stats: Dict[str, Any] = summarize(values)
+            stats["errors"] = errors if name != "import" else 0
+            results[f"{name}/{role}/{args.launcher}" if name != "import" else f"import/{role}"] = stats
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark: import time and time to first request")
+    parser.add_argument("--roles", default="all,document,ai")
+    parser.add_argument("--launcher", choices=("serve", "uvicorn"), default="serve")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--pdf", default="bench/corpus/resume_en.pdf")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--out", default="bench/results/startup.json")
+    args = parser.parse_args()
+    results = run(args)
+    print_table(results)
+    write_results(args.out, "startup", results, vars(args))
+    print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import asyncio
+
+from app.schemas import ProofreadRequest, ProofreadResponse
+from app.services import ai_client as ai_module
+from app.services.ai_client import AiClient
+from app.services.response_cache import MemoryBackend, ResponseCache
+
+
+def test_long_stream_uses_chunked_path_and_shares_cache(monkeypatch):
+    monkeypatch.setattr(ai_module.settings, "ai_single_pass_tokens", 20)
+    monkeypatch.setattr(ai_module.settings, "ai_chunk_tokens", 20)
+    client = AiClient(client=object())
+    client.cache = ResponseCache(MemoryBackend(10), ttl=60)
+    prompts = []
+
+    async def chat_json(operation, prompt, model_cls, response_format):
+        prompts.append(prompt)
+        return ProofreadResponse(correctedText=f"part{len(prompts)}", comments=[])
+
+    async def chat_stream(prompt, response_format):
+        raise AssertionError("chunked documents must not be streamed in one shot")
+        yield
+
+    monkeypatch.setattr(client, "_chat_json", chat_json)
+    monkeypatch.setattr(client, "_chat_stream", chat_stream)
+    text = "\n\n".join(f"문단 {index} " + "경력 사항 " * 20 for index in range(4))
+    payload = ProofreadRequest(extractedText=text, language="ko")
+    total = len(client._chunks(text))
+    assert total > 1
+
+    async def scenario():
+        events = [event async for event in client.proofread_stream(payload)]
+        again = await client.proofread(payload)
+        return events, again
+
+    events, again = asyncio.run(scenario())
+    progress = [data for event, data in events if event == "progress"]
+    assert progress[0] == {"completed": 0, "total": total}
+    assert progress[-1] == {"completed": total, "total": total}
+    assert events[-1][0] == "result"
+    assert len(prompts) == total
+    # 같은 캐시 키에는 청크 경로의 결과만 저장되므로 일반 호출이 그대로 재사용한다.
+    assert again.model_dump() == events[-1][1]
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.schemas import BatchItem, BatchRequest, BatchStatus
+from app.services.batches import BatchRunner, MemoryBatchStore, SqliteBatchStore, _now
+
+
+def _runner() -> BatchRunner:
+    return BatchRunner(MemoryBatchStore(), concurrency=1, max_items=10, poll_interval=60, lease=60, ttl_seconds=3600)
+
+
+async def _drain(stream) -> list:
+    return [line async for line in stream]
+
+
+def test_streams_of_unknown_or_finished_batches_leave_no_events():
+    async def scenario() -> None:
+        runner = _runner()
+        for index in range(50):
+            assert await _drain(runner.stream(f"missing-{index}")) == []
+        now = _now()
+        batch = BatchStatus(batchId="done", status="succeeded", mode="online", total=1, createdAt=now, updatedAt=now)
+        request = BatchRequest(items=[BatchItem(extractedText="text")], docKind="resume", language="ko")
+        await runner.store.create(batch, request, None)
+        lines = await _drain(runner.stream("done"))
+        assert lines[-1]["type"] == "summary"
+        lines = await _drain(runner.stream("done", follow=False))
+        assert lines[-1]["type"] == "summary"
+        assert runner._events == {} and runner._listeners == {}
+
+    asyncio.run(scenario())
+
+
+def test_listener_of_a_running_batch_is_removed_when_the_stream_ends():
+    async def scenario() -> None:
+        runner = _runner()
+        now = _now()
+        batch = BatchStatus(batchId="live", status="running", mode="online", total=1, createdAt=now, updatedAt=now)
+        request = BatchRequest(items=[BatchItem(extractedText="text")], docKind="resume", language="ko")
+        await runner.store.create(batch, request, None)
+        # 이 프로세스가 배치를 처리 중인 것처럼 둔다.
+        runner._tasks["live"] = asyncio.create_task(asyncio.sleep(60))
+        streams = [asyncio.create_task(_drain(runner.stream("live"))) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert runner._listeners == {"live": 2}
+
+        runner._tasks.pop("live").cancel()
+        await runner.store.update(batch.model_copy(update={"status": "succeeded"}))
+        runner._wake("live")
+        for lines in await asyncio.gather(*streams):
+            assert lines[-1]["type"] == "summary"
+        assert runner._events == {} and runner._listeners == {}
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_idempotency_keys_are_scoped_and_bound_to_the_request(backend, tmp_path):
+    async def scenario() -> None:
+        store = MemoryBatchStore() if backend == "memory" else SqliteBatchStore(str(tmp_path / "jobs.sqlite3"))
+        runner = BatchRunner(store, concurrency=1, max_items=10, poll_interval=60, lease=60, ttl_seconds=3600)
+
+        async def extract(item: BatchItem) -> str:
+            return item.extractedText or ""
+
+        await runner.start(extract, lambda: None)
+        # 결과는 보지 않으므로 실제 평가가 돌지 않게 배치 실행을 막는다.
+        runner._claim_and_run = _noop
+        try:
+            request = BatchRequest(items=[BatchItem(extractedText="text")], docKind="resume", language="ko")
+            first = await runner.submit(request, "key-1", "10.0.0.1")
+            assert (await runner.submit(request, "key-1", "10.0.0.1")).batchId == first.batchId
+            assert first.idempotencyKey == "key-1"
+            assert (await runner.submit(request, "key-1", "10.0.0.2")).batchId != first.batchId
+            other = request.model_copy(update={"language": "en"})
+            with pytest.raises(HTTPException) as raised:
+                await runner.submit(other, "key-1", "10.0.0.1")
+            assert raised.value.status_code == 422
+        finally:
+            await runner.stop()
+
+    asyncio.run(scenario())
+
+
+async def _noop(*args, **kwargs) -> None:
+    return None
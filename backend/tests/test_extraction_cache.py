@@ -0,0 +1,19 @@
+import asyncio
+
+from app.schemas import ProcessedDocument
+from app.services.extraction_cache import ExtractionCache
+
+
+def _document() -> ProcessedDocument:
+    return ProcessedDocument(extractedText="hello", pageCount=1)
+
+
+def test_stale_version_directories_are_removed_on_startup(tmp_path):
+    old = ExtractionCache(max_entries=0, disk_dir=str(tmp_path), disk_max_bytes=1 << 20, ttl_seconds=60, version="1")
+    asyncio.run(old.put("ab" * 32, _document()))
+    for name in ("unrelated", "var", "venv"):
+        (tmp_path / name).mkdir()
+
+    new = ExtractionCache(max_entries=0, disk_dir=str(tmp_path), disk_max_bytes=1 << 20, ttl_seconds=60, version="2")
+    assert sorted(child.name for child in tmp_path.iterdir()) == ["unrelated", "v2", "var", "venv"]
+    assert asyncio.run(new.get("ab" * 32)) is None
@@ -0,0 +1,178 @@
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from app.services.hwp_extractor import HwpParseError, _para_text, extract_hwp_text
+
+_SECTOR = 512
+_FREE, _END, _FAT = 0xFFFFFFFF, 0xFFFFFFFE, 0xFFFFFFFD
+_NONE = 0xFFFFFFFF
+
+
+def _compound_file(streams: Dict[str, bytes]) -> bytes:
+    # 최상위 스트림과 BodyText 스토리지만 있는 최소 복합 문서(CFB v3). 스트림은 4096바이트 이상, 섹터 크기의
+    # 배수가 되도록 0을 채워 미니 스트림 없이 일반 섹터에만 둔다. 끝의 0 채움은 추출기가 무시한다.
+    padded = {name: data.ljust(max(4096, -(-len(data) // _SECTOR) * _SECTOR), b"\0") for name, data in streams.items()}
+    top = sorted((name for name in padded if "/" not in name), key=lambda name: (len(name), name.upper()))
+    body = sorted(
+        (name.split("/", 1)[1] for name in padded if name.startswith("BodyText/")),
+        key=lambda name: (len(name), name.upper()),
+    )
+
+    sectors: List[bytes] = []
+    fat: List[int] = []
+
+    def allocate(data: bytes) -> int:
+        start = len(sectors)
+        count = len(data) // _SECTOR
+        for index in range(count):
+            sectors.append(data[index * _SECTOR:(index + 1) * _SECTOR])
+            fat.append(start + index + 1 if index + 1 < count else _END)
+        return start
+
+    # (이름, 종류, 자식, 오른쪽 형제, 시작 섹터, 크기). 형제는 오른쪽으로만 이어 붙인다.
+    entries = [["Root Entry", 5, _NONE, _NONE, _END, 0]]
+    children = top + (["BodyText"] if body else [])
+    children.sort(key=lambda name: (len(name), name.upper()))
+    ids = {name: index + 1 for index, name in enumerate(children)}
+    for name in children:
+        if name == "BodyText":
+            entries.append([name, 1, _NONE, _NONE, 0, 0])
+        else:
+            entries.append([name, 2, _NONE, _NONE, allocate(padded[name]), len(padded[name])])
+    for name in body:
+        ids["BodyText/" + name] = len(entries)
+        data = padded["BodyText/" + name]
+        entries.append([name, 2, _NONE, _NONE, allocate(data), len(data)])
+    entries[0][2] = ids[children[0]]
+    for left, right in zip(children, children[1:]):
+        entries[ids[left]][3] = ids[right]
+    if body:
+        entries[ids["BodyText"]][2] = ids["BodyText/" + body[0]]
+        for left, right in zip(body, body[1:]):
+            entries[ids["BodyText/" + left]][3] = ids["BodyText/" + right]
+
+    directory = b""
+    for name, kind, child, right, start, size in entries:
+        encoded = (name + "\0").encode("utf-16-le")
+        directory += (
+            encoded.ljust(64, b"\0")
+            + struct.pack("<HBBIII", len(encoded), kind, 1, _NONE, right, child)
+            + b"\0" * 36
+            + struct.pack("<III", start, size, 0)
+        )
+    directory += b"\0" * (-len(directory) % _SECTOR)
+    first_directory = allocate(directory)
+
+    fat_sectors = 1
+    while (len(sectors) + fat_sectors) > fat_sectors * 128:
+        fat_sectors += 1
+    fat_start = len(sectors)
+    fat += [_FAT] * fat_sectors
+    fat += [_FREE] * (fat_sectors * 128 - len(fat))
+    table = struct.pack(f"<{len(fat)}I", *fat)
+    sectors += [table[index * _SECTOR:(index + 1) * _SECTOR] for index in range(fat_sectors)]
+
+    header = (
+        b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+        + b"\0" * 16
+        + struct.pack("<HHHHH", 0x3E, 3, 0xFFFE, 9, 6)
+        + b"\0" * 6
+        + struct.pack("<IIIIIIIII", 0, fat_sectors, first_directory, 0, 4096, _END, 0, _END, 0)
+        + struct.pack(f"<{109}I", *([fat_start + index for index in range(fat_sectors)] + [_FREE] * (109 - fat_sectors)))
+    )
+    return header + b"".join(sectors)
+
+
+def _record(tag: int, level: int, body: bytes) -> bytes:
+    return struct.pack("<I", tag | (level << 10) | (len(body) << 20)) + body
+
+
+def _text(*parts) -> bytes:
+    # 문자열은 그대로, 정수는 8글자짜리 인라인/확장 제어(코드, 부가 정보 6글자, 코드)로 넣는다.
+    payload = b""
+    for part in parts:
+        if isinstance(part, int):
+            payload += struct.pack("<H", part) + b"\x00\x00lbt " + b"\0" * 6 + struct.pack("<H", part)
+        else:
+            payload += part.encode("utf-16-le")
+    return payload + struct.pack("<H", 13)
+
+
+def _line_segs(*positions: int) -> bytes:
+    return b"".join(struct.pack("<ii", 0, position) + b"\0" * 28 for position in positions)
+
+
+def _paragraph(level: int, text: bytes, *positions: int) -> bytes:
+    records = _record(0x42, level, b"\0" * 22) + _record(0x43, level + 1, text)
+    if positions:
+        records += _record(0x45, level + 1, _line_segs(*positions))
+    return records
+
+
+def _file_header(flags: int) -> bytes:
+    return b"HWP Document File".ljust(32, b"\0") + struct.pack("<II", 0x05000300, flags) + b"\0" * 216
+
+
+def _hwp(tmp_path: Path, sections: List[bytes], flags: int = 0x01) -> Path:
+    streams = {"FileHeader": _file_header(flags)}
+    for index, section in enumerate(sections):
+        if flags & 0x01:
+            packer = zlib.compressobj(wbits=-15)
+            section = packer.compress(section) + packer.flush()
+        streams[f"BodyText/Section{index}"] = section
+    path = tmp_path / "resume.hwp"
+    path.write_bytes(_compound_file(streams))
+    return path
+
+
+_RESUME = [
+    _paragraph(0, _text("홍길동 이력서"), 0)
+    + _paragraph(0, _text("경력", 9, "요약"), 1000),
+    _paragraph(0, _text("학력"), 0),
+]
+
+
+@pytest.mark.parametrize("flags", [0x00, 0x01])
+def test_reads_compressed_and_uncompressed_body_text(tmp_path, flags):
+    result = extract_hwp_text(_hwp(tmp_path, _RESUME, flags), 1 << 20)
+    assert result.engine == "hwp5"
+    assert result.sections == ["홍길동 이력서\n경력\t요약", "학력"]
+    # 첫 섹션은 한 쪽(세로 위치가 계속 커짐), 둘째 섹션은 새 쪽에서 시작한다.
+    assert result.page_count == 2
+
+
+def test_para_text_skips_inline_and_extended_controls():
+    payload = _text("가", 9, "나", 11, "다", 21, "라") + struct.pack("<H", 10) + "마".encode("utf-16-le")
+    assert _para_text(payload) == "가\t나다라\n마"
+
+
+def test_table_cell_paragraphs_follow_their_table(tmp_path):
+    section = (
+        _paragraph(0, _text("자격증", 11), 500)
+        + _paragraph(1, _text("정보처리기사"), 0)
+        + _paragraph(1, _text("2019"), 0)
+        + _paragraph(0, _text("끝"), 2000)
+    )
+    result = extract_hwp_text(_hwp(tmp_path, [section]), 1 << 20)
+    assert result.sections == ["자격증\n정보처리기사\n2019\n끝"]
+    # 셀 문단의 줄 위치는 쪽 수에 넣지 않는다.
+    assert result.page_count == 1
+
+
+@pytest.mark.parametrize("flags", [0x02, 0x04])
+def test_encrypted_and_distribution_documents_are_rejected(tmp_path, flags):
+    with pytest.raises(HwpParseError):
+        extract_hwp_text(_hwp(tmp_path, _RESUME, flags | 0x01), 1 << 20)
+
+
+@pytest.mark.parametrize("flags", [0x00, 0x01])
+def test_unpacked_size_budget(tmp_path, flags):
+    section = b"".join(_paragraph(0, _text("경력 사항 " * 200), 0) for _ in range(40))
+    path = _hwp(tmp_path, [section], flags)
+    with pytest.raises(HwpParseError, match="unpacked size limit"):
+        extract_hwp_text(path, 64 * 1024)
+    assert extract_hwp_text(path, 1 << 20).sections[0].startswith("경력 사항")
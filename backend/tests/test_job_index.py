@@ -0,0 +1,84 @@
+import asyncio
+import json
+from datetime import date
+
+from app.schemas import JobMatchRequest
+from app.services.job_index import JobIndex
+
+
+def _posting(number: int, title: str, region: str, ncs: str, deadline: str, body: str = "") -> dict:
+    return {
+        "listItem": {
+            "recrutPblntSn": number,
+            "recrutPbancTtl": title,
+            "instNm": f"기관{number}",
+            "workRgnNmLst": region,
+            "ncsCdNmLst": ncs,
+            "pbancEndYmd": deadline,
+            "aplyQlfcCn": body,
+        }
+    }
+
+
+_POSTINGS = [
+    _posting(1, "데이터 분석 전문가", "서울특별시", "정보통신", "20261031", "파이썬 SQL 데이터 분석 경력"),
+    _posting(2, "데이터 엔지니어", "부산광역시", "정보통신", "20261130", "데이터 파이프라인"),
+    _posting(3, "회계 담당자", "서울특별시", "경영회계사무", "20261015", "재무제표 결산"),
+    _posting(4, "데이터 관리 사무직", "전국", "경영회계사무", "", "문서 관리"),
+]
+
+
+def _index(tmp_path, postings=_POSTINGS) -> JobIndex:
+    path = tmp_path / "results.json"
+    path.write_text(json.dumps(postings, ensure_ascii=False), "utf-8")
+    index = JobIndex([str(path)], reload_interval=0, max_query_terms=64, query_chars=4000)
+    assert asyncio.run(index.reload())
+    return index
+
+
+def _ids(index: JobIndex, **filters) -> list:
+    request = JobMatchRequest(extractedText="데이터 분석 파이썬 SQL 경력", **filters)
+    return [match.postingId for match in index.match(request).matches]
+
+
+def test_ranks_postings_by_relevance(tmp_path):
+    index = _index(tmp_path)
+    ids = _ids(index)
+    assert ids[0] == "1"
+    assert "3" not in ids
+    response = index.match(JobMatchRequest(extractedText="데이터 분석 파이썬 SQL 경력"))
+    scores = [match.score for match in response.matches]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_region_filter_includes_nationwide_postings(tmp_path):
+    index = _index(tmp_path)
+    assert sorted(_ids(index, regions=["부산"])) == ["2", "4"]
+    assert sorted(_ids(index, regions=["서울"])) == ["1", "4"]
+
+
+def test_ncs_filter(tmp_path):
+    index = _index(tmp_path)
+    assert sorted(_ids(index, ncsCategories=["정보통신"])) == ["1", "2"]
+
+
+def test_deadline_filter(tmp_path):
+    index = _index(tmp_path)
+    # 마감일이 없는 상시 채용 공고는 deadlineFrom 은 통과하고 deadlineTo 에는 걸린다.
+    assert sorted(_ids(index, deadlineFrom=date(2026, 11, 1))) == ["2", "4"]
+    assert sorted(_ids(index, deadlineTo=date(2026, 10, 31))) == ["1"]
+
+
+def test_reloads_only_when_fingerprint_changes(tmp_path):
+    index = _index(tmp_path)
+    version = index.stats()["version"]
+    assert not asyncio.run(index.reload())
+
+    (tmp_path / "results.json").write_text(
+        json.dumps(_POSTINGS + [_posting(5, "데이터 분석 인턴", "대전", "정보통신", "20261231")], ensure_ascii=False),
+        "utf-8",
+    )
+    assert asyncio.run(index.reload())
+    assert index.stats()["version"] != version
+    assert index.stats()["postings"] == 5
+    assert "5" in _ids(index)
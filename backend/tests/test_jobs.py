@@ -0,0 +1,97 @@
+import asyncio
+import hashlib
+import hmac
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.schemas import JobRequest, JobStatus
+from app.services import jobs as jobs_module
+from app.services.jobs import JobQueue, MemoryJobStore, SqliteJobStore, _now, check_callback_url, sign_callback
+
+
+def _request(url: str = "https://example.com/resume.pdf") -> JobRequest:
+    return JobRequest(fileUrl=url, fileType="pdf", docKind="resume", language="ko")
+
+
+def _queue(store) -> JobQueue:
+    return JobQueue(store, concurrency=1, max_queue=10, retry_after=1, ttl_seconds=3600, lease_seconds=60)
+
+
+async def _never_runs(request: JobRequest):
+    await asyncio.Event().wait()
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_idempotency_keys_are_scoped_and_bound_to_the_request(backend, tmp_path):
+    async def scenario() -> None:
+        store = MemoryJobStore() if backend == "memory" else SqliteJobStore(str(tmp_path / "jobs.sqlite3"))
+        jobs = _queue(store)
+        await jobs.start(_never_runs)
+        try:
+            first = await jobs.submit(_request(), "key-1", "10.0.0.1")
+            assert (await jobs.submit(_request(), "key-1", "10.0.0.1")).jobId == first.jobId
+            # 같은 키라도 다른 클라이언트면 별개 작업이다.
+            assert (await jobs.submit(_request(), "key-1", "10.0.0.2")).jobId != first.jobId
+            with pytest.raises(HTTPException) as raised:
+                await jobs.submit(_request("https://example.com/other.pdf"), "key-1", "10.0.0.1")
+            assert raised.value.status_code == 422
+        finally:
+            await jobs.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stale_running_jobs_fail_on_start(tmp_path):
+    async def scenario() -> None:
+        store = SqliteJobStore(str(tmp_path / "jobs.sqlite3"))
+        now = _now()
+        for job_id in ("stale", "fresh"):
+            await store.create(
+                JobStatus(jobId=job_id, status="queued", createdAt=now, updatedAt=now), _request(), None
+            )
+        stale = await store.get("stale")
+        stale.status = "running"
+        stale.updatedAt = now.fromtimestamp(time.time() - 3600, now.tzinfo)
+        assert await store.claim(stale)
+        fresh = await store.get("fresh")
+        fresh.status = "running"
+        assert await store.claim(fresh)
+
+        jobs = _queue(store)
+        await jobs.start(_never_runs)
+        await jobs.stop()
+        assert (await store.get("stale")).status == "failed"
+        assert (await store.get("fresh")).status == "running"
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize(
+    "url",
+    ["http://127.0.0.1/hook", "http://localhost:8000/hook", "http://10.1.2.3/hook", "http://169.254.169.254/latest"],
+)
+def test_callback_url_rejects_internal_hosts(url, monkeypatch):
+    monkeypatch.setattr(jobs_module.settings, "job_callback_secret", "secret")
+    monkeypatch.setattr(jobs_module.settings, "job_callback_allowed_hosts", "")
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(check_callback_url(url))
+    assert raised.value.status_code == 422
+
+
+def test_callback_url_allow_list_and_secret(monkeypatch):
+    monkeypatch.setattr(jobs_module.settings, "job_callback_allowed_hosts", "hooks.internal")
+    monkeypatch.setattr(jobs_module.settings, "job_callback_secret", "")
+    with pytest.raises(HTTPException):
+        asyncio.run(check_callback_url("https://hooks.internal/done"))
+    monkeypatch.setattr(jobs_module.settings, "job_callback_secret", "secret")
+    asyncio.run(check_callback_url("https://hooks.internal/done"))
+    with pytest.raises(HTTPException):
+        asyncio.run(check_callback_url("https://example.com/done"))
+
+
+def test_callback_signature(monkeypatch):
+    monkeypatch.setattr(jobs_module.settings, "job_callback_secret", "secret")
+    signature = sign_callback(b'{"jobId":"1"}', "1700000000")
+    assert signature == "sha256=" + hmac.new(b"secret", b'1700000000.{"jobId":"1"}', hashlib.sha256).hexdigest()
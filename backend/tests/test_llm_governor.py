@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.llm_governor import CircuitBreaker, LlmGovernor, Upstream
+
+
+def _half_open(breaker: CircuitBreaker) -> None:
+    breaker.failures = breaker.threshold
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.retry_after() > 0
+
+
+def test_half_open_admits_a_single_probe():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=60)
+    _half_open(breaker)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_probe_success_closes_and_failure_reopens():
+    breaker = CircuitBreaker(threshold=3, reset_timeout=60)
+    _half_open(breaker)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+    _half_open(breaker)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_released_probe_can_be_retried():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=60)
+    _half_open(breaker)
+    assert breaker.allow()
+    breaker.release_probe()
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+def _governor(deadline: float) -> LlmGovernor:
+    return LlmGovernor(
+        max_concurrency=1,
+        model_concurrency=1,
+        tokens_per_minute=0,
+        max_retries=2,
+        backoff_base=0.01,
+        backoff_max=0.01,
+        deadline=deadline,
+        breaker_threshold=1,
+        breaker_reset=60,
+    )
+
+
+def test_probe_timing_out_before_acquire_releases_the_probe():
+    async def scenario() -> None:
+        governor = _governor(deadline=0.1)
+        upstream = Upstream("primary", "model", object())
+        breaker = governor._breaker(upstream)
+        _half_open(breaker)
+
+        async def request(client, model):
+            return "ok"
+
+        # 전역 슬롯을 쥐고 있어 시험 요청이 슬롯을 얻기 전에 마감에 걸린다.
+        governor._slots = asyncio.Semaphore(1)
+        await governor._slots.acquire()
+        with pytest.raises(HTTPException) as raised:
+            await governor.call([upstream], request, 1)
+        assert raised.value.status_code == 504
+        assert breaker.state == "half_open"
+        assert not breaker._probing
+
+        governor._slots.release()
+        assert await governor.call([upstream], request, 1) == "ok"
+        assert breaker.state == "closed"
+
+    asyncio.run(scenario())
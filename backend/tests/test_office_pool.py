@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.office_pool import OfficeConverterPool
+
+
+def test_lease_waiters_are_capped_and_time_out():
+    pool = OfficeConverterPool(
+        size=1, max_conversions=10, convert_timeout=1, startup_timeout=0.2, max_queue=1, retry_after=7
+    )
+
+    async def scenario() -> None:
+        # 인스턴스 하나가 이미 다른 변환에 쓰이고 있는 상태.
+        pool._idle = asyncio.Queue()
+
+        async def lease() -> None:
+            async with pool._lease():
+                pass
+
+        waiter = asyncio.create_task(lease())
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as rejected:
+            await lease()
+        assert rejected.value.status_code == 503
+        assert rejected.value.headers == {"Retry-After": "7"}
+
+        with pytest.raises(HTTPException) as timed_out:
+            await waiter
+        assert timed_out.value.status_code == 503
+        assert pool.stats()["waiting"] == 0
+        assert pool.stats()["rejected"] == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from app.services.response_cache import DiskBackend, MemoryBackend, ResponseCache
+
+
+class Answer(BaseModel):
+    text: str
+
+
+@pytest.mark.parametrize("value", ["{not json", '{"other": 1}'])
+@pytest.mark.parametrize("backend", ["memory", "disk"])
+def test_unreadable_entries_are_evicted_and_recomputed(backend, value, tmp_path):
+    async def scenario() -> None:
+        store = MemoryBackend(10) if backend == "memory" else DiskBackend(str(tmp_path), 1 << 20)
+        cache = ResponseCache(store, ttl=60)
+        await store.set("key", value, 60)
+        assert await cache.lookup("key", Answer) is None
+        assert await store.get("key") is None
+
+        async def compute() -> Answer:
+            return Answer(text="fresh")
+
+        assert (await cache.get_or_compute("key", Answer, compute)).text == "fresh"
+        assert (await cache.lookup("key", Answer)).text == "fresh"
+        assert cache.hits == 1
+
+    asyncio.run(scenario())
+
+
+def test_disk_backend_stays_within_budget(tmp_path):
+    async def scenario() -> DiskBackend:
+        store = DiskBackend(str(tmp_path), max_bytes=2000)
+        for index in range(20):
+            await store.set(f"{index:02d}" + "k" * 62, "x" * 200, 60 + index)
+        return store
+
+    store = asyncio.run(scenario())
+    files = list(tmp_path.glob("*/*.json"))
+    assert store.disk_bytes == sum(path.stat().st_size for path in files) <= 2000
+    # 먼저 만료될 항목부터 지우므로 마지막에 쓴 항목은 남는다.
+    assert (tmp_path / "19" / ("19" + "k" * 62 + ".json")).exists()
+
+
+def test_disk_backend_sweeps_expired_files_on_startup(tmp_path):
+    asyncio.run(DiskBackend(str(tmp_path), max_bytes=1 << 20).set("ab" * 32, "value", -1))
+    assert list(tmp_path.glob("*/*.json"))
+
+    store = DiskBackend(str(tmp_path), max_bytes=1 << 20)
+    assert not list(tmp_path.glob("*/*.json"))
+    assert store.disk_bytes == 0
@@ -0,0 +1,18 @@
+from app.utils.text_utils import normalize_pages
+
+
+def test_bare_numbers_that_do_not_follow_page_order_are_kept():
+    text = normalize_pages(["회사 A 입사\n2017", "회사 B 입사\n2019", "회사 C 입사\n2021"])
+    for year in ("2017", "2019", "2021"):
+        assert year in text
+
+
+def test_page_numbers_are_removed():
+    bare = normalize_pages(["경력 1\n1", "경력 2\n2", "경력 3\n3"])
+    assert bare.split() == ["경력", "1", "경력", "2", "경력", "3"]
+
+    decorated = normalize_pages(["- 1 -\n경력 가", "- 2 -\n경력 나", "- 3 -\n경력 다"])
+    assert "-" not in decorated
+
+    paged = normalize_pages(["경력 가\n1/10", "경력 나\n2/10", "경력 다\n3/10"])
+    assert "/10" not in paged
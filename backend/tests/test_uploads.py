@@ -0,0 +1,87 @@
+import asyncio
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.services.uploads import receive_upload
+
+_BOUNDARY = "resume-boundary"
+_PDF = b"%PDF-1.7\n" + b"0123456789" * 100
+
+
+def _body(parts: List[Tuple[str, Optional[str], bytes]]) -> bytes:
+    body = b""
+    for name, filename, data in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+        body += f"--{_BOUNDARY}\r\nContent-Disposition: {disposition}\r\n".encode()
+        if filename:
+            body += b"Content-Type: application/pdf\r\n"
+        body += b"\r\n" + data + b"\r\n"
+    return body + f"--{_BOUNDARY}--\r\n".encode()
+
+
+def _receive(body: bytes, spool_bytes: int = 1 << 20, max_bytes: int = 1 << 20):
+    # 본문을 작은 조각으로 나눠 보내 조각 경계가 파트 경계와 어긋나도 받는지 본다.
+    messages = [
+        {"type": "http.request", "body": body[start:start + 97], "more_body": start + 97 < len(body)}
+        for start in range(0, len(body), 97)
+    ]
+
+    async def receive() -> dict:
+        return messages.pop(0)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/document/process/upload",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={_BOUNDARY}".encode())],
+    }
+    return asyncio.run(receive_upload(Request(scope, receive), spool_bytes, max_bytes))
+
+
+def test_missing_file_field_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        _receive(_body([("fileType", None, b"pdf")]))
+    assert exc.value.status_code == 400
+
+
+def test_duplicate_file_part_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        _receive(_body([("file", "a.pdf", _PDF), ("file", "b.pdf", _PDF)]))
+    assert exc.value.status_code == 400
+
+
+def test_oversize_body_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        _receive(_body([("file", "resume.pdf", _PDF)]), max_bytes=len(_PDF) - 1)
+    assert exc.value.status_code == 413
+
+
+def test_file_type_field_after_file_part():
+    upload, fields = _receive(_body([("file", "resume.pdf", _PDF), ("fileType", None, b"pdf")]))
+    try:
+        assert fields == {"fileType": "pdf"}
+        assert upload.filename == "resume.pdf"
+        assert upload.data() == _PDF
+        assert upload.head == _PDF[:1024]
+    finally:
+        upload.close()
+
+
+def test_spill_over_to_disk_then_materialize_and_close():
+    upload, _ = _receive(_body([("file", "resume.pdf", _PDF)]), spool_bytes=100)
+    spilled = upload.data()
+    assert isinstance(spilled, Path)
+    assert spilled.read_bytes() == _PDF
+
+    path = upload.materialize("pdf")
+    assert path.name == "source.pdf"
+    assert path.read_bytes() == _PDF
+    assert not spilled.exists()
+    assert upload.data() == path
+
+    upload.close()
+    assert not path.parent.exists()